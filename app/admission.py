@@ -0,0 +1,317 @@
+# app/admission.py
+"""
+Queued admission for high-demand classes.
+
+Used by:
+- app.routers.members (POST /members/{id}/classes/{class_id}/register for
+  classes with admission_mode = 'queued', GET /members/admission/{token})
+- app.routers.admins (PUT /admins/classes/{class_id}/admission-mode,
+  GET /admins/admission-stats)
+
+When a popular class opens, hundreds of direct registrations queue on the
+same class row lock, each holding it for a whole transaction. For classes
+flagged admission_mode = 'queued', requests are put on an in-process queue
+instead and applied by one writer thread:
+
+    - take up to ADMISSION_BATCH_SIZE pending requests
+    - one transaction: lock the affected class rows (in class_id order),
+      drop duplicates / already-registered members, admit in arrival
+      order while seats remain, insert all admitted rows with one
+      multi-row INSERT and bump registered_count once per class
+    - resolve each request's future with its seats-left, or an error
+
+So a release costs one lock acquisition and one commit per batch rather
+than per member. Each worker process has its own writer; across workers
+the class row sees at most one waiter per process.
+
+Callers wait up to ADMISSION_RESULT_TIMEOUT seconds on the future; past
+that they get a poll token and fetch the outcome with result().
+"""
+
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from app import config
+from app.db_raw import get_connection, get_cursor
+
+
+class AdmissionBusyError(RuntimeError):
+    """Raised when ADMISSION_MAX_PENDING requests are already queued."""
+
+
+class AdmissionRejected(ValueError):
+    """The request was processed and refused (class full, unknown class...)."""
+
+
+class _Request:
+    __slots__ = ("token", "member_id", "class_id", "future", "enqueued_at")
+
+    def __init__(self, member_id: int, class_id: int):
+        self.token = secrets.token_urlsafe(16)
+        self.member_id = member_id
+        self.class_id = class_id
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+_queue: queue.Queue = queue.Queue(maxsize=config.ADMISSION_MAX_PENDING)
+_writer_lock = threading.Lock()
+_writer_started = False
+
+# token -> (request, forget_at); results stay pollable for ADMISSION_RESULT_TTL.
+_tickets: dict[str, tuple[_Request, float]] = {}
+_tickets_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Which classes are queued (short per-process cache)
+# ---------------------------------------------------------------------------
+
+_mode_cache: dict[int, tuple[bool, float]] = {}
+
+
+def is_queued(class_id: int) -> bool:
+    now = time.monotonic()
+    entry = _mode_cache.get(class_id)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    with get_cursor() as cur:
+        cur.execute("SELECT admission_mode FROM class WHERE class_id = %s;", (class_id,))
+        row = cur.fetchone()
+    queued = row is not None and row["admission_mode"] == "queued"
+    _mode_cache[class_id] = (queued, now + config.ADMISSION_MODE_CACHE_TTL)
+    return queued
+
+
+def set_mode(class_id: int, mode: str) -> bool:
+    """Flag a class 'queued' or 'direct'. Other workers follow within the cache TTL."""
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "UPDATE class SET admission_mode = %s WHERE class_id = %s;",
+            (mode, class_id),
+        )
+        found = cur.rowcount > 0
+    _mode_cache.pop(class_id, None)
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Submitting and collecting results
+# ---------------------------------------------------------------------------
+
+def submit(member_id: int, class_id: int) -> _Request:
+    """Queue a registration; the request's future resolves to the seats left."""
+    _ensure_writer()
+    req = _Request(member_id, class_id)
+    try:
+        _queue.put_nowait(req)
+    except queue.Full:
+        _stats["rejected_busy"] += 1
+        raise AdmissionBusyError("Too many registrations queued, retry shortly")
+    with _tickets_lock:
+        _tickets[req.token] = (req, time.monotonic() + config.ADMISSION_RESULT_TTL)
+    return req
+
+
+def result(token: str) -> dict | None:
+    """
+    Outcome of a queued registration by poll token:
+    {"status": "pending" | "registered" | "rejected", ...}; None if unknown
+    or forgotten.
+    """
+    with _tickets_lock:
+        entry = _tickets.get(token)
+    if entry is None:
+        return None
+    req = entry[0]
+    out = {"member_id": req.member_id, "class_id": req.class_id}
+    if not req.future.done():
+        out["status"] = "pending"
+    elif req.future.exception() is not None:
+        out.update(status="rejected", detail=str(req.future.exception()))
+    else:
+        out.update(status="registered", remaining_seats=req.future.result())
+    return out
+
+
+def _forget_expired_tickets() -> None:
+    now = time.monotonic()
+    with _tickets_lock:
+        for token, (req, forget_at) in list(_tickets.items()):
+            if forget_at <= now and req.future.done():
+                del _tickets[token]
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+_stats = {
+    "batches": 0,
+    "requests": 0,
+    "admitted": 0,
+    "rejected": 0,
+    "rejected_busy": 0,
+    "fallbacks": 0,
+}
+_recent_batch_sizes: deque = deque(maxlen=256)
+_recent_queue_waits: deque = deque(maxlen=1024)
+
+
+def get_stats() -> dict:
+    sizes = list(_recent_batch_sizes)
+    waits = sorted(_recent_queue_waits)
+    return {
+        **_stats,
+        "pending": _queue.qsize(),
+        "avg_recent_batch_size": sum(sizes) / len(sizes) if sizes else None,
+        "p95_queue_wait_seconds": (
+            waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else None
+        ),
+    }
+
+
+def _ensure_writer() -> None:
+    global _writer_started
+    if _writer_started:
+        return
+    with _writer_lock:
+        if not _writer_started:
+            threading.Thread(target=_writer_loop, name="admission-writer", daemon=True).start()
+            _writer_started = True
+
+
+def _take_batch() -> list[_Request]:
+    batch = [_queue.get()]
+    deadline = time.monotonic() + config.ADMISSION_BATCH_WAIT_MS / 1000
+    while len(batch) < config.ADMISSION_BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        try:
+            batch.append(_queue.get(timeout=timeout) if timeout > 0 else _queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _writer_loop() -> None:
+    while True:
+        batch = _take_batch()
+        now = time.monotonic()
+        for req in batch:
+            _recent_queue_waits.append(now - req.enqueued_at)
+        try:
+            outcomes = _apply_batch(batch)
+        except Exception:
+            # Something in the batch broke the transaction (e.g. an unknown
+            # member_id): apply requests one at a time to isolate it.
+            _stats["fallbacks"] += 1
+            outcomes = [_apply_one(req) for req in batch]
+
+        _stats["batches"] += 1
+        _stats["requests"] += len(batch)
+        _recent_batch_sizes.append(len(batch))
+        for req, outcome in zip(batch, outcomes):
+            if req.future.done():
+                continue
+            if isinstance(outcome, Exception):
+                _stats["rejected"] += 1
+                req.future.set_exception(outcome)
+            else:
+                _stats["admitted"] += 1
+                req.future.set_result(outcome)
+        _forget_expired_tickets()
+
+
+def _apply_batch(batch: list[_Request]) -> list:
+    """
+    Apply a batch in one transaction. Returns, per request, the seats left
+    after its admission or an AdmissionRejected.
+    """
+    class_ids = sorted({req.class_id for req in batch})
+    outcomes: list = [None] * len(batch)
+
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            # Seats are counted here, once per class, so the per-row
+            # capacity trigger steps aside for this transaction.
+            cur.execute("SELECT set_config('fitness.admission_batch', 'on', true);")
+            cur.execute(
+                """
+                SELECT class_id, capacity, capacity - registered_count - held_count
+                FROM class
+                WHERE class_id = ANY(%s)
+                ORDER BY class_id
+                FOR NO KEY UPDATE;
+                """,
+                (class_ids,),
+            )
+            classes = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+            cur.execute(
+                """
+                SELECT class_id, member_id
+                FROM class_registration
+                WHERE class_id = ANY(%s) AND member_id = ANY(%s);
+                """,
+                (class_ids, list({req.member_id for req in batch})),
+            )
+            taken = set(cur.fetchall())
+
+            admitted_members: list[int] = []
+            admitted_classes: list[int] = []
+            free = {cid: seats for cid, (_, seats) in classes.items()}
+            for i, req in enumerate(batch):
+                if req.class_id not in classes:
+                    outcomes[i] = AdmissionRejected(f"Class {req.class_id} does not exist")
+                elif (req.class_id, req.member_id) in taken:
+                    outcomes[i] = AdmissionRejected(
+                        f"Member {req.member_id} is already registered for class {req.class_id}"
+                    )
+                elif free[req.class_id] <= 0:
+                    outcomes[i] = AdmissionRejected(
+                        f"Class {req.class_id} is full (capacity: {classes[req.class_id][0]})"
+                    )
+                else:
+                    free[req.class_id] -= 1
+                    outcomes[i] = free[req.class_id]
+                    taken.add((req.class_id, req.member_id))
+                    admitted_members.append(req.member_id)
+                    admitted_classes.append(req.class_id)
+
+            if admitted_members:
+                cur.execute(
+                    """
+                    INSERT INTO class_registration (member_id, class_id, registered_at)
+                    SELECT m, c, NOW()
+                    FROM unnest(%s::int[], %s::int[]) AS t(m, c);
+                    """,
+                    (admitted_members, admitted_classes),
+                )
+                per_class: dict[int, int] = {}
+                for cid in admitted_classes:
+                    per_class[cid] = per_class.get(cid, 0) + 1
+                cur.execute(
+                    """
+                    UPDATE class c
+                    SET registered_count = c.registered_count + t.n
+                    FROM unnest(%s::int[], %s::int[]) AS t(class_id, n)
+                    WHERE c.class_id = t.class_id;
+                    """,
+                    (list(per_class), list(per_class.values())),
+                )
+        conn.commit()
+    return outcomes
+
+
+def _apply_one(req: _Request):
+    from app.repositories.admins_raw import register_member_for_class
+
+    try:
+        return register_member_for_class(req.member_id, req.class_id)
+    except Exception as e:
+        # First line of the database message, without CONTEXT noise.
+        return AdmissionRejected((str(e).strip().splitlines() or [repr(e)])[0])
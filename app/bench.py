@@ -0,0 +1,511 @@
+# app/bench.py
+"""
+Load test / benchmark for the HTTP API.
+
+Usage (from project root):
+    python -m app.bench seed --members 10000 --days 30
+    python -m app.bench run --backends raw orm --concurrency 32 --requests 400 \\
+        --output bench.json
+    python -m app.bench run --baseline bench.json --max-regression 0.2
+    python -m app.bench run --url http://127.0.0.1:8000      # a running server
+
+`seed` DROPS every table in DB_NAME and loads a generated dataset (see
+app.datagen). It refuses to touch a database whose name does not contain
+"bench" unless --force is given.
+
+`run` drives every scenario in SCENARIOS (at least one per route of
+app.routers) with --concurrency requests in flight, and reports per
+scenario p50/p95/p99 latency, throughput, status codes and database round
+trips per request (see app.query_stats). By default the app is called
+in-process through an ASGI transport, one subprocess per backend since
+DB_BACKEND is read at import time; with --url the requests go to that
+server instead and DB round trips are read from its Server-Timing header
+(see app.instrumentation; queries made while streaming a body are missed).
+
+Results are written as JSON (--output, else stdout):
+
+    {"meta": {...}, "results": {backend: {scenario: {...stats}}}}
+
+With --baseline, p95 latencies are compared against an earlier result
+file and the command exits with status 1 if any scenario got slower by
+more than --max-regression (and --min-delta-ms).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, NamedTuple
+from urllib.parse import quote
+
+from app import config, datagen
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+class Dataset(NamedTuple):
+    """Id ranges read from the database before a run."""
+    members: tuple[int, int]
+    trainers: tuple[int, int]
+    rooms: tuple[int, int]
+    upcoming_classes: list[int]
+
+
+def load_dataset() -> Dataset:
+    from app.db_raw import get_cursor
+
+    def id_range(table, column):
+        cur.execute(
+            f"SELECT coalesce(min({column}), 1) AS lo, coalesce(max({column}), 1) AS hi "
+            f"FROM {table};"
+        )
+        row = cur.fetchone()
+        return row["lo"], row["hi"]
+
+    with get_cursor() as cur:
+        members = id_range("member", "member_id")
+        trainers = id_range("trainer", "trainer_id")
+        rooms = id_range("room", "room_id")
+        cur.execute(
+            "SELECT class_id FROM class WHERE start_time > NOW() ORDER BY start_time LIMIT 2000;"
+        )
+        upcoming = [row["class_id"] for row in cur.fetchall()] or [1]
+    return Dataset(members, trainers, rooms, upcoming)
+
+
+# build(dataset, rng) -> (path, json body or None)
+Builder = Callable[[Dataset, random.Random], tuple[str, dict | list | None]]
+
+
+class Scenario(NamedTuple):
+    name: str
+    router: str
+    method: str
+    build: Builder
+    weight: float = 1.0   # share of --requests this scenario gets
+
+
+def _member(d: Dataset, rng: random.Random) -> int:
+    return rng.randint(*d.members)
+
+
+def _trainer(d: Dataset, rng: random.Random) -> int:
+    return rng.randint(*d.trainers)
+
+
+def _window(rng: random.Random, days: int = 7) -> tuple[str, str]:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start += timedelta(days=rng.randrange(0, 14))
+    # Query-string values: the "+" of the UTC offset must be escaped.
+    return quote(start.isoformat()), quote((start + timedelta(days=days)).isoformat())
+
+
+def _far_future_slot(rng: random.Random) -> tuple[str, str]:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start += timedelta(days=400 + rng.randrange(3650), hours=rng.randrange(24))
+    return start.isoformat(), (start + timedelta(hours=1)).isoformat()
+
+
+def _metrics_batch(d: Dataset, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    return "/members/metrics/batch", [
+        {
+            "member_id": _member(d, rng),
+            "metric_type": "heart_rate",
+            "metric_value": round(rng.uniform(55, 180), 2),
+            "measured_at": (now - timedelta(seconds=rng.randrange(86400))).isoformat(),
+        }
+        for _ in range(100)
+    ]
+
+
+def _schedule_pt(d: Dataset, rng: random.Random):
+    start, end = _far_future_slot(rng)
+    return f"/members/{_member(d, rng)}/pt-sessions", {
+        "trainer_id": _trainer(d, rng),
+        "room_id": rng.randint(*d.rooms),
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def _class_path(d: Dataset, rng: random.Random, action: str) -> str:
+    return f"/members/{_member(d, rng)}/classes/{rng.choice(d.upcoming_classes)}/{action}"
+
+
+SCENARIOS: list[Scenario] = [
+    # admins
+    Scenario("admins.db_health", "admins", "GET", lambda d, r: ("/admins/db-health", None)),
+    Scenario("admins.list_rooms", "admins", "GET", lambda d, r: ("/admins/rooms", None)),
+    Scenario("admins.list_classes", "admins", "GET",
+             lambda d, r: ("/admins/classes?limit=100", None)),
+    Scenario("admins.create_room", "admins", "POST",
+             lambda d, r: ("/admins/rooms", {"name": f"bench-{uuid.uuid4().hex}",
+                                             "capacity": 10}), 0.2),
+    Scenario("admins.admission_stats", "admins", "GET",
+             lambda d, r: ("/admins/admission-stats", None)),
+    Scenario("admins.export_ptsession", "admins", "GET",
+             lambda d, r: ("/admins/exports/ptsession", None), 0.02),
+    # members
+    Scenario("members.dashboard", "members", "GET",
+             lambda d, r: (f"/members/{_member(d, r)}/dashboard", None)),
+    Scenario("members.dashboards_batch", "members", "POST",
+             lambda d, r: ("/members/dashboards",
+                           {"after_id": _member(d, r), "limit": 500}), 0.2),
+    Scenario("members.metric_history", "members", "GET",
+             lambda d, r: (f"/members/{_member(d, r)}/metrics/history"
+                           f"?metric_type=weight&resolution=day", None)),
+    Scenario("members.add_metric", "members", "POST",
+             lambda d, r: (f"/members/{_member(d, r)}/metrics",
+                           {"metric_type": "weight",
+                            "metric_value": round(r.uniform(50, 110), 2)})),
+    Scenario("members.metrics_batch", "members", "POST", _metrics_batch, 0.2),
+    Scenario("members.schedule_pt", "members", "POST", _schedule_pt, 0.5),
+    Scenario("members.register_class", "members", "POST",
+             lambda d, r: (_class_path(d, r, "register"), None), 0.5),
+    Scenario("members.join_class", "members", "POST",
+             lambda d, r: (_class_path(d, r, "join"), None), 0.5),
+    Scenario("members.waitlist_position", "members", "GET",
+             lambda d, r: (_class_path(d, r, "waitlist"), None), 0.5),
+    # trainers
+    Scenario("trainers.list", "trainers", "GET", lambda d, r: ("/trainers", None)),
+    Scenario("trainers.free_slots", "trainers", "GET",
+             lambda d, r: (f"/trainers/{_trainer(d, r)}/free-slots"
+                           "?start={}&end={}".format(*_window(r)), None)),
+    Scenario("trainers.search_free_slots", "trainers", "GET",
+             lambda d, r: ("/trainers/free-slots?start={}&end={}".format(*_window(r, 1)),
+                           None), 0.5),
+    Scenario("trainers.availability", "trainers", "GET",
+             lambda d, r: (f"/trainers/{_trainer(d, r)}/availability", None)),
+    Scenario("trainers.schedule", "trainers", "GET",
+             lambda d, r: (f"/trainers/{_trainer(d, r)}/schedule"
+                           "?from={}&to={}".format(*_window(r, 14)), None)),
+    # auth (bcrypt-bound: few requests)
+    Scenario("auth.member_login", "auth", "POST",
+             lambda d, r: ("/auth/member-login",
+                           {"email": datagen.member_email(_member(d, r)),
+                            "password": datagen.PASSWORD}), 0.05),
+    # ui
+    Scenario("ui.home", "ui", "GET", lambda d, r: ("/ui/", None)),
+    Scenario("ui.member_dashboard", "ui", "GET", lambda d, r: ("/ui/dashboard/member", None)),
+]
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+# Request header carrying the id under which the in-process wrapper files
+# each request's QueryStats.
+_PROBE_HEADER = "x-bench-request"
+
+
+def _instrumented(app, probes: dict):
+    """ASGI wrapper: collect query_stats per request into probes[request id]."""
+    from app import query_stats
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        stats, token = query_stats.begin()
+        try:
+            await app(scope, receive, send)
+        finally:
+            query_stats.end(token)
+            for name, value in scope["headers"]:
+                if name == _PROBE_HEADER.encode():
+                    probes[value.decode()] = stats
+                    break
+
+    return wrapped
+
+
+_SERVER_TIMING_DB = re.compile(r'(?:^|,)\s*db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def _parse_server_timing(header: str | None) -> tuple[int, float] | None:
+    """(queries, db seconds) from an app.instrumentation Server-Timing header."""
+    match = _SERVER_TIMING_DB.search(header or "")
+    if match is None:
+        return None
+    return int(match.group(2)), float(match.group(1)) / 1000
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+async def _run_scenario(client, scenario: Scenario, dataset: Dataset, requests: int,
+                        concurrency: int, rng_seed: int, probes: dict | None) -> dict:
+    latencies: list[float] = []
+    queries: list[int] = []
+    db_seconds: list[float] = []
+    statuses: Counter = Counter()
+    transport_errors = 0
+    counter = itertools.count()
+
+    async def worker(worker_id: int):
+        nonlocal transport_errors
+        rng = random.Random(rng_seed * 1000 + worker_id)
+        while next(counter) < requests:
+            path, body = scenario.build(dataset, rng)
+            request_id = uuid.uuid4().hex
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(scenario.method, path, json=body,
+                                            headers={_PROBE_HEADER: request_id})
+            except Exception:
+                transport_errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+            statuses[resp.status_code] += 1
+            if probes is not None:
+                stats = probes.pop(request_id, None)
+                if stats is not None:
+                    queries.append(stats.queries)
+                    db_seconds.append(stats.db_seconds)
+            else:
+                timing = _parse_server_timing(resp.headers.get("server-timing"))
+                if timing is not None:
+                    queries.append(timing[0])
+                    db_seconds.append(timing[1])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "router": scenario.router,
+        "method": scenario.method,
+        "requests": len(latencies),
+        "transport_errors": transport_errors,
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "server_errors": sum(v for k, v in statuses.items() if k >= 500),
+        "p50_ms": _ms(_percentile(latencies, 50)),
+        "p95_ms": _ms(_percentile(latencies, 95)),
+        "p99_ms": _ms(_percentile(latencies, 99)),
+        "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": _ms(latencies[-1]) if latencies else None,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall > 0 else None,
+        "db_queries_per_request": (
+            round(sum(queries) / len(queries), 3) if queries else None
+        ),
+        "db_ms_per_request": (
+            round(sum(db_seconds) / len(db_seconds) * 1000, 3) if db_seconds else None
+        ),
+    }
+
+
+async def _run_all(args, base_url: str | None) -> dict:
+    import httpx
+
+    dataset = load_dataset()
+    scenarios = [s for s in SCENARIOS if _selected(s, args.scenarios)]
+    probes: dict | None = None
+    if base_url is None:
+        from app.main import app
+
+        probes = {}
+        transport = httpx.ASGITransport(app=_instrumented(app, probes))
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                   timeout=args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+
+    results = {}
+    async with client:
+        for scenario in scenarios:
+            n = max(1, int(args.requests * scenario.weight))
+            # Warm-up (caches, index loads, pool connections) is not measured.
+            await _run_scenario(client, scenario, dataset, min(n, args.concurrency),
+                                args.concurrency, args.seed + 1, None)
+            if probes is not None:
+                probes.clear()
+            results[scenario.name] = await _run_scenario(
+                client, scenario, dataset, n, args.concurrency, args.seed, probes
+            )
+            r = results[scenario.name]
+            print(f"  {scenario.name:32s} p50={r['p50_ms']}ms p95={r['p95_ms']}ms "
+                  f"rps={r['throughput_rps']} q/req={r['db_queries_per_request']}",
+                  file=sys.stderr)
+    return results
+
+
+def _selected(scenario: Scenario, patterns: list[str] | None) -> bool:
+    if not patterns:
+        return True
+    return any(scenario.name == p or scenario.router == p or scenario.name.startswith(p + ".")
+               for p in patterns)
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _run_backend_subprocess(backend: str, args) -> dict:
+    """Run one backend in a fresh interpreter (DB_BACKEND is read at import)."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_file = f.name
+    try:
+        cmd = [
+            sys.executable, "-m", "app.bench", "_worker",
+            "--result-file", result_file,
+            "--concurrency", str(args.concurrency),
+            "--requests", str(args.requests),
+            "--seed", str(args.seed),
+            "--timeout", str(args.timeout),
+        ]
+        if args.scenarios:
+            cmd += ["--scenarios", *args.scenarios]
+        env = {**os.environ, "DB_BACKEND": backend}
+        # The app prints to stdout on import; keep it off our JSON output.
+        subprocess.run(cmd, env=env, check=True, stdout=sys.stderr)
+        with open(result_file) as f:
+            return json.load(f)
+    finally:
+        os.unlink(result_file)
+
+
+def compare(results: dict, baseline: dict, max_regression: float,
+            min_delta_ms: float) -> list[str]:
+    """Scenarios whose p95 grew by more than max_regression (and min_delta_ms)."""
+    regressions = []
+    for backend, scenarios in results.get("results", {}).items():
+        for name, stats in scenarios.items():
+            old = baseline.get("results", {}).get(backend, {}).get(name)
+            if not old or old.get("p95_ms") is None or stats.get("p95_ms") is None:
+                continue
+            delta = stats["p95_ms"] - old["p95_ms"]
+            if delta > min_delta_ms and stats["p95_ms"] > old["p95_ms"] * (1 + max_regression):
+                regressions.append(
+                    f"{backend} {name}: p95 {old['p95_ms']}ms -> {stats['p95_ms']}ms"
+                )
+    return regressions
+
+
+def cmd_run(args) -> int:
+    if args.url:
+        results = {"external": asyncio.run(_run_all(args, args.url))}
+    else:
+        results = {}
+        for backend in args.backends:
+            print(f"[{backend}]", file=sys.stderr)
+            results[backend] = _run_backend_subprocess(backend, args)
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "db_name": config.DB_NAME,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+def cmd_worker(args) -> int:
+    results = asyncio.run(_run_all(args, None))
+    with open(args.result_file, "w") as f:
+        json.dump(results, f)
+    return 0
+
+
+def cmd_seed(args) -> int:
+    if "bench" not in config.DB_NAME and not args.force:
+        print(f"Refusing to wipe database {config.DB_NAME!r}: its name does not contain "
+              "'bench' (use --force)", file=sys.stderr)
+        return 2
+    datagen.generate(args.members, args.days, workers=args.workers,
+                     metrics_per_member=args.metrics_per_member, trainers=args.trainers)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="wipe DB_NAME and load a synthetic dataset")
+    p.add_argument("--members", type=int, default=10_000)
+    p.add_argument("--days", type=int, default=90)
+    p.add_argument("--metrics-per-member", type=int, default=20)
+    p.add_argument("--trainers", type=int, help="default: members / 250")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--force", action="store_true")
+    p.set_defaults(func=cmd_seed)
+
+    def load_options(p):
+        p.add_argument("--concurrency", type=int, default=16)
+        p.add_argument("--requests", type=int, default=400,
+                       help="requests per scenario (scaled by its weight)")
+        p.add_argument("--scenarios", nargs="*",
+                       help="scenario names or router names to run (default: all)")
+        p.add_argument("--seed", type=int, default=1)
+        p.add_argument("--timeout", type=float, default=60.0)
+
+    p = sub.add_parser("run", help="run the scenarios and report")
+    load_options(p)
+    p.add_argument("--backends", nargs="+", default=["raw", "orm"],
+                   choices=["raw", "orm", "async"])
+    p.add_argument("--url", help="benchmark a running server instead of in-process")
+    p.add_argument("--output", help="write the JSON report here (default: stdout)")
+    p.add_argument("--baseline", help="earlier report to compare p95 latencies with")
+    p.add_argument("--max-regression", type=float, default=0.2)
+    p.add_argument("--min-delta-ms", type=float, default=2.0)
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("_worker")
+    load_options(p)
+    p.add_argument("--result-file", required=True)
+    p.set_defaults(func=cmd_worker)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# app/cache.py
+"""
+Read-through cache for reference data (rooms, classes, trainers).
+
+Used by:
+- app.routers.admins (GET /admins/rooms, GET /admins/classes, invalidation
+  on POST /admins/rooms and POST /admins/classes)
+- app.routers.trainers (GET /trainers, invalidation on POST /trainers/register)
+
+Entries live for REFERENCE_CACHE_TTL seconds and are grouped by namespace
+(one per table). A write invalidates the whole namespace in this process
+immediately; the NOTIFY sent by the table's trigger (see
+init_db.create_view_trigger_indexes) invalidates it in every other worker.
+
+Each entry carries an ETag (hash of its JSON form), so list endpoints can
+answer If-None-Match with 304 Not Modified.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app import config, notify
+
+# Channel the reference-table triggers notify on; payload is the table name.
+REFERENCE_CHANNEL = "reference_change"
+
+# Table -> cache namespace it invalidates.
+TABLE_NAMESPACES = {
+    "room": "rooms",
+    "class": "classes",
+    "trainer": "trainers",
+}
+
+
+def compute_etag(value: Any) -> str:
+    body = json.dumps(jsonable_encoder(value), sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+
+class _Stats:
+    __slots__ = ("hits", "misses", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+class ReadThroughCache:
+    """
+    namespace -> {key: (value, etag, expires_at)}
+
+    Each namespace has a generation number bumped by invalidate(); a load
+    that started before an invalidation is returned but not stored, so a
+    slow read can never put pre-write data back into the cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[Any, tuple[Any, str, float]]] = {}
+        self._generations: dict[str, int] = {}
+        self._stats: dict[str, _Stats] = {}
+
+    def _stat(self, namespace: str) -> _Stats:
+        s = self._stats.get(namespace)
+        if s is None:
+            s = self._stats[namespace] = _Stats()
+        return s
+
+    async def get(self, namespace: str, key: Any,
+                  load: Callable[[], Awaitable[Any]]) -> tuple[Any, str]:
+        """Return (value, etag) for key, calling `await load()` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+            if entry is not None and entry[2] > now:
+                self._stat(namespace).hits += 1
+                return entry[0], entry[1]
+            self._stat(namespace).misses += 1
+            generation = self._generations.get(namespace, 0)
+
+        value = await load()
+        etag = compute_etag(value)
+
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                entries = self._entries.setdefault(namespace, {})
+                if len(entries) >= self._max_entries:
+                    entries.clear()
+                entries[key] = (value, etag, time.monotonic() + self._ttl)
+        return value, etag
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._entries.pop(namespace, None)
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._stat(namespace).invalidations += 1
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            namespaces = set(self._entries) | set(self._generations)
+        for namespace in namespaces:
+            self.invalidate(namespace)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for namespace, s in self._stats.items():
+                lookups = s.hits + s.misses
+                out[namespace] = {
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "hit_ratio": round(s.hits / lookups, 4) if lookups else None,
+                    "invalidations": s.invalidations,
+                    "entries": len(self._entries.get(namespace, {})),
+                }
+            return out
+
+
+reference_cache = ReadThroughCache(
+    ttl=config.REFERENCE_CACHE_TTL,
+    max_entries=config.REFERENCE_CACHE_MAX_ENTRIES,
+)
+
+
+def _on_reference_change(payload: str | None) -> None:
+    if payload is None:
+        # Listener reconnected; changes may have been missed.
+        reference_cache.invalidate_all()
+        return
+    namespace = TABLE_NAMESPACES.get(payload)
+    if namespace is not None:
+        reference_cache.invalidate(namespace)
+
+
+notify.subscribe(REFERENCE_CHANNEL, _on_reference_change)
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET helpers
+# ---------------------------------------------------------------------------
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return etag in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Clients may keep the body but must revalidate before reusing it.
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
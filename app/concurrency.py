@@ -0,0 +1,22 @@
+# app/concurrency.py
+"""
+Calling repositories from async route handlers.
+
+Used by:
+- app.routers.* (every handler is `async def`)
+
+The *_async repositories are coroutine functions and are awaited on the
+event loop; the *_raw / *_orm ones (and the sync fallbacks the async
+repositories re-export) block, so they run in Starlette's threadpool.
+"""
+
+import inspect
+
+from fastapi.concurrency import run_in_threadpool
+
+
+async def call_repo(fn, *args, **kwargs):
+    """Await `fn(*args, **kwargs)`, off the event loop if `fn` is synchronous."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
@@ -6,5 +6,101 @@ DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "fitness_club")
 DB_USER = os.getenv("DB_USER", "postgres") 
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+# Session TimeZone of every app connection (IANA name). Naive datetimes from
+# clients are read in this zone, by Postgres and by app.interval_index alike.
+# asyncpg sends naive values as UTC, so keep UTC with DB_BACKEND=async.
+DB_TIMEZONE = os.getenv("DB_TIMEZONE", "UTC")
 
 USE_ORM = os.getenv("USE_ORM", "false").lower() == "true"
+
+# Connection pool for the raw-SQL path (app.db_raw)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))            # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # seconds before a connection is recycled
+DB_POOL_CHECK_IDLE = float(os.getenv("DB_POOL_CHECK_IDLE", "30"))     # ping connections idle longer than this
+
+# In-process schedule index (app.interval_index)
+SCHEDULE_INDEX_TTL = float(os.getenv("SCHEDULE_INDEX_TTL", "300"))               # seconds between full reloads
+SCHEDULE_INDEX_HORIZON_DAYS = int(os.getenv("SCHEDULE_INDEX_HORIZON_DAYS", "7"))  # past days kept in memory
+CLASS_DURATION_MINUTES = int(os.getenv("CLASS_DURATION_MINUTES", "60"))          # class rows have no end_time
+
+# Password hashing process pool (app.hashing)
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(4 * HASH_POOL_WORKERS)))  # queued + running
+HASH_QUEUE_TIMEOUT = float(os.getenv("HASH_QUEUE_TIMEOUT", "2"))  # seconds to wait for a queue slot
+
+# Session store (app.security)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")      # memory | database | file
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(8 * 3600)))   # idle seconds before a session expires
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "60"))  # min seconds between expiry extensions
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "5"))  # per-process cache of verified tokens
+SESSION_PURGE_INTERVAL = float(os.getenv("SESSION_PURGE_INTERVAL", "60"))
+SESSION_FILE = os.getenv(
+    "SESSION_FILE",
+    "/dev/shm/fitness_club_sessions.db" if os.path.isdir("/dev/shm") else "fitness_club_sessions.db",
+)
+
+# Session token format (app.security)
+#   server - opaque random token looked up in SESSION_BACKEND
+#   signed - self-contained HMAC-signed token, verified without a lookup;
+#            SESSION_BACKEND then only holds the revocation list
+SESSION_MODE = os.getenv("SESSION_MODE", "server")
+# "kid:secret,kid:secret,..."; the first key signs new tokens, all verify
+# (append the old key when rotating, drop it once its tokens have expired).
+SESSION_SIGNING_KEYS = os.getenv("SESSION_SIGNING_KEYS", "")
+
+# Repository backend used by the routers:
+#   raw   - psycopg2 + app.db_raw pool (default)
+#   orm   - SQLAlchemy sync sessions (same as USE_ORM=true)
+#   async - SQLAlchemy asyncio + asyncpg (app.db_async), awaited directly
+DB_BACKEND = os.getenv("DB_BACKEND", "orm" if USE_ORM else "raw").lower()
+if DB_BACKEND not in ("raw", "orm", "async"):
+    raise ValueError(f"Unknown DB_BACKEND {DB_BACKEND!r}")
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+DB_ASYNC_POOL_TIMEOUT = float(os.getenv("DB_ASYNC_POOL_TIMEOUT", "5"))
+
+# Reference-data cache for rooms / classes / trainers (app.cache)
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "1000"))  # per namespace
+
+# Class waitlist (app.repositories.waitlist_*)
+WAITLIST_LOCK_TIMEOUT_MS = int(os.getenv("WAITLIST_LOCK_TIMEOUT_MS", "200"))  # max wait for a class row before queueing
+WAITLIST_SWEEP_INTERVAL = float(os.getenv("WAITLIST_SWEEP_INTERVAL", "5"))    # seconds between hold expiry sweeps
+
+# Queued admission for flagged classes (app.admission)
+ADMISSION_BATCH_SIZE = int(os.getenv("ADMISSION_BATCH_SIZE", "500"))
+ADMISSION_BATCH_WAIT_MS = float(os.getenv("ADMISSION_BATCH_WAIT_MS", "5"))     # linger to fill a batch
+ADMISSION_MAX_PENDING = int(os.getenv("ADMISSION_MAX_PENDING", "20000"))
+ADMISSION_RESULT_TIMEOUT = float(os.getenv("ADMISSION_RESULT_TIMEOUT", "10"))  # then answer 202 + poll token
+ADMISSION_RESULT_TTL = float(os.getenv("ADMISSION_RESULT_TTL", "300"))         # how long poll tokens stay valid
+ADMISSION_MODE_CACHE_TTL = float(os.getenv("ADMISSION_MODE_CACHE_TTL", "2"))
+
+# Request instrumentation (app.instrumentation)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"              # per-route metrics, GET /metrics
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"  # Server-Timing response header
+
+# Slow-query log (app.slow_queries)
+SLOW_QUERY_ENABLED = os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))            # share of executions kept for percentiles
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))    # least recently seen are evicted
+SLOW_QUERY_WINDOW = int(os.getenv("SLOW_QUERY_WINDOW", "512"))                        # latencies kept per fingerprint
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() == "true"       # EXPLAIN (ANALYZE, BUFFERS) slow SELECTs
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))  # seconds between plans per fingerprint
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "5000"))
+
+# Calendar feeds and schedule sync (app.ical, app.repositories.calendar_*)
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", "30"))        # .ics window: days back
+CALENDAR_FEED_FUTURE_DAYS = int(os.getenv("CALENDAR_FEED_FUTURE_DAYS", "180"))   # .ics window: days ahead
+CALENDAR_FEED_MAX_ITEMS = int(os.getenv("CALENDAR_FEED_MAX_ITEMS", "5000"))      # per feed / sync page
+CALENDAR_REFRESH_MINUTES = int(os.getenv("CALENDAR_REFRESH_MINUTES", "15"))      # polling hint sent to clients
+CALENDAR_TOMBSTONE_RETENTION_DAYS = int(os.getenv("CALENDAR_TOMBSTONE_RETENTION_DAYS", "30"))  # older sync tokens get a full resync
+CALENDAR_PRUNE_INTERVAL = float(os.getenv("CALENDAR_PRUNE_INTERVAL", "3600"))    # seconds between tombstone prunes
+
+# Server-sent schedule events (app.events)
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))                  # frames buffered per subscriber, then "resync"
+EVENTS_COALESCE_MS = float(os.getenv("EVENTS_COALESCE_MS", "250"))              # occupancy updates per class merged (0: off)
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))                   # seconds between keep-alive comments
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "10000"))      # open streams per worker
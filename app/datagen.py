@@ -0,0 +1,427 @@
+# app/datagen.py
+"""
+Synthetic data generator for capacity testing.
+
+Usage (from project root):
+    python -m app.init_db --members 1000000 --days 365 [--workers 8]
+
+Used by:
+- app.init_db (when --members is given, instead of the hand-written sample)
+- app.bench (seed)
+
+Fills all ten tables with correlated data: members get a persona
+(baseline weight / resting heart rate, activity level, PT client or not)
+that drives their metric series, goals, class registrations and PT
+sessions; trainers work five-day morning or evening shifts that bound their
+classes and PT sessions; classes fill up according to how far away they
+are.
+
+Loading:
+    1. recreate the tables and drop their foreign keys
+    2. COPY the rows from --workers processes in parallel. Work is split
+       into units (a block of members, or a block of days) with explicit
+       ids derived from the unit, so units never collide and the output is
+       the same for any worker count
+    3. re-add the foreign keys (one validation pass each), move the
+       sequences past the loaded ids
+    4. init_db.create_view_trigger_indexes: indexes, triggers and
+       constraints are built once over the loaded data, and the derived
+       tables (dashboard summary, metric rollups, seat counters) are
+       backfilled in bulk instead of row by row through triggers
+"""
+
+import io
+import multiprocessing
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, NamedTuple
+
+import psycopg2
+
+from app import config
+
+# All generated accounts share this password.
+PASSWORD = "password123"
+
+_FIRST_NAMES = (
+    "Alice", "Bob", "Carol", "David", "Emma", "Farid", "Grace", "Hiro", "Ines",
+    "Jamal", "Kara", "Liam", "Maya", "Noah", "Olga", "Priya", "Quinn", "Rosa",
+    "Sami", "Tara", "Umar", "Vera", "Wei", "Ximena", "Yusuf", "Zoe",
+)
+_LAST_NAMES = (
+    "Johnson", "Smith", "White", "Lee", "Garcia", "Nguyen", "Martin", "Brown",
+    "Tremblay", "Roy", "Singh", "Chen", "Wilson", "Lopez", "Khan", "Kim",
+    "Haddad", "Murphy", "Rossi", "Novak", "Silva", "Cohen", "Moreau", "Park",
+)
+_SPECIALIZATIONS = ("Strength Training", "Cardio & HIIT", "Yoga & Pilates", "CrossFit", "Spin")
+_CLASS_NAMES = ("Morning Yoga", "HIIT Blast", "Spin Express", "Pilates Core",
+                "Power Lift", "Zumba", "Boxing Fit", "Stretch & Recover")
+
+CLASS_HOURS = (7, 9, 12, 17, 18, 19)
+OPEN_HOUR, CLOSE_HOUR = 6, 22
+SHIFTS = ((6, 14), (14, 22))     # trainer t works SHIFTS[t % 2]
+
+# Units of parallel work.
+MEMBERS_PER_UNIT = 5_000
+DAYS_PER_UNIT = 7
+_COPY_CHUNK_ROWS = 50_000
+
+
+class Plan(NamedTuple):
+    """Sizes and id layout shared by every unit."""
+    members: int
+    trainers: int
+    studios: int          # room_id 1..studios (classes)
+    private_rooms: int    # room_id studios+1.. (PT sessions)
+    days: int             # history, up to today
+    future_days: int
+    metrics_per_member: int
+    start_day: datetime   # midnight UTC of the first day
+    seed: int
+
+    @property
+    def total_days(self) -> int:
+        return self.days + self.future_days
+
+    @property
+    def max_metrics(self) -> int:
+        return 2 * self.metrics_per_member + 1
+
+
+def make_plan(members: int, days: int, future_days: int = 28,
+              metrics_per_member: int = 20, trainers: int | None = None,
+              seed: int = 42) -> Plan:
+    trainers = trainers or max(4, members // 250)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return Plan(
+        members=members,
+        trainers=trainers,
+        studios=max(2, trainers // 20),
+        private_rooms=max(2, trainers // 10),
+        days=days,
+        future_days=future_days,
+        metrics_per_member=metrics_per_member,
+        start_day=today - timedelta(days=days),
+        seed=seed,
+    )
+
+
+def member_name(member_id: int) -> tuple[str, str]:
+    return (_FIRST_NAMES[member_id * 7 % len(_FIRST_NAMES)],
+            _LAST_NAMES[member_id * 13 % len(_LAST_NAMES)])
+
+
+def member_email(member_id: int) -> str:
+    first, last = member_name(member_id)
+    return f"{first.lower()}.{last.lower()}.{member_id}@example.com"
+
+
+def trainer_email(trainer_id: int) -> str:
+    return f"trainer{trainer_id}@gym.com"
+
+
+# ---------------------------------------------------------------------------
+# COPY helpers
+# ---------------------------------------------------------------------------
+
+def _connect():
+    return psycopg2.connect(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+    )
+
+
+def _format(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def copy_rows(cur, table: str, columns: list[str], rows: Iterable[tuple]) -> int:
+    """COPY rows (text format, no tabs/newlines/backslashes in values) in chunks."""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    buf = io.StringIO()
+    pending = total = 0
+    for row in rows:
+        buf.write("\t".join(map(_format, row)))
+        buf.write("\n")
+        pending += 1
+        if pending >= _COPY_CHUNK_ROWS:
+            buf.seek(0)
+            cur.copy_expert(sql, buf)
+            total += pending
+            buf, pending = io.StringIO(), 0
+    if pending:
+        buf.seek(0)
+        cur.copy_expert(sql, buf)
+        total += pending
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Generators (pure functions of the plan and the unit)
+# ---------------------------------------------------------------------------
+
+def _persona(plan: Plan, member_id: int) -> tuple:
+    """(gender, baseline weight, resting hr, activity 0..1, joined day index)."""
+    rng = random.Random(plan.seed * 1_000_003 + member_id)
+    gender = rng.choice(("Female", "Male", "Female", "Male", None))
+    weight = rng.gauss(66 if gender == "Female" else 82, 11)
+    resting_hr = rng.gauss(68, 7)
+    activity = rng.betavariate(2, 3)
+    joined = int(rng.random() ** 2 * plan.days)   # most members are long-standing
+    return gender, max(40.0, weight), min(95.0, max(45.0, resting_hr)), activity, joined
+
+
+def gen_member_unit(plan: Plan, first: int, last: int, password_hash: str):
+    """members first..last (inclusive) with their metrics and goals."""
+    members, metrics, goals = [], [], []
+    for member_id in range(first, last + 1):
+        gender, weight, resting_hr, activity, joined = _persona(plan, member_id)
+        rng = random.Random(plan.seed * 7_000_003 + member_id)
+        first_name, last_name = member_name(member_id)
+        dob = date(1950, 1, 1) + timedelta(days=rng.randrange(50 * 365))
+        members.append((member_id, f"{first_name} {last_name}", dob, gender,
+                        member_email(member_id),
+                        f"613-{rng.randrange(200, 999)}-{rng.randrange(1000, 9999)}",
+                        password_hash))
+
+        # Active members log more; weight drifts toward a goal, heart rate
+        # readings are resting or mid-workout.
+        n = min(plan.max_metrics - 1, int(plan.metrics_per_member * 2 * activity))
+        span = (plan.days - joined) * 86400
+        times = sorted(rng.uniform(0, span) for _ in range(n)) if span > 0 else []
+        drift = -rng.uniform(0, 0.03) if weight > 75 else rng.uniform(-0.01, 0.01)
+        base_id = (member_id - 1) * plan.max_metrics
+        for j, offset in enumerate(times):
+            at = plan.start_day + timedelta(days=joined, seconds=offset)
+            if j % 2 == 0:
+                value = weight + drift * offset / 86400 + rng.gauss(0, 0.4)
+                metrics.append((base_id + j + 1, member_id, "weight", value, at))
+            else:
+                value = resting_hr + (rng.uniform(40, 90) if rng.random() < activity else 0)
+                metrics.append((base_id + j + 1, member_id, "heart_rate", value, at))
+
+        for k in range(rng.choice((0, 1, 1, 2))):
+            goal_type = ("weight", "heart_rate")[k]
+            target = weight - rng.uniform(2, 10) if goal_type == "weight" else resting_hr - 5
+            created = plan.start_day + timedelta(days=min(plan.days, joined + rng.randrange(30)))
+            status = "completed" if rng.random() < 0.2 else "active"
+            goals.append(((member_id - 1) * 2 + k + 1, member_id, goal_type, target,
+                          status, created))
+    return members, metrics, goals
+
+
+def _class_id(plan: Plan, day: int, studio: int, hour_idx: int) -> int:
+    return (day * plan.studios + studio) * len(CLASS_HOURS) + hour_idx + 1
+
+
+def _pt_id(plan: Plan, day: int, hour: int, room: int) -> int:
+    return (day * (CLOSE_HOUR - OPEN_HOUR) + hour - OPEN_HOUR) * plan.private_rooms + room + 1
+
+
+def _works(trainer_id: int, day: int) -> bool:
+    return (trainer_id + day) % 7 < 5
+
+
+def gen_day_unit(plan: Plan, first_day: int, last_day: int):
+    """availability, classes, registrations and PT sessions for days first..last."""
+    availability, classes, registrations, sessions = [], [], [], []
+    today_idx = plan.days
+    pt_clients = plan.members // 10   # every tenth member books PT sessions
+    for day in range(first_day, last_day + 1):
+        rng = random.Random(plan.seed * 9_000_011 + day)
+        midnight = plan.start_day + timedelta(days=day)
+        for t in range(1, plan.trainers + 1):
+            if _works(t, day):
+                lo, hi = SHIFTS[t % 2]
+                availability.append((day * plan.trainers + t, t,
+                                     midnight + timedelta(hours=lo),
+                                     midnight + timedelta(hours=hi)))
+
+        # Booking levels fall off for days further in the future.
+        fill = 0.9 if day < today_idx else max(0.1, 0.9 - 0.03 * (day - today_idx))
+
+        for hour in range(OPEN_HOUR, CLOSE_HOUR):
+            start = midnight + timedelta(hours=hour)
+            on_shift = [t for t in range(1, plan.trainers + 1)
+                        if _works(t, day) and SHIFTS[t % 2][0] <= hour < SHIFTS[t % 2][1]]
+            rng.shuffle(on_shift)
+
+            if hour in CLASS_HOURS:
+                hour_idx = CLASS_HOURS.index(hour)
+                for studio in range(min(plan.studios, len(on_shift))):
+                    trainer_id = on_shift.pop()
+                    capacity = rng.choice((15, 20, 25, 30))
+                    class_id = _class_id(plan, day, studio, hour_idx)
+                    taken = min(capacity, plan.members, int(capacity * fill * rng.uniform(0.6, 1.1)))
+                    classes.append((class_id, rng.choice(_CLASS_NAMES), start, capacity,
+                                    taken, trainer_id, studio + 1))
+                    for member_id in rng.sample(range(1, plan.members + 1), taken):
+                        registered = start - timedelta(seconds=rng.uniform(3600, 14 * 86400))
+                        registrations.append((member_id, class_id, registered))
+
+            booked = min(plan.private_rooms, len(on_shift), pt_clients,
+                         int(plan.private_rooms * fill * rng.uniform(0.4, 0.8)))
+            members = rng.sample(range(1, pt_clients + 1), booked)
+            for room in range(booked):
+                sessions.append((_pt_id(plan, day, hour, room), members[room] * 10,
+                                 on_shift[room], plan.studios + room + 1,
+                                 start, start + timedelta(hours=1)))
+    return availability, classes, registrations, sessions
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _load_unit(args) -> tuple[str, int, float]:
+    plan, kind, first, last, password_hash = args
+    t0 = time.perf_counter()
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            if kind == "members":
+                members, metrics, goals = gen_member_unit(plan, first, last, password_hash)
+                n = copy_rows(cur, "member", ["member_id", "name", "dob", "gender", "email",
+                                              "phone", "password_hash"], members)
+                n += copy_rows(cur, "health_metric", ["metric_id", "member_id", "metric_type",
+                                                      "metric_value", "measured_at"], metrics)
+                n += copy_rows(cur, "fitness_goal", ["goal_id", "member_id", "goal_type",
+                                                     "target_value", "status", "created_at"], goals)
+            else:
+                availability, classes, registrations, sessions = gen_day_unit(plan, first, last)
+                n = copy_rows(cur, "trainer_availability",
+                              ["availability_id", "trainer_id", "start_time", "end_time"],
+                              availability)
+                n += copy_rows(cur, "class", ["class_id", "name", "start_time", "capacity",
+                                              "registered_count", "trainer_id", "room_id"],
+                               classes)
+                n += copy_rows(cur, "class_registration",
+                               ["member_id", "class_id", "registered_at"], registrations)
+                n += copy_rows(cur, "ptsession", ["session_id", "member_id", "trainer_id",
+                                                  "room_id", "start_time", "end_time"], sessions)
+        conn.commit()
+    finally:
+        conn.close()
+    return f"{kind} {first}-{last}", n, time.perf_counter() - t0
+
+
+def _reset_tables() -> list[tuple[str, str, str]]:
+    """Recreate the tables; drop and return their foreign keys (table, name, definition)."""
+    from sqlalchemy import text
+
+    from app.db_orm import engine
+    from app.models.orm_models import Base
+
+    with engine.connect() as conn:
+        conn.execute(text("DROP VIEW IF EXISTS member_dashboard_view CASCADE;"))
+        conn.commit()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        fks = conn.execute(text(
+            """
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE contype = 'f' AND connamespace = 'public'::regnamespace;
+            """
+        )).all()
+        for table, name, _ in fks:
+            conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}";'))
+    return [tuple(fk) for fk in fks]
+
+
+def generate(members: int, days: int, workers: int = 4, future_days: int = 28,
+             metrics_per_member: int = 20, trainers: int | None = None,
+             seed: int = 42) -> Plan:
+    """Drop every table in DB_NAME and load a generated dataset. Returns the plan."""
+    from passlib.hash import bcrypt
+    from sqlalchemy import text
+
+    from app.db_orm import SessionLocal, engine
+    from app.init_db import create_view_trigger_indexes
+
+    plan = make_plan(members, days, future_days, metrics_per_member, trainers, seed)
+    print("=" * 60)
+    print(f"Generating: {plan.members} members, {plan.trainers} trainers, "
+          f"{plan.studios} studios + {plan.private_rooms} PT rooms, "
+          f"{plan.days} days of history + {plan.future_days} ahead")
+    t_start = time.perf_counter()
+
+    foreign_keys = _reset_tables()
+    password_hash = bcrypt.hash(PASSWORD)   # one hash, shared by every account
+
+    rng = random.Random(seed)
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            copy_rows(cur, "admin", ["admin_id", "name", "email", "password_hash"],
+                      [(1, "John Admin", "admin@gym.com", password_hash),
+                       (2, "Sarah Manager", "sarah.manager@gym.com", password_hash)])
+            copy_rows(cur, "room", ["room_id", "name", "capacity"],
+                      [(r + 1, f"Studio {r + 1}", 30) for r in range(plan.studios)]
+                      + [(plan.studios + r + 1, f"Private Room {r + 1}", 2)
+                         for r in range(plan.private_rooms)])
+            copy_rows(cur, "trainer",
+                      ["trainer_id", "name", "email", "specialization", "password_hash"],
+                      [(t, "{} {}".format(*member_name(t * 31)), trainer_email(t),
+                        rng.choice(_SPECIALIZATIONS), password_hash)
+                       for t in range(1, plan.trainers + 1)])
+        conn.commit()
+    finally:
+        conn.close()
+
+    units = [(plan, "members", first, min(first + MEMBERS_PER_UNIT - 1, plan.members),
+              password_hash)
+             for first in range(1, plan.members + 1, MEMBERS_PER_UNIT)]
+    units += [(plan, "days", first, min(first + DAYS_PER_UNIT, plan.total_days) - 1,
+               password_hash)
+              for first in range(0, plan.total_days, DAYS_PER_UNIT)]
+
+    t0 = time.perf_counter()
+    rows = 0
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for i, (label, n, seconds) in enumerate(pool.imap_unordered(_load_unit, units), 1):
+            rows += n
+            print(f"  [{i}/{len(units)}] {label}: {n} rows in {seconds:.1f}s")
+    print(f"Loaded {rows} rows in {time.perf_counter() - t0:.1f}s")
+
+    print("Re-adding foreign keys...")
+    with engine.begin() as conn:
+        for table, name, definition in foreign_keys:
+            conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition};'))
+        for table, column in (("admin", "admin_id"), ("room", "room_id"),
+                              ("trainer", "trainer_id"), ("member", "member_id"),
+                              ("health_metric", "metric_id"), ("fitness_goal", "goal_id"),
+                              ("trainer_availability", "availability_id"),
+                              ("class", "class_id"), ("ptsession", "session_id")):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                f"COALESCE(MAX({column}), 0) + 1, false) FROM {table};"
+            ))
+
+    db = SessionLocal()
+    try:
+        db.execute(text("SET maintenance_work_mem = '512MB';"))
+        create_view_trigger_indexes(db)
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE;"))
+
+    print(f"Done in {time.perf_counter() - t_start:.1f}s")
+    print("All accounts use password: " + PASSWORD)
+    print("=" * 60)
+    return plan
@@ -0,0 +1,32 @@
+# app/db_async.py
+"""
+Async engine for the *_async repositories (DB_BACKEND=async).
+
+SQLAlchemy's asyncio extension over asyncpg, with its own connection pool.
+Only imported when DB_BACKEND=async, so asyncpg is not needed otherwise.
+"""
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import config, query_stats
+
+SQLALCHEMY_ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{config.DB_USER}:{config.DB_PASSWORD}"
+    f"@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}"
+)
+
+engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    pool_size=config.DB_ASYNC_POOL_SIZE,
+    max_overflow=config.DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=config.DB_ASYNC_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    connect_args={"server_settings": {"timezone": config.DB_TIMEZONE}},
+)
+query_stats.instrument_engine(engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+async def close_engine() -> None:
+    """Close every pooled connection (app shutdown)."""
+    await engine.dispose()
@@ -9,24 +9,348 @@ Used by the "raw SQL" repositories, e.g.:
 
 Exposes:
 
-    get_connection()  -> plain psycopg2 connection
+    get_connection()  -> pooled psycopg2 connection
     get_cursor(...)   -> context manager yielding a dict-like cursor
     get_connection_ctx() -> optional (conn, cur) context manager
+    get_named_cursor(...) -> server-side cursor for streaming large results
+    close_pool()      -> close every pooled connection (app shutdown)
 
-All DB settings come from app.config.
+Connections come from a process-wide pool (see ConnectionPool) instead of
+being opened per call, so a request that runs several queries no longer pays
+one TCP + auth handshake per query. Leaving a `with` block hands the
+connection back to the pool rather than closing it.
+
+All DB settings (including DB_POOL_*) come from app.config.
 """
 
+import os
+import threading
+import time
+import uuid
 from contextlib import contextmanager
 
 import psycopg2
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
 
-from app import config
+from app import config, query_stats
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled connection became free within DB_POOL_TIMEOUT."""
+
+
+# ---------------------------------------------------------------------------
+# Cursors that report each round trip to app.query_stats
+# ---------------------------------------------------------------------------
+
+class _CountingCursorMixin:
+    def _statement(self, query) -> str | None:
+        if isinstance(query, str):
+            return query
+        if isinstance(query, bytes):
+            return query.decode(errors="replace")
+        try:
+            return query.as_string(self)   # psycopg2.sql.Composed
+        except Exception:
+            return None
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            query_stats.record(time.perf_counter() - start, self._statement(query), vars, True)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            query_stats.record(time.perf_counter() - start, self._statement(query))
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            query_stats.record(time.perf_counter() - start, self._statement(sql))
+
+
+class _CountingCursor(_CountingCursorMixin, extensions.cursor):
+    pass
+
+
+class _CountingRealDictCursor(_CountingCursorMixin, RealDictCursor):
+    pass
+
+
+_COUNTING_FACTORIES = {
+    None: _CountingCursor,
+    extensions.cursor: _CountingCursor,
+    RealDictCursor: _CountingRealDictCursor,
+}
+
+
+class _CountingConnection(extensions.connection):
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory")
+        kwargs["cursor_factory"] = _COUNTING_FACTORIES.get(factory, factory)
+        return super().cursor(*args, **kwargs)
+
+
+def _connect():
+    return psycopg2.connect(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        options=f"-c timezone={config.DB_TIMEZONE}",
+        connection_factory=_CountingConnection,
+    )
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    - keeps between min_size and max_size open connections
+    - pings connections that sat idle longer than check_idle on checkout
+    - recycles connections older than max_lifetime
+    - waits at most `timeout` seconds for a free connection, then raises
+      PoolExhaustedError
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        timeout: float,
+        max_lifetime: float,
+        check_idle: float,
+        connect=_connect,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self._connect = connect
+
+        self._cond = threading.Condition()
+        self._idle: list = []        # LIFO stack of idle connections
+        self._created: dict = {}     # conn -> creation time
+        self._last_used: dict = {}   # conn -> time it was returned
+        self._size = 0               # idle + checked out
+        self._closed = False
+
+        for _ in range(min_size):
+            conn = self._open()
+            self._idle.append(conn)
+
+    # -- internal helpers --------------------------------------------------
+
+    def _open(self):
+        conn = self._connect()
+        now = time.monotonic()
+        with self._cond:
+            self._size += 1
+            self._created[conn] = now
+            self._last_used[conn] = now
+        return conn
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._created.pop(conn, None)
+            self._last_used.pop(conn, None)
+            self._cond.notify()
+
+    def _expired(self, conn) -> bool:
+        return time.monotonic() - self._created.get(conn, 0.0) > self.max_lifetime
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed or self._expired(conn):
+            return False
+        if time.monotonic() - self._last_used.get(conn, 0.0) < self.check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    # -- public API ------------------------------------------------------------
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            grow = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolExhaustedError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # reserve the slot now, connect outside the lock
+                        self._size += 1
+                        grow = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            f"No database connection available within {self.timeout:g}s "
+                            f"(pool max size {self.max_size} reached)"
+                        )
+                    self._cond.wait(remaining)
+
+            if grow:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                now = time.monotonic()
+                with self._cond:
+                    self._created[conn] = now
+                    self._last_used[conn] = now
+                return conn
+
+            if self._healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn) -> None:
+        if conn.closed or self._expired(conn):
+            self._discard(conn)
+            return
+        try:
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                closing = True
+            else:
+                closing = False
+                self._last_used[conn] = time.monotonic()
+                self._idle.append(conn)
+                self._cond.notify()
+        if closing:
+            self._discard(conn)
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+
+class _PooledConnection:
+    """
+    Thin proxy around a pooled psycopg2 connection.
+
+    Behaves like the real connection (cursor(), commit(), ...), and
+    `with get_connection() as conn:` still commits on success / rolls back
+    on error; on top of that, leaving the block (or calling close())
+    returns the connection to the pool.
+    """
+
+    def __init__(self, pool: ConnectionPool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+
+_pool: ConnectionPool | None = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the process-wide pool, creating it on first use (and again after
+    a fork, since connections must not be shared between processes).
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(
+                min_size=config.DB_POOL_MIN_SIZE,
+                max_size=config.DB_POOL_MAX_SIZE,
+                timeout=config.DB_POOL_TIMEOUT,
+                max_lifetime=config.DB_POOL_MAX_LIFETIME,
+                check_idle=config.DB_POOL_CHECK_IDLE,
+            )
+            _pool_pid = pid
+    return _pool
+
+
+def close_pool() -> None:
+    """Close all pooled connections (called on app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
 
 
 def get_connection():
     """
-    Open and return a new psycopg2 connection using app.config settings.
+    Check out a psycopg2 connection from the pool.
 
     Example:
 
@@ -38,16 +362,17 @@ def get_connection():
                 print(cur.fetchone())
 
     The connection's context manager will commit on success and roll back
-    on exception.
+    on exception, then return the connection to the pool. Callers that do
+    not use `with` must call conn.close() to give it back.
+
+    Raises PoolExhaustedError if every connection stays busy for longer
+    than DB_POOL_TIMEOUT seconds.
     """
-    conn = psycopg2.connect(
-        host=config.DB_HOST,
-        port=config.DB_PORT,
-        dbname=config.DB_NAME,
-        user=config.DB_USER,
-        password=config.DB_PASSWORD,
-    )
-    return conn
+    pool = get_pool()
+    start = time.perf_counter()
+    conn = pool.getconn()
+    query_stats.record_acquire(time.perf_counter() - start)
+    return _PooledConnection(pool, conn)
 
 
 @contextmanager
@@ -104,3 +429,34 @@ def get_connection_ctx():
     finally:
         cur.close()
         conn.close()
+
+
+@contextmanager
+def get_named_cursor(itersize: int = 1000, cursor_factory=RealDictCursor):
+    """
+    Server-side (named) cursor for streaming large result sets:
+
+        with get_named_cursor(itersize=1000) as cur:
+            cur.execute("SELECT * FROM health_metric")
+            for row in cur:          # fetched itersize rows at a time
+                ...
+
+    Rows are RealDictCursor dicts by default (pass cursor_factory=None for
+    plain tuples). Iteration, or fetchmany(n), pulls rows from the server
+    in batches, so only one batch is held in memory at a time; the
+    connection stays checked out until the block exits.
+    Read-only: the transaction is rolled back when the block exits.
+    """
+    conn = get_connection()
+    cur = conn.cursor(
+        name=f"stream_{uuid.uuid4().hex}",
+        cursor_factory=cursor_factory,
+    )
+    cur.itersize = itersize
+    try:
+        yield cur
+    finally:
+        try:
+            cur.close()
+        finally:
+            conn.close()
@@ -0,0 +1,218 @@
+# app/events.py
+"""
+Server-sent events (SSE) for live dashboards: class occupancy, class
+registrations, PT bookings and trainer availability.
+
+Used by:
+- app.routers.admins (GET /admins/events, GET /admins/event-stats)
+- app.routers.trainers (GET /trainers/{trainer_id}/events)
+- app.routers.members (GET /members/{member_id}/events)
+
+Triggers created by init_db.create_view_trigger_indexes (section 8) NOTIFY
+EVENTS_CHANNEL with a small JSON payload. The worker's single app.notify
+listener connection hands each payload to this module. The module hops
+onto the event loop once per notification, not once per subscriber, and
+fans the event out to the streams subscribed to one of its topics:
+
+    ("all",)            everything (admin dashboards)
+    ("trainer", id)     the trainer's class occupancy, PT bookings, availability
+    ("member", id)      the member's PT bookings and class registrations
+    ("class", id)       occupancy of one class
+
+Each event is encoded as an SSE frame once, and the same bytes are queued
+for every subscriber. Occupancy updates are coalesced per class for
+EVENTS_COALESCE_MS, so a registration rush sends the latest count a few
+times a second instead of once per seat.
+
+A subscriber whose queue (EVENTS_QUEUE_SIZE) fills up loses what is queued
+and gets a "resync" event instead. So does everyone after the listener
+reconnects. Clients reload on "resync" and on "ready", which starts every
+stream, including after EventSource reconnects.
+"""
+
+import asyncio
+import json
+from collections import Counter
+
+from fastapi.responses import StreamingResponse
+
+from app import config, notify
+
+EVENTS_CHANNEL = "schedule_events"
+
+Topic = tuple
+
+
+class EventsBusyError(RuntimeError):
+    """Raised when EVENTS_MAX_SUBSCRIBERS streams are already open in this worker."""
+
+
+def _frame(event_type: str, data: dict) -> bytes:
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+# Sent first on every stream: reconnect delay for EventSource, then "ready".
+_READY = b"retry: 3000\n\n" + _frame("ready", {})
+_RESYNC = _frame("resync", {})
+_HEARTBEAT = b": keep-alive\n\n"
+
+
+class Subscriber:
+    __slots__ = ("topics", "queue")
+
+    def __init__(self, topics: list[Topic]):
+        self.topics = topics
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=config.EVENTS_QUEUE_SIZE)
+
+    def push(self, frame: bytes) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog, tell it to reload.
+            _stats["resyncs"] += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+
+
+# Touched only on the event loop thread, except the emptiness check in
+# _on_notify.
+_loop: asyncio.AbstractEventLoop | None = None
+_by_topic: dict[Topic, set[Subscriber]] = {}
+_subscribers: set[Subscriber] = set()
+_pending_occupancy: dict[int, dict] = {}
+_stats = Counter()
+
+
+# ---------------------------------------------------------------------------
+# Listener thread -> event loop
+# ---------------------------------------------------------------------------
+
+def _on_notify(payload: str | None) -> None:
+    loop = _loop
+    if loop is None or not _subscribers:
+        return
+    try:
+        loop.call_soon_threadsafe(_dispatch, payload)
+    except RuntimeError:
+        pass   # loop closed (shutdown)
+
+
+notify.subscribe(EVENTS_CHANNEL, _on_notify)
+
+
+def _dispatch(payload: str | None) -> None:
+    _stats["notifications"] += 1
+    if payload is None:
+        # Listener reconnected; events may have been missed.
+        for sub in _subscribers:
+            sub.push(_RESYNC)
+        return
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        return
+    if event.get("type") == "class_occupancy" and config.EVENTS_COALESCE_MS > 0:
+        if not _pending_occupancy:
+            _loop.call_later(config.EVENTS_COALESCE_MS / 1000, _flush_occupancy)
+        _pending_occupancy[event["class_id"]] = event
+        return
+    _publish(event)
+
+
+def _flush_occupancy() -> None:
+    pending = list(_pending_occupancy.values())
+    _pending_occupancy.clear()
+    for event in pending:
+        _publish(event)
+
+
+def _topics(event: dict) -> list[Topic]:
+    if event.get("type") == "class_registration":
+        # One per seat; admins follow the coalesced occupancy instead.
+        return [("member", event["member_id"])]
+    topics: list[Topic] = [("all",)]
+    if event.get("trainer_id") is not None:
+        topics.append(("trainer", event["trainer_id"]))
+    if event.get("member_id") is not None:
+        topics.append(("member", event["member_id"]))
+    if event.get("type") == "class_occupancy":
+        topics.append(("class", event["class_id"]))
+    return topics
+
+
+def _publish(event: dict) -> None:
+    frame = _frame(event.get("type", "message"), event)
+    _stats["events"] += 1
+    seen: set[Subscriber] = set()
+    for topic in _topics(event):
+        for sub in _by_topic.get(topic, ()):
+            if sub not in seen:
+                seen.add(sub)
+                sub.push(frame)
+    _stats["deliveries"] += len(seen)
+
+
+# ---------------------------------------------------------------------------
+# Streams
+# ---------------------------------------------------------------------------
+
+def subscribe(topics: list[Topic]) -> Subscriber:
+    """Register a stream for topics. Call from the event loop."""
+    global _loop
+    if len(_subscribers) >= config.EVENTS_MAX_SUBSCRIBERS:
+        raise EventsBusyError("Too many open event streams, retry shortly")
+    _loop = asyncio.get_running_loop()
+    sub = Subscriber(topics)
+    _subscribers.add(sub)
+    for topic in topics:
+        _by_topic.setdefault(topic, set()).add(sub)
+    return sub
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    _subscribers.discard(sub)
+    for topic in sub.topics:
+        subs = _by_topic.get(topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _by_topic[topic]
+
+
+async def _stream(sub: Subscriber):
+    try:
+        yield _READY
+        while True:
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), config.EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield _HEARTBEAT
+                continue
+            # Send whatever else is already queued in the same write.
+            frames = [frame]
+            while not sub.queue.empty():
+                frames.append(sub.queue.get_nowait())
+            yield b"".join(frames)
+    finally:
+        # Client went away (the response cancels the stream) or shutdown.
+        unsubscribe(sub)
+
+
+def stream_response(topics: list[Topic]) -> StreamingResponse:
+    """text/event-stream response for topics. Raises EventsBusyError."""
+    sub = subscribe(topics)
+    return StreamingResponse(
+        _stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def get_stats() -> dict:
+    return {
+        "subscribers": len(_subscribers),
+        "topics": len(_by_topic),
+        "pending_occupancy": len(_pending_occupancy),
+        **_stats,
+    }
@@ -0,0 +1,185 @@
+# app/hashing.py
+"""
+Password hashing off the request path.
+
+bcrypt costs ~250 ms of CPU per call. Instead of running it inside the
+request thread, every hash/verify is sent to a dedicated process pool:
+
+- HASH_POOL_WORKERS processes do the bcrypt work (no GIL contention with
+  the web worker)
+- at most HASH_MAX_PENDING operations may be queued or running; callers
+  wait up to HASH_QUEUE_TIMEOUT seconds for a slot, then get
+  HashingBusyError (routers answer 503)
+
+hash_password / verify_password are coroutines: the slot wait and the
+pool result are both awaited on the event loop, so a login burst holds
+no threadpool threads and other routes keep theirs. Repositories only
+read and store hashes; the routers do the hashing.
+
+Used by:
+- app.routers.auth (login: verify against the stored hash)
+- app.routers.members / trainers / admins (register: hash the password)
+
+Latency per operation is available from get_stats().
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.hash import bcrypt
+
+from app import config
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the hashing queue stayed full for HASH_QUEUE_TIMEOUT seconds."""
+
+
+# -- work done in the pool processes -----------------------------------------
+
+def _bcrypt_hash(password: str) -> str:
+    return bcrypt.hash(password)
+
+
+def _bcrypt_verify(password: str, password_hash: str) -> bool:
+    return bcrypt.verify(password, password_hash)
+
+
+# -- latency metrics ------------------------------------------------------------
+
+class _OpStats:
+    """Counters plus a window of recent latencies for one operation."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.errors = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.recent = deque(maxlen=window)
+        self.recent_wait = deque(maxlen=window)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self.recent)
+        waits = sorted(self.recent_wait)
+
+        def pct(values, p):
+            if not values:
+                return None
+            return values[min(len(values) - 1, int(p * len(values)))]
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / self.count if self.count else None,
+            "max_seconds": self.max_seconds,
+            "p50_seconds": pct(recent, 0.50),
+            "p95_seconds": pct(recent, 0.95),
+            "p99_seconds": pct(recent, 0.99),
+            "p95_queue_wait_seconds": pct(waits, 0.95),
+        }
+
+
+_stats = {"hash": _OpStats(), "verify": _OpStats()}
+_stats_lock = threading.Lock()
+
+# -- pool -----------------------------------------------------------------------
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+# Awaited on the event loop (one per worker process).
+_slots = asyncio.Semaphore(config.HASH_MAX_PENDING)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn, not fork: forking a multi-threaded server is unsafe
+                _executor = ProcessPoolExecutor(
+                    max_workers=config.HASH_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(op: str, fn, *args):
+    queued_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(_slots.acquire(), config.HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        with _stats_lock:
+            _stats[op].rejected += 1
+        raise HashingBusyError("Authentication service is busy, please retry shortly") from None
+
+    started = time.perf_counter()
+    failed = False
+    try:
+        executor = _get_executor()
+        try:
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            # a worker died; start a fresh pool and retry once
+            _reset_executor(executor)
+            return await asyncio.wrap_future(_get_executor().submit(fn, *args))
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _slots.release()
+        elapsed = time.perf_counter() - queued_at
+        with _stats_lock:
+            s = _stats[op]
+            s.count += 1
+            s.errors += failed
+            s.total_seconds += elapsed
+            s.max_seconds = max(s.max_seconds, elapsed)
+            s.recent.append(elapsed)
+            s.recent_wait.append(started - queued_at)
+
+
+# -- public API -----------------------------------------------------------------
+
+async def hash_password(password: str) -> str:
+    """bcrypt-hash a password in the hashing pool."""
+    return await _run("hash", _bcrypt_hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a bcrypt hash in the hashing pool."""
+    return await _run("verify", _bcrypt_verify, password, password_hash)
+
+
+def get_stats() -> dict:
+    """Per-operation latency (including queue wait) and pool settings."""
+    with _stats_lock:
+        ops = {op: s.snapshot() for op, s in _stats.items()}
+    return {
+        "workers": config.HASH_POOL_WORKERS,
+        "max_pending": config.HASH_MAX_PENDING,
+        "operations": ops,
+    }
+
+
+def shutdown() -> None:
+    """Stop the pool processes (called on app shutdown)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
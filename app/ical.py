@@ -0,0 +1,254 @@
+# app/ical.py
+"""
+iCalendar (.ics) schedule feeds and incremental schedule sync.
+
+Used by:
+- app.routers.trainers (GET /trainers/{id}/schedule.ics, GET /trainers/{id}/schedule/sync)
+- app.routers.members (GET /members/{id}/schedule.ics, GET /members/{id}/schedule/sync)
+
+Feeds cover CALENDAR_FEED_PAST_DAYS back to CALENDAR_FEED_FUTURE_DAYS
+ahead. Calendar clients poll them, so a request first asks the repository
+for the owner's feed version (latest updated_at / tombstone: a few index
+lookups). ETag and Last-Modified come from that version, and a matching
+If-None-Match / If-Modified-Since is answered 304 without loading or
+rendering anything.
+
+Schedule sync is the JSON equivalent for clients that keep a local copy:
+
+    GET .../schedule/sync                 -> full copy + sync_token
+    GET .../schedule/sync?token=<t>       -> items changed and deleted since,
+                                             + a new sync_token
+
+Either comes in pages of up to CALENDAR_FEED_MAX_ITEMS items. While
+more=true the token points at the next page and the client asks again
+right away, applying each page in order (deleted, then items). The last
+page has more=false and a token for the next sync; full=true on it means
+the pages of this run are a complete copy that replaces the local one.
+A token older than CALENDAR_TOMBSTONE_RETENTION_DAYS (deletions may have
+been pruned) gets a full copy again.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app import config
+from app.cache import etag_matches, not_modified, set_etag
+from app.concurrency import call_repo
+from app.models.schemas import CalendarItem, CalendarSync
+from app.pagination import decode_cursor, encode_cursor
+
+PRODID = "-//Health & Fitness Club//Schedule//EN"
+UID_DOMAIN = "fitness-club"
+MEDIA_TYPE = "text/calendar"   # Starlette adds charset=utf-8
+
+
+# ---------------------------------------------------------------------------
+# Rendering (RFC 5545)
+# ---------------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Split a content line into 75-octet pieces (continuations start with a space)."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:   # inside a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+        limit = 74
+    parts.append(data.decode())
+    return "\r\n ".join(parts)
+
+
+def _timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(item: CalendarItem) -> list[str]:
+    description = [f"Trainer: {item.trainer_name}"]
+    if item.member_name is not None:
+        description.append(f"Member: {item.member_name}")
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{item.item_type}-{item.item_id}@{UID_DOMAIN}",
+        f"DTSTAMP:{_timestamp(item.updated_at)}",
+        f"LAST-MODIFIED:{_timestamp(item.updated_at)}",
+        f"DTSTART:{_timestamp(item.start_time)}",
+        f"DTEND:{_timestamp(item.end_time)}",
+        f"SUMMARY:{_escape(item.title)}",
+        f"LOCATION:{_escape(item.room_name)}",
+        f"DESCRIPTION:{_escape(chr(10).join(description))}",
+        "END:VEVENT",
+    ]
+
+
+def render_calendar(name: str, items: list[CalendarItem]) -> str:
+    refresh = f"PT{config.CALENDAR_REFRESH_MINUTES}M"
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{refresh}",
+        f"X-PUBLISHED-TTL:{refresh}",
+    ]
+    for item in items:
+        lines += _event(item)
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+# ---------------------------------------------------------------------------
+# Feeds with conditional GET
+# ---------------------------------------------------------------------------
+
+def feed_window(now: datetime | None = None) -> tuple[datetime, datetime]:
+    """[start, end) of the feed; whole UTC days, so it moves once a day."""
+    today = (now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (
+        today - timedelta(days=config.CALENDAR_FEED_PAST_DAYS),
+        today + timedelta(days=config.CALENDAR_FEED_FUTURE_DAYS),
+    )
+
+
+def _feed_etag(owner: str, owner_id: int, window_start: datetime,
+               version: datetime | None) -> str:
+    key = (
+        f"{owner}:{owner_id}:{window_start.date()}:{version.isoformat() if version else '-'}:"
+        f"{config.CALENDAR_FEED_PAST_DAYS}:{config.CALENDAR_FEED_FUTURE_DAYS}:"
+        f"{config.CLASS_DURATION_MINUTES}:{config.CALENDAR_REFRESH_MINUTES}"
+    )
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def _not_modified_since(request: Request, last_modified: datetime) -> bool:
+    # Only consulted without If-None-Match (RFC 9110 13.1.3).
+    if "if-none-match" in request.headers:
+        return False
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+async def feed_response(request: Request, repo, owner: str, owner_id: int,
+                        name: str) -> Response:
+    """The owner's .ics feed, or 304 if the client's copy is current."""
+    window_start, window_end = feed_window()
+    version = await call_repo(repo.feed_version, owner, owner_id)
+    # The window itself moves at midnight UTC.
+    midnight = window_start + timedelta(days=config.CALENDAR_FEED_PAST_DAYS)
+    last_modified = max(version, midnight) if version is not None else midnight
+    etag = _feed_etag(owner, owner_id, window_start, version)
+    headers = {"Last-Modified": format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)}
+
+    if etag_matches(request, etag) or _not_modified_since(request, last_modified):
+        response = not_modified(etag)
+        response.headers.update(headers)
+        return response
+
+    items = await call_repo(
+        repo.feed_items, owner, owner_id, window_start, window_end, config.CALENDAR_FEED_MAX_ITEMS
+    )
+    response = Response(render_calendar(name, items), media_type=MEDIA_TYPE, headers=headers)
+    set_etag(response, etag)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+def _decode_sync_token(token: str) -> tuple[datetime | None, datetime, datetime | None, tuple | None]:
+    """
+    (since, start_from, watermark, after). A next-sync token carries only
+    since and start_from; a next-page token also carries the run's
+    watermark and the last key sent (since is None while a full copy pages).
+    """
+    try:
+        values = decode_cursor(token, 2)
+    except ValueError:
+        try:
+            values = decode_cursor(token, 6)
+        except ValueError:
+            raise ValueError("Invalid sync token") from None
+    since, start_from, watermark, *after = values + [None] * (6 - len(values))
+
+    def aware(value) -> bool:
+        return isinstance(value, datetime) and value.tzinfo is not None
+
+    valid = (since is None or aware(since)) and isinstance(start_from, datetime)
+    if len(values) == 2:
+        valid = valid and since is not None
+    else:
+        valid = (
+            valid and aware(watermark) and aware(after[0])
+            and isinstance(after[1], str) and isinstance(after[2], int)
+        )
+    if not valid:
+        raise ValueError("Invalid sync token")
+    return since, start_from, watermark, tuple(after) if len(values) == 6 else None
+
+
+async def sync(repo, owner: str, owner_id: int, token: str | None,
+               start_from: datetime | None) -> CalendarSync:
+    """
+    One page of the changes since `token`, or of a full copy of items
+    starting at or after start_from (default: the feed window's start).
+    A token keeps the start_from it was issued with. Raises ValueError for
+    a bad token.
+    """
+    since = watermark = after = None
+    if token:
+        since, start_from, watermark, after = _decode_sync_token(token)
+        retention = timedelta(days=config.CALENDAR_TOMBSTONE_RETENTION_DAYS)
+        if since is not None and since < datetime.now(timezone.utc) - retention:
+            # Deletions that old may have been pruned: start a full copy over.
+            since = watermark = after = None
+    if start_from is None:
+        start_from = feed_window()[0]
+
+    items, deleted, watermark, next_after = await call_repo(
+        repo.sync_changes, owner, owner_id, since, start_from,
+        config.CALENDAR_FEED_MAX_ITEMS, after, watermark,
+    )
+    if next_after is not None:
+        return CalendarSync(
+            items=items,
+            deleted=deleted,
+            sync_token=encode_cursor(since, start_from, watermark, *next_after),
+            more=True,
+            full=False,
+        )
+    return CalendarSync(
+        items=items,
+        deleted=deleted,
+        sync_token=encode_cursor(watermark, start_from),
+        more=False,
+        full=since is None,
+    )
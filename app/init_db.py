@@ -3,13 +3,19 @@ app/init_db.py - Initialize database using SQLAlchemy ORM
 
 This script:
 1. Drops and recreates all tables from ORM models
-2. Creates VIEW, TRIGGER, and INDEXES
+2. Creates VIEW, TRIGGER, CONSTRAINTS, and INDEXES
 3. Populates the database with sample data
 
 Usage (from project root):
     python -m app.init_db
+    python -m app.init_db --members 1000000 --days 365 --workers 8
+
+With --members, a generated dataset of that size is loaded instead of the
+sample data (see app.datagen).
 """
 
+import argparse
+
 from datetime import datetime, timedelta, date
 
 from passlib.hash import bcrypt
@@ -35,86 +41,558 @@ from app.models.orm_models import (
 # ---------------------------------------------------------------------------
 
 def create_view_trigger_indexes(session):
-    """Create member_dashboard_view, capacity trigger, and indexes."""
+    """
+    Create the dashboard rollup triggers, member_dashboard_view, capacity
+    trigger, PT overlap constraints, and indexes.
+    """
+
+    # 0. INDEXES (match our ddl.sql intent). Built first, so the backfills
+    #    below (dashboard summary, seat counters) can use them.
+    print("Creating INDEXES...")
+
+    session.execute(
+        text(
+            """
+        CREATE INDEX IF NOT EXISTS idx_class_registration_class_id
+        ON class_registration(class_id);
+        """
+        )
+    )
+
+    # Windowed trainer schedule (GET /trainers/{id}/schedule): each UNION ALL
+    # branch walks (trainer_id, start_time, id); the class side is
+    # idx_class_trainer_start below.
+    session.execute(
+        text(
+            """
+        DROP INDEX IF EXISTS idx_ptsession_trainer_start;
+
+        CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_start_id
+        ON ptsession(trainer_id, start_time, session_id);
+        """
+        )
+    )
+
+    session.execute(
+        text(
+            """
+        CREATE INDEX IF NOT EXISTS idx_ptsession_member_start
+        ON ptsession(member_id, start_time);
+        """
+        )
+    )
+
+    # Keyset pagination / filters for GET /admins/classes
+    session.execute(
+        text(
+            """
+        CREATE INDEX IF NOT EXISTS idx_class_start
+        ON class(start_time, class_id);
+
+        CREATE INDEX IF NOT EXISTS idx_class_trainer_start
+        ON class(trainer_id, start_time, class_id);
+
+        CREATE INDEX IF NOT EXISTS idx_class_room_start
+        ON class(room_id, start_time, class_id);
+        """
+        )
+    )
+
+    session.execute(
+        text(
+            """
+        CREATE INDEX IF NOT EXISTS idx_health_metric_member_time
+        ON health_metric(member_id, measured_at DESC);
+        """
+        )
+    )
+
+    # Raw-resolution metric history (GET /members/{id}/metrics/history)
+    session.execute(
+        text(
+            """
+        CREATE INDEX IF NOT EXISTS idx_health_metric_member_type_time
+        ON health_metric(member_id, metric_type, measured_at);
+        """
+        )
+    )
+
+    # 1. ROLLUP: member_dashboard_summary, kept current by triggers.
+    #    Statement-level triggers with transition tables, so a multi-row
+    #    INSERT/COPY updates each member's row once, not once per reading.
+    print("Creating TRIGGERS: member_dashboard_summary rollup...")
+    session.execute(
+        text(
+            """
+        CREATE OR REPLACE FUNCTION dashboard_summary_members_ins()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO member_dashboard_summary (member_id)
+            SELECT member_id FROM new_rows
+            ON CONFLICT (member_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION dashboard_summary_metric_ins()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO member_dashboard_summary AS s (
+                member_id, latest_metric_value, latest_metric_type, latest_measured_at
+            )
+            SELECT DISTINCT ON (member_id)
+                member_id, metric_value, metric_type, measured_at
+            FROM new_rows
+            ORDER BY member_id, measured_at DESC, metric_id DESC
+            ON CONFLICT (member_id) DO UPDATE
+            SET latest_metric_value = EXCLUDED.latest_metric_value,
+                latest_metric_type  = EXCLUDED.latest_metric_type,
+                latest_measured_at  = EXCLUDED.latest_measured_at
+            WHERE s.latest_measured_at IS NULL
+               OR EXCLUDED.latest_measured_at >= s.latest_measured_at;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- UPDATE/DELETE can remove the current latest reading: recompute
+        -- from the (member_id, measured_at DESC) index for affected members.
+        CREATE OR REPLACE FUNCTION dashboard_summary_metric_recompute()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE member_dashboard_summary s
+            SET (latest_metric_value, latest_metric_type, latest_measured_at) = (
+                SELECT hm.metric_value, hm.metric_type, hm.measured_at
+                FROM health_metric hm
+                WHERE hm.member_id = s.member_id
+                ORDER BY hm.measured_at DESC, hm.metric_id DESC
+                LIMIT 1
+            )
+            WHERE s.member_id IN (SELECT member_id FROM old_rows);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION dashboard_summary_registration_ins()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE member_dashboard_summary s
+            SET total_classes_registered = s.total_classes_registered + c.n
+            FROM (SELECT member_id, COUNT(*) AS n FROM new_rows GROUP BY member_id) c
+            WHERE s.member_id = c.member_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
 
-    # 1. VIEW: member_dashboard_view
+        CREATE OR REPLACE FUNCTION dashboard_summary_registration_del()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE member_dashboard_summary s
+            SET total_classes_registered = s.total_classes_registered - c.n
+            FROM (SELECT member_id, COUNT(*) AS n FROM old_rows GROUP BY member_id) c
+            WHERE s.member_id = c.member_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_dashboard_member_ins ON member;
+        CREATE TRIGGER trg_dashboard_member_ins
+        AFTER INSERT ON member
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_members_ins();
+
+        DROP TRIGGER IF EXISTS trg_dashboard_metric_ins ON health_metric;
+        CREATE TRIGGER trg_dashboard_metric_ins
+        AFTER INSERT ON health_metric
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_metric_ins();
+
+        DROP TRIGGER IF EXISTS trg_dashboard_metric_upd ON health_metric;
+        CREATE TRIGGER trg_dashboard_metric_upd
+        AFTER UPDATE ON health_metric
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_metric_recompute();
+
+        DROP TRIGGER IF EXISTS trg_dashboard_metric_del ON health_metric;
+        CREATE TRIGGER trg_dashboard_metric_del
+        AFTER DELETE ON health_metric
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_metric_recompute();
+
+        DROP TRIGGER IF EXISTS trg_dashboard_registration_ins ON class_registration;
+        CREATE TRIGGER trg_dashboard_registration_ins
+        AFTER INSERT ON class_registration
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_registration_ins();
+
+        DROP TRIGGER IF EXISTS trg_dashboard_registration_del ON class_registration;
+        CREATE TRIGGER trg_dashboard_registration_del
+        AFTER DELETE ON class_registration
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION dashboard_summary_registration_del();
+        """
+        )
+    )
+
+    # Backfill (no-op on a fresh database, needed when upgrading one).
+    session.execute(
+        text(
+            """
+        INSERT INTO member_dashboard_summary AS s (
+            member_id,
+            latest_metric_value,
+            latest_metric_type,
+            latest_measured_at,
+            total_classes_registered
+        )
+        SELECT
+            m.member_id,
+            lm.metric_value,
+            lm.metric_type,
+            lm.measured_at,
+            COALESCE(cr.n, 0)
+        FROM member m
+        LEFT JOIN LATERAL (
+            SELECT hm.metric_value, hm.metric_type, hm.measured_at
+            FROM health_metric hm
+            WHERE hm.member_id = m.member_id
+            ORDER BY hm.measured_at DESC, hm.metric_id DESC
+            LIMIT 1
+        ) lm ON TRUE
+        LEFT JOIN (
+            SELECT member_id, COUNT(*) AS n
+            FROM class_registration
+            GROUP BY member_id
+        ) cr ON cr.member_id = m.member_id
+        ON CONFLICT (member_id) DO UPDATE
+        SET latest_metric_value      = EXCLUDED.latest_metric_value,
+            latest_metric_type       = EXCLUDED.latest_metric_type,
+            latest_measured_at       = EXCLUDED.latest_measured_at,
+            total_classes_registered = EXCLUDED.total_classes_registered;
+        """
+        )
+    )
+
+    # 2. VIEW: member_dashboard_view
+    #    One summary row per member; only the time-dependent upcoming PT
+    #    count is computed at read time (idx_ptsession_member_start).
     print("Creating VIEW: member_dashboard_view...")
     session.execute(
         text(
             """
-        CREATE OR REPLACE VIEW member_dashboard_view AS
+        DROP VIEW IF EXISTS member_dashboard_view;
+
+        CREATE VIEW member_dashboard_view AS
         SELECT
             m.member_id,
             m.name,
             m.email,
-            (
-                SELECT hm.metric_value
-                FROM health_metric hm
-                WHERE hm.member_id = m.member_id
-                ORDER BY hm.measured_at DESC
-                LIMIT 1
-            ) AS latest_metric_value,
-            (
-                SELECT hm.metric_type
-                FROM health_metric hm
-                WHERE hm.member_id = m.member_id
-                ORDER BY hm.measured_at DESC
-                LIMIT 1
-            ) AS latest_metric_type,
+            s.latest_metric_value,
+            s.latest_metric_type,
+            COALESCE(s.total_classes_registered, 0) AS total_classes_registered,
             (
                 SELECT COUNT(*)
-                FROM class_registration cr
-                WHERE cr.member_id = m.member_id
-            ) AS total_classes_registered,
-            (
-                SELECT COUNT(*)
-                FROM ptsession s
-                WHERE s.member_id = m.member_id
-                  AND s.start_time > NOW()
+                FROM ptsession p
+                WHERE p.member_id = m.member_id
+                  AND p.start_time > NOW()
             ) AS upcoming_pt_sessions
-        FROM member m;
+        FROM member m
+        LEFT JOIN member_dashboard_summary s ON s.member_id = m.member_id;
         """
         )
     )
 
-    # 2. FUNCTION: check_class_capacity()
-    print("Creating TRIGGER FUNCTION: check_class_capacity()...")
+    # 3. ROLLUP: health_metric_rollup (hour/day/week buckets, UTC)
+    #    Inserts merge into existing buckets; updates/deletes rebuild the
+    #    affected buckets from health_metric.
+    print("Creating TRIGGERS: health_metric_rollup...")
     session.execute(
         text(
             """
+        CREATE OR REPLACE FUNCTION health_metric_rollup_ins()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO health_metric_rollup AS r (
+                member_id, metric_type, resolution, bucket_start,
+                min_value, max_value, sum_value, sample_count,
+                last_value, last_measured_at
+            )
+            SELECT
+                n.member_id,
+                n.metric_type,
+                res.resolution,
+                date_trunc(res.resolution, n.measured_at, 'UTC') AS bucket_start,
+                MIN(n.metric_value),
+                MAX(n.metric_value),
+                SUM(n.metric_value),
+                COUNT(*),
+                (array_agg(n.metric_value ORDER BY n.measured_at DESC, n.metric_id DESC))[1],
+                MAX(n.measured_at)
+            FROM new_rows n
+            CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS res(resolution)
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4
+            ON CONFLICT (member_id, metric_type, resolution, bucket_start) DO UPDATE
+            SET min_value    = LEAST(r.min_value, EXCLUDED.min_value),
+                max_value    = GREATEST(r.max_value, EXCLUDED.max_value),
+                sum_value    = r.sum_value + EXCLUDED.sum_value,
+                sample_count = r.sample_count + EXCLUDED.sample_count,
+                last_value   = CASE
+                                   WHEN EXCLUDED.last_measured_at >= r.last_measured_at
+                                   THEN EXCLUDED.last_value
+                                   ELSE r.last_value
+                               END,
+                last_measured_at = GREATEST(r.last_measured_at, EXCLUDED.last_measured_at);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Rebuild every bucket touched by the rows in `changed`.
+        CREATE OR REPLACE FUNCTION health_metric_rollup_rebuild()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            CREATE TEMP TABLE IF NOT EXISTS _rollup_changed (
+                member_id INTEGER, metric_type TEXT, measured_at TIMESTAMPTZ
+            ) ON COMMIT DROP;
+            TRUNCATE _rollup_changed;
+
+            IF TG_OP = 'UPDATE' THEN
+                INSERT INTO _rollup_changed
+                SELECT member_id, metric_type, measured_at FROM old_rows
+                UNION
+                SELECT member_id, metric_type, measured_at FROM new_rows;
+            ELSE
+                INSERT INTO _rollup_changed
+                SELECT member_id, metric_type, measured_at FROM old_rows;
+            END IF;
+
+            DELETE FROM health_metric_rollup r
+            USING (
+                SELECT DISTINCT c.member_id, c.metric_type, res.resolution,
+                       date_trunc(res.resolution, c.measured_at, 'UTC') AS bucket_start
+                FROM _rollup_changed c
+                CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS res(resolution)
+            ) b
+            WHERE r.member_id = b.member_id
+              AND r.metric_type = b.metric_type
+              AND r.resolution = b.resolution
+              AND r.bucket_start = b.bucket_start;
+
+            INSERT INTO health_metric_rollup (
+                member_id, metric_type, resolution, bucket_start,
+                min_value, max_value, sum_value, sample_count,
+                last_value, last_measured_at
+            )
+            SELECT
+                n.member_id,
+                n.metric_type,
+                res.resolution,
+                date_trunc(res.resolution, n.measured_at, 'UTC') AS bucket_start,
+                MIN(n.metric_value),
+                MAX(n.metric_value),
+                SUM(n.metric_value),
+                COUNT(*),
+                (array_agg(n.metric_value ORDER BY n.measured_at DESC, n.metric_id DESC))[1],
+                MAX(n.measured_at)
+            FROM health_metric n
+            CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS res(resolution)
+            WHERE EXISTS (
+                SELECT 1
+                FROM _rollup_changed c
+                WHERE c.member_id = n.member_id
+                  AND c.metric_type = n.metric_type
+                  AND date_trunc(res.resolution, c.measured_at, 'UTC')
+                      = date_trunc(res.resolution, n.measured_at, 'UTC')
+            )
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_metric_rollup_ins ON health_metric;
+        CREATE TRIGGER trg_metric_rollup_ins
+        AFTER INSERT ON health_metric
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION health_metric_rollup_ins();
+
+        DROP TRIGGER IF EXISTS trg_metric_rollup_upd ON health_metric;
+        CREATE TRIGGER trg_metric_rollup_upd
+        AFTER UPDATE ON health_metric
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION health_metric_rollup_rebuild();
+
+        DROP TRIGGER IF EXISTS trg_metric_rollup_del ON health_metric;
+        CREATE TRIGGER trg_metric_rollup_del
+        AFTER DELETE ON health_metric
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION health_metric_rollup_rebuild();
+        """
+        )
+    )
+
+    # Backfill when upgrading a database that already has readings.
+    session.execute(
+        text(
+            """
+        INSERT INTO health_metric_rollup (
+            member_id, metric_type, resolution, bucket_start,
+            min_value, max_value, sum_value, sample_count,
+            last_value, last_measured_at
+        )
+        SELECT
+            n.member_id,
+            n.metric_type,
+            res.resolution,
+            date_trunc(res.resolution, n.measured_at, 'UTC') AS bucket_start,
+            MIN(n.metric_value),
+            MAX(n.metric_value),
+            SUM(n.metric_value),
+            COUNT(*),
+            (array_agg(n.metric_value ORDER BY n.measured_at DESC, n.metric_id DESC))[1],
+            MAX(n.measured_at)
+        FROM health_metric n
+        CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS res(resolution)
+        WHERE NOT EXISTS (SELECT 1 FROM health_metric_rollup)
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4;
+        """
+        )
+    )
+
+    # 3b. NOTIFY on reference-data changes, so every worker drops its
+    #     cached room / class / trainer lists (app.cache). Statement-level:
+    #     one notification per write statement, whatever the row count.
+    #     class only notifies for catalog columns.
+    print("Creating TRIGGERS: reference_change notifications...")
+    session.execute(
+        text(
+            """
+        CREATE OR REPLACE FUNCTION notify_reference_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('reference_change', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_room_notify ON room;
+        CREATE TRIGGER trg_room_notify
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON room
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_change();
+
+        DROP TRIGGER IF EXISTS trg_trainer_notify ON trainer;
+        CREATE TRIGGER trg_trainer_notify
+        AFTER INSERT OR UPDATE OF name, email, specialization OR DELETE OR TRUNCATE ON trainer
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_change();
+
+        DROP TRIGGER IF EXISTS trg_class_notify ON class;
+        CREATE TRIGGER trg_class_notify
+        AFTER INSERT OR UPDATE OF name, start_time, capacity, trainer_id, room_id
+              OR DELETE OR TRUNCATE ON class
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_change();
+        """
+        )
+    )
+
+    # 4. Seat counter: class.registered_count, maintained by triggers.
+    #    Registration is one conditional UPDATE on the class row
+    #    (registered_count < capacity): the row lock serialises concurrent
+    #    sign-ups for the same class, so it can never overbook, and nothing
+    #    counts class_registration rows. Seats in unexpired holds
+    #    (class.held_count) are not available to registrations.
+    print("Creating TRIGGER FUNCTIONS: class seat counter...")
+    session.execute(
+        text(
+            """
+        ALTER TABLE class ADD COLUMN IF NOT EXISTS registered_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE class ADD COLUMN IF NOT EXISTS held_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE class ADD COLUMN IF NOT EXISTS admission_mode TEXT NOT NULL DEFAULT 'direct';
+
+        -- One-off backfill for databases created before the counter existed
+        -- (one grouped pass; rows already correct are left alone).
+        UPDATE class c
+        SET registered_count = r.n
+        FROM (
+            SELECT k.class_id, COUNT(cr.class_id) AS n
+            FROM class k
+            LEFT JOIN class_registration cr ON cr.class_id = k.class_id
+            GROUP BY k.class_id
+        ) r
+        WHERE r.class_id = c.class_id
+          AND c.registered_count IS DISTINCT FROM r.n;
+
         CREATE OR REPLACE FUNCTION check_class_capacity()
         RETURNS TRIGGER AS $$
         DECLARE
-            current_count INTEGER;
-            max_capacity  INTEGER;
+            max_capacity INTEGER;
         BEGIN
-            SELECT COUNT(*)
-            INTO current_count
-            FROM class_registration
-            WHERE class_id = NEW.class_id;
+            -- app.admission's batch writer has already counted these seats
+            -- (under the class row lock) for its whole transaction.
+            IF current_setting('fitness.admission_batch', true) = 'on' THEN
+                RETURN NEW;
+            END IF;
 
-            SELECT capacity
-            INTO max_capacity
-            FROM class
-            WHERE class_id = NEW.class_id;
+            UPDATE class
+            SET registered_count = registered_count + 1
+            WHERE class_id = NEW.class_id
+              AND registered_count + held_count < capacity;
 
-            IF max_capacity IS NULL THEN
-                RAISE EXCEPTION 'Class % does not exist', NEW.class_id;
-            END IF;
+            IF NOT FOUND THEN
+                SELECT capacity INTO max_capacity
+                FROM class
+                WHERE class_id = NEW.class_id;
 
-            IF current_count >= max_capacity THEN
+                IF max_capacity IS NULL THEN
+                    RAISE EXCEPTION 'Class % does not exist', NEW.class_id;
+                END IF;
                 RAISE EXCEPTION 'Class % is full (capacity: %)', NEW.class_id, max_capacity;
             END IF;
 
             RETURN NEW;
         END;
         $$ LANGUAGE plpgsql;
+
+        -- Freed seats go straight to the head of the class's waitlist, in
+        -- the same transaction (the class rows are already locked here).
+        CREATE OR REPLACE FUNCTION release_class_seats()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE class c
+            SET registered_count = c.registered_count - d.n
+            FROM (
+                SELECT class_id, COUNT(*) AS n
+                FROM old_rows
+                GROUP BY class_id
+            ) d
+            WHERE c.class_id = d.class_id;
+
+            PERFORM promote_waitlist(d.class_id)
+            FROM (SELECT DISTINCT class_id FROM old_rows ORDER BY class_id) d;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Register and return the seats left; raises when the class is full.
+        CREATE OR REPLACE FUNCTION register_for_class(p_member_id INTEGER, p_class_id INTEGER)
+        RETURNS INTEGER AS $$
+        DECLARE
+            remaining INTEGER;
+        BEGIN
+            INSERT INTO class_registration (member_id, class_id, registered_at)
+            VALUES (p_member_id, p_class_id, NOW());
+
+            SELECT capacity - registered_count - held_count INTO remaining
+            FROM class
+            WHERE class_id = p_class_id;
+            RETURN remaining;
+        END;
+        $$ LANGUAGE plpgsql;
         """
         )
     )
 
-    # 3. TRIGGER: trg_class_capacity
-    print("Creating TRIGGER: trg_class_capacity...")
+    # 5. TRIGGERS: trg_class_capacity (take a seat), trg_class_release (free seats)
+    print("Creating TRIGGERS: trg_class_capacity, trg_class_release...")
     session.execute(
         text(
             """
@@ -124,42 +602,523 @@ def create_view_trigger_indexes(session):
         BEFORE INSERT ON class_registration
         FOR EACH ROW
         EXECUTE FUNCTION check_class_capacity();
+
+        DROP TRIGGER IF EXISTS trg_class_release ON class_registration;
+
+        CREATE TRIGGER trg_class_release
+        AFTER DELETE ON class_registration
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION release_class_seats();
         """
         )
     )
 
-    # 4. INDEXES (match our ddl.sql intent)
-    print("Creating INDEXES...")
+    # 5b. Waitlist and seat holds
+    #
+    #    promote_waitlist(class)  moves waitlisted members (FIFO by
+    #        waitlist_id) into free seats. It runs with the class row locked,
+    #        so two transactions can never promote the same member or fill
+    #        the same seat.
+    #    join_class(member, class, lock_timeout_ms)  registers if a seat is
+    #        free and nobody is queued, else waitlists. Waiting for the class
+    #        row lock is capped at lock_timeout_ms; on timeout the member is
+    #        queued instead, so a burst of sign-ups for one class turns into
+    #        cheap waitlist inserts rather than a long lock queue.
+    #    Holds reserve seats (class.held_count) until expires_at;
+    #        expire_class_holds() releases expired ones and promotes any
+    #        class left with free seats and a queue (covering promotions
+    #        skipped because the class row was busy).
+    print("Creating FUNCTIONS: class waitlist and holds...")
+    session.execute(
+        text(
+            """
+        CREATE OR REPLACE FUNCTION promote_waitlist(p_class_id INTEGER,
+                                                    p_skip_locked BOOLEAN DEFAULT FALSE)
+        RETURNS INTEGER AS $$
+        DECLARE
+            promoted  INTEGER := 0;
+            next_id   BIGINT;
+            next_member INTEGER;
+        BEGIN
+            IF p_skip_locked THEN
+                PERFORM 1 FROM class WHERE class_id = p_class_id
+                FOR NO KEY UPDATE SKIP LOCKED;
+            ELSE
+                PERFORM 1 FROM class WHERE class_id = p_class_id
+                FOR NO KEY UPDATE;
+            END IF;
+            IF NOT FOUND THEN
+                RETURN 0;
+            END IF;
+
+            LOOP
+                EXIT WHEN NOT EXISTS (
+                    SELECT 1 FROM class
+                    WHERE class_id = p_class_id
+                      AND registered_count + held_count < capacity
+                );
+
+                SELECT waitlist_id, member_id INTO next_id, next_member
+                FROM class_waitlist
+                WHERE class_id = p_class_id
+                ORDER BY waitlist_id
+                LIMIT 1;
+                EXIT WHEN NOT FOUND;
+
+                DELETE FROM class_waitlist WHERE waitlist_id = next_id;
+                BEGIN
+                    -- trg_class_capacity takes the seat
+                    INSERT INTO class_registration (member_id, class_id, registered_at)
+                    VALUES (next_member, p_class_id, NOW());
+                    promoted := promoted + 1;
+                EXCEPTION WHEN unique_violation THEN
+                    NULL;  -- registered some other way meanwhile
+                END;
+            END LOOP;
+            RETURN promoted;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION waitlist_position(p_member_id INTEGER, p_class_id INTEGER)
+        RETURNS BIGINT AS $$
+            SELECT COUNT(*)
+            FROM class_waitlist w
+            WHERE w.class_id = p_class_id
+              AND w.waitlist_id <= (
+                  SELECT waitlist_id FROM class_waitlist
+                  WHERE class_id = p_class_id AND member_id = p_member_id
+              )
+            HAVING COUNT(*) > 0;
+        $$ LANGUAGE sql STABLE;
+
+        DROP FUNCTION IF EXISTS join_class(INTEGER, INTEGER, INTEGER);
+        CREATE FUNCTION join_class(p_member_id INTEGER, p_class_id INTEGER,
+                                   p_lock_timeout_ms INTEGER)
+        RETURNS TABLE (status TEXT, remaining_seats INTEGER, queue_position BIGINT) AS $$
+        DECLARE
+            saved_timeout TEXT := current_setting('lock_timeout');
+            seats_free    BOOLEAN;
+        BEGIN
+            SELECT registered_count + held_count < capacity INTO seats_free
+            FROM class WHERE class_id = p_class_id;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Class % does not exist', p_class_id;
+            END IF;
+
+            IF EXISTS (SELECT 1 FROM class_registration
+                       WHERE member_id = p_member_id AND class_id = p_class_id) THEN
+                RETURN QUERY
+                SELECT 'registered', capacity - registered_count - held_count, NULL::BIGINT
+                FROM class WHERE class_id = p_class_id;
+                RETURN;
+            END IF;
+
+            -- Take a seat directly only when one looks free and nobody is queued
+            -- (unlocked reads; the capacity trigger makes the final decision).
+            IF seats_free AND NOT EXISTS (SELECT 1 FROM class_waitlist
+                                          WHERE class_id = p_class_id) THEN
+                BEGIN
+                    PERFORM set_config('lock_timeout', p_lock_timeout_ms || 'ms', true);
+                    INSERT INTO class_registration (member_id, class_id, registered_at)
+                    VALUES (p_member_id, p_class_id, NOW());
+                    PERFORM set_config('lock_timeout', saved_timeout, true);
+                    RETURN QUERY
+                    SELECT 'registered', capacity - registered_count - held_count, NULL::BIGINT
+                    FROM class WHERE class_id = p_class_id;
+                    RETURN;
+                EXCEPTION
+                    WHEN lock_not_available OR raise_exception THEN
+                        -- class row busy, or full after all: queue instead
+                        PERFORM set_config('lock_timeout', saved_timeout, true);
+                END;
+            END IF;
+
+            INSERT INTO class_waitlist (class_id, member_id)
+            VALUES (p_class_id, p_member_id)
+            ON CONFLICT ON CONSTRAINT uq_class_waitlist_member DO NOTHING;
+
+            -- A seat may have been freed while we queued; promote if the class
+            -- row is free, otherwise expire_class_holds() catches up shortly.
+            IF EXISTS (SELECT 1 FROM class WHERE class_id = p_class_id
+                       AND registered_count + held_count < capacity) THEN
+                PERFORM promote_waitlist(p_class_id, TRUE);
+            END IF;
+
+            IF EXISTS (SELECT 1 FROM class_registration
+                       WHERE member_id = p_member_id AND class_id = p_class_id) THEN
+                RETURN QUERY
+                SELECT 'registered', capacity - registered_count - held_count, NULL::BIGINT
+                FROM class WHERE class_id = p_class_id;
+            ELSE
+                RETURN QUERY
+                SELECT 'waitlisted', 0, waitlist_position(p_member_id, p_class_id);
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION create_class_hold(p_class_id INTEGER, p_seats INTEGER,
+                                                     p_ttl_seconds INTEGER, p_label TEXT)
+        RETURNS INTEGER AS $$
+        DECLARE
+            new_hold_id INTEGER;
+        BEGIN
+            IF p_seats <= 0 THEN
+                RAISE EXCEPTION 'Hold must reserve at least one seat';
+            END IF;
+
+            UPDATE class
+            SET held_count = held_count + p_seats
+            WHERE class_id = p_class_id
+              AND registered_count + held_count + p_seats <= capacity;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Class % does not have % free seats', p_class_id, p_seats;
+            END IF;
+
+            INSERT INTO class_hold (class_id, seats, label, expires_at)
+            VALUES (p_class_id, p_seats, p_label, NOW() + make_interval(secs => p_ttl_seconds))
+            RETURNING hold_id INTO new_hold_id;
+            RETURN new_hold_id;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Register a member on one held seat; returns the seats left on the hold.
+        CREATE OR REPLACE FUNCTION claim_class_hold(p_hold_id INTEGER, p_member_id INTEGER)
+        RETURNS INTEGER AS $$
+        DECLARE
+            hold_class INTEGER;
+            seats_left INTEGER;
+        BEGIN
+            UPDATE class_hold
+            SET seats = seats - 1
+            WHERE hold_id = p_hold_id AND seats > 0 AND expires_at > NOW()
+            RETURNING class_id, seats INTO hold_class, seats_left;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Hold % is expired or fully claimed', p_hold_id;
+            END IF;
+
+            -- Move the seat from held to registered under the class row lock.
+            UPDATE class SET held_count = held_count - 1 WHERE class_id = hold_class;
+            INSERT INTO class_registration (member_id, class_id, registered_at)
+            VALUES (p_member_id, hold_class, NOW());
+
+            IF seats_left = 0 THEN
+                DELETE FROM class_hold WHERE hold_id = p_hold_id;
+            END IF;
+            RETURN seats_left;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION release_class_hold()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE class
+            SET held_count = held_count - OLD.seats
+            WHERE class_id = OLD.class_id;
+            IF OLD.seats > 0 THEN
+                PERFORM promote_waitlist(OLD.class_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
 
+        DROP TRIGGER IF EXISTS trg_class_hold_release ON class_hold;
+        CREATE TRIGGER trg_class_hold_release
+        AFTER DELETE ON class_hold
+        FOR EACH ROW
+        EXECUTE FUNCTION release_class_hold();
+
+        CREATE OR REPLACE FUNCTION expire_class_holds()
+        RETURNS INTEGER AS $$
+        DECLARE
+            expired INTEGER;
+        BEGIN
+            DELETE FROM class_hold WHERE expires_at <= NOW();
+            GET DIAGNOSTICS expired = ROW_COUNT;
+
+            PERFORM promote_waitlist(c.class_id, TRUE)
+            FROM class c
+            WHERE c.registered_count + c.held_count < c.capacity
+              AND EXISTS (SELECT 1 FROM class_waitlist w WHERE w.class_id = c.class_id);
+            RETURN expired;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+        )
+    )
+
+    # 6. CONSTRAINTS: no overlapping PT sessions per trainer / room / member
+    #    Half-open ranges '[)' so back-to-back sessions are allowed.
+    #    btree_gist lets the integer id columns take part in a GiST index.
+    print("Creating CONSTRAINTS: ptsession no-overlap exclusions...")
+    session.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist;"))
     session.execute(
         text(
             """
-        CREATE INDEX IF NOT EXISTS idx_class_registration_class_id
-        ON class_registration(class_id);
+        ALTER TABLE ptsession DROP CONSTRAINT IF EXISTS ptsession_valid_range;
+        ALTER TABLE ptsession ADD CONSTRAINT ptsession_valid_range
+            CHECK (end_time > start_time);
+
+        ALTER TABLE ptsession DROP CONSTRAINT IF EXISTS ptsession_trainer_no_overlap;
+        ALTER TABLE ptsession ADD CONSTRAINT ptsession_trainer_no_overlap
+            EXCLUDE USING gist (
+                trainer_id WITH =,
+                tstzrange(start_time, end_time, '[)') WITH &&
+            );
+
+        ALTER TABLE ptsession DROP CONSTRAINT IF EXISTS ptsession_room_no_overlap;
+        ALTER TABLE ptsession ADD CONSTRAINT ptsession_room_no_overlap
+            EXCLUDE USING gist (
+                room_id WITH =,
+                tstzrange(start_time, end_time, '[)') WITH &&
+            );
+
+        ALTER TABLE ptsession DROP CONSTRAINT IF EXISTS ptsession_member_no_overlap;
+        ALTER TABLE ptsession ADD CONSTRAINT ptsession_member_no_overlap
+            EXCLUDE USING gist (
+                member_id WITH =,
+                tstzrange(start_time, end_time, '[)') WITH &&
+            );
         """
         )
     )
 
+    # 7. SCHEDULE SYNC: change timestamps and tombstones for the calendar
+    #    feeds and GET .../schedule/sync (app.ical). updated_at moves only
+    #    when a field shown in the calendar changes (not on seat-counter
+    #    updates), and a class change is copied to its registrations so a
+    #    member's feed version is two index lookups. clock_timestamp(), not
+    #    now(): a row's updated_at is never earlier than its transaction's
+    #    start, which the sync watermark relies on.
+    print("Creating TRIGGERS: schedule change timestamps and tombstones...")
     session.execute(
         text(
             """
-        CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_start
-        ON ptsession(trainer_id, start_time);
+        ALTER TABLE ptsession ADD COLUMN IF NOT EXISTS updated_at
+            TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+        ALTER TABLE class ADD COLUMN IF NOT EXISTS updated_at
+            TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+        ALTER TABLE class_registration ADD COLUMN IF NOT EXISTS updated_at
+            TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+
+        CREATE INDEX IF NOT EXISTS idx_ptsession_trainer_updated
+        ON ptsession(trainer_id, updated_at);
+
+        CREATE INDEX IF NOT EXISTS idx_ptsession_member_updated
+        ON ptsession(member_id, updated_at);
+
+        CREATE INDEX IF NOT EXISTS idx_class_trainer_updated
+        ON class(trainer_id, updated_at);
+
+        CREATE INDEX IF NOT EXISTS idx_class_registration_member_updated
+        ON class_registration(member_id, updated_at);
+
+        CREATE OR REPLACE FUNCTION touch_updated_at()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at := clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_ptsession_touch ON ptsession;
+        CREATE TRIGGER trg_ptsession_touch
+        BEFORE UPDATE OF member_id, trainer_id, room_id, start_time, end_time ON ptsession
+        FOR EACH ROW
+        WHEN ((OLD.member_id, OLD.trainer_id, OLD.room_id, OLD.start_time, OLD.end_time)
+              IS DISTINCT FROM
+              (NEW.member_id, NEW.trainer_id, NEW.room_id, NEW.start_time, NEW.end_time))
+        EXECUTE FUNCTION touch_updated_at();
+
+        DROP TRIGGER IF EXISTS trg_class_touch ON class;
+        CREATE TRIGGER trg_class_touch
+        BEFORE UPDATE OF name, start_time, trainer_id, room_id ON class
+        FOR EACH ROW
+        WHEN ((OLD.name, OLD.start_time, OLD.trainer_id, OLD.room_id)
+              IS DISTINCT FROM
+              (NEW.name, NEW.start_time, NEW.trainer_id, NEW.room_id))
+        EXECUTE FUNCTION touch_updated_at();
+
+        CREATE OR REPLACE FUNCTION touch_class_registrations()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE class_registration
+            SET updated_at = NEW.updated_at
+            WHERE class_id = NEW.class_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_class_touch_registrations ON class;
+        CREATE TRIGGER trg_class_touch_registrations
+        AFTER UPDATE OF name, start_time, trainer_id, room_id ON class
+        FOR EACH ROW
+        WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at)
+        EXECUTE FUNCTION touch_class_registrations();
+
+        -- Tombstones: the row left someone's feed (deleted, or moved to
+        -- another trainer / member). NULLIF leaves out an owner that did
+        -- not change.
+        CREATE OR REPLACE FUNCTION schedule_tombstone()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'ptsession' THEN
+                INSERT INTO schedule_tombstone (item_type, item_id, trainer_id, member_id)
+                VALUES ('pt_session', OLD.session_id,
+                        CASE WHEN TG_OP = 'DELETE' THEN OLD.trainer_id
+                             ELSE NULLIF(OLD.trainer_id, NEW.trainer_id) END,
+                        CASE WHEN TG_OP = 'DELETE' THEN OLD.member_id
+                             ELSE NULLIF(OLD.member_id, NEW.member_id) END);
+            ELSIF TG_TABLE_NAME = 'class' THEN
+                INSERT INTO schedule_tombstone (item_type, item_id, trainer_id)
+                VALUES ('class', OLD.class_id, OLD.trainer_id);
+            ELSE
+                INSERT INTO schedule_tombstone (item_type, item_id, member_id)
+                VALUES ('class', OLD.class_id, OLD.member_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_ptsession_tombstone ON ptsession;
+        CREATE TRIGGER trg_ptsession_tombstone
+        AFTER DELETE ON ptsession
+        FOR EACH ROW EXECUTE FUNCTION schedule_tombstone();
+
+        DROP TRIGGER IF EXISTS trg_ptsession_move_tombstone ON ptsession;
+        CREATE TRIGGER trg_ptsession_move_tombstone
+        AFTER UPDATE OF trainer_id, member_id ON ptsession
+        FOR EACH ROW
+        WHEN (OLD.trainer_id IS DISTINCT FROM NEW.trainer_id
+              OR OLD.member_id IS DISTINCT FROM NEW.member_id)
+        EXECUTE FUNCTION schedule_tombstone();
+
+        DROP TRIGGER IF EXISTS trg_class_tombstone ON class;
+        CREATE TRIGGER trg_class_tombstone
+        AFTER DELETE ON class
+        FOR EACH ROW EXECUTE FUNCTION schedule_tombstone();
+
+        DROP TRIGGER IF EXISTS trg_class_move_tombstone ON class;
+        CREATE TRIGGER trg_class_move_tombstone
+        AFTER UPDATE OF trainer_id ON class
+        FOR EACH ROW
+        WHEN (OLD.trainer_id IS DISTINCT FROM NEW.trainer_id)
+        EXECUTE FUNCTION schedule_tombstone();
+
+        DROP TRIGGER IF EXISTS trg_class_registration_tombstone ON class_registration;
+        CREATE TRIGGER trg_class_registration_tombstone
+        AFTER DELETE ON class_registration
+        FOR EACH ROW EXECUTE FUNCTION schedule_tombstone();
         """
         )
     )
 
+    # 8. EVENTS: NOTIFY schedule_events with a small JSON payload on class
+    #    occupancy changes, class registrations, PT bookings and trainer
+    #    availability, pushed to dashboards by app.events. Delivered at commit; rolled-back writes
+    #    send nothing.
+    print("Creating TRIGGERS: schedule_events notifications...")
     session.execute(
         text(
             """
-        CREATE INDEX IF NOT EXISTS idx_health_metric_member_time
-        ON health_metric(member_id, measured_at DESC);
+        CREATE OR REPLACE FUNCTION notify_class_occupancy()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('schedule_events', json_build_object(
+                'type', 'class_occupancy',
+                'class_id', NEW.class_id,
+                'trainer_id', NEW.trainer_id,
+                'capacity', NEW.capacity,
+                'registered', NEW.registered_count,
+                'held', NEW.held_count
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_class_occupancy_notify ON class;
+        CREATE TRIGGER trg_class_occupancy_notify
+        AFTER UPDATE OF registered_count, held_count, capacity ON class
+        FOR EACH ROW
+        WHEN ((OLD.registered_count, OLD.held_count, OLD.capacity)
+              IS DISTINCT FROM
+              (NEW.registered_count, NEW.held_count, NEW.capacity))
+        EXECUTE FUNCTION notify_class_occupancy();
+
+        CREATE OR REPLACE FUNCTION notify_class_registration()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            r class_registration%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+            PERFORM pg_notify('schedule_events', json_build_object(
+                'type', 'class_registration',
+                'op', lower(TG_OP),
+                'member_id', r.member_id,
+                'class_id', r.class_id
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_class_registration_notify ON class_registration;
+        CREATE TRIGGER trg_class_registration_notify
+        AFTER INSERT OR DELETE ON class_registration
+        FOR EACH ROW EXECUTE FUNCTION notify_class_registration();
+
+        CREATE OR REPLACE FUNCTION notify_pt_session()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            r ptsession%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+            PERFORM pg_notify('schedule_events', json_build_object(
+                'type', 'pt_session',
+                'op', lower(TG_OP),
+                'session_id', r.session_id,
+                'trainer_id', r.trainer_id,
+                'member_id', r.member_id,
+                'room_id', r.room_id,
+                'start_time', r.start_time,
+                'end_time', r.end_time
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_ptsession_notify ON ptsession;
+        CREATE TRIGGER trg_ptsession_notify
+        AFTER INSERT OR UPDATE OR DELETE ON ptsession
+        FOR EACH ROW EXECUTE FUNCTION notify_pt_session();
+
+        CREATE OR REPLACE FUNCTION notify_trainer_availability()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            r trainer_availability%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+            PERFORM pg_notify('schedule_events', json_build_object(
+                'type', 'availability',
+                'op', lower(TG_OP),
+                'availability_id', r.availability_id,
+                'trainer_id', r.trainer_id,
+                'start_time', r.start_time,
+                'end_time', r.end_time
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_trainer_availability_notify ON trainer_availability;
+        CREATE TRIGGER trg_trainer_availability_notify
+        AFTER INSERT OR UPDATE OR DELETE ON trainer_availability
+        FOR EACH ROW EXECUTE FUNCTION notify_trainer_availability();
         """
         )
     )
 
     session.commit()
-    print("VIEW, TRIGGER, and INDEXES created successfully!\n")
+    print("VIEW, TRIGGER, CONSTRAINTS, and INDEXES created successfully!\n")
 
 
 # ---------------------------------------------------------------------------
@@ -569,12 +1528,28 @@ def seed_database():
         print(f"  - {len(classes)} fitness classes")
         print(f"  - {len(registrations)} class registrations")
         print(f"  - {len(pt_sessions)} PT sessions")
-        print("  - 1 view (member_dashboard_view)")
-        print("  - 1 trigger (trg_class_capacity)")
-        print("  - 3 indexes "
+        print("  - 1 view (member_dashboard_view) over member_dashboard_summary")
+        print("  - 6 rollup triggers (trg_dashboard_*)")
+        print("  - 3 rollup triggers (trg_metric_rollup_*) -> health_metric_rollup")
+        print("  - 2 seat-counter triggers (trg_class_capacity, trg_class_release)")
+        print("  - waitlist / hold functions (join_class, promote_waitlist, "
+              "create_class_hold, claim_class_hold, expire_class_holds)")
+        print("  - 3 notify triggers (trg_room_notify, trg_trainer_notify, trg_class_notify)")
+        print("  - 4 event triggers (trg_class_occupancy_notify, trg_class_registration_notify, "
+              "trg_ptsession_notify, trg_trainer_availability_notify) -> schedule_events")
+        print("  - schedule sync triggers (trg_*_touch, trg_*_tombstone) "
+              "-> updated_at, schedule_tombstone")
+        print("  - 3 exclusion constraints "
+              "(ptsession_trainer_no_overlap, "
+              "ptsession_room_no_overlap, "
+              "ptsession_member_no_overlap)")
+        print("  - 8 indexes "
               "(idx_class_registration_class_id, "
-              "idx_ptsession_trainer_start, "
-              "idx_health_metric_member_time)")
+              "idx_ptsession_trainer_start_id, "
+              "idx_ptsession_member_start, "
+              "idx_class_start, idx_class_trainer_start, idx_class_room_start, "
+              "idx_health_metric_member_time, "
+              "idx_health_metric_member_type_time)")
         print("=" * 60)
 
     except Exception as e:
@@ -586,4 +1561,22 @@ def seed_database():
 
 
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Recreate the schema and load data.")
+    parser.add_argument("--members", type=int,
+                        help="generate this many members instead of the sample data")
+    parser.add_argument("--days", type=int, default=365, help="days of history to generate")
+    parser.add_argument("--future-days", type=int, default=28)
+    parser.add_argument("--metrics-per-member", type=int, default=20)
+    parser.add_argument("--trainers", type=int, help="default: members / 250")
+    parser.add_argument("--workers", type=int, default=4, help="parallel COPY streams")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.members:
+        from app.datagen import generate
+
+        generate(args.members, args.days, workers=args.workers,
+                 future_days=args.future_days, metrics_per_member=args.metrics_per_member,
+                 trainers=args.trainers, seed=args.seed)
+    else:
+        seed_database()
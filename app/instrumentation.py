@@ -0,0 +1,270 @@
+# app/instrumentation.py
+"""
+Per-request timing: DB round trips, DB time, connection acquire time and
+response serialization time.
+
+Used by:
+- app.main (RequestMetricsMiddleware, GET /metrics)
+- app.routers.* (route_class=TimedRoute)
+
+The middleware opens an app.query_stats scope per request, which the
+db_raw cursors and the SQLAlchemy engine events fill in. TimedRoute records
+the route template and how long FastAPI spent between the endpoint
+returning and the response being built (response_model validation,
+jsonable_encoder, JSON rendering).
+
+Each response gets a Server-Timing header (SERVER_TIMING_ENABLED):
+
+    Server-Timing: db;dur=3.2;desc="4 queries", db-acquire;dur=0.1,
+                   serialize;dur=0.8, app;dur=9.7
+
+and every request is folded into per-route counters and histograms,
+exposed in Prometheus text format by render_prometheus() (GET /metrics).
+Streaming responses send their headers before the body, so queries made
+while streaming are only in /metrics, not in Server-Timing.
+
+The cost per request is a handful of perf_counter() calls and one short
+lock to update the histograms.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+
+from app import config, query_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# Scope key TimedRoute stores the route template under.
+_ROUTE_KEY = "app.route_template"
+
+# Set per request by TimedRoute: [perf_counter() when the endpoint returned].
+_endpoint_done: ContextVar[list | None] = ContextVar("endpoint_done", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Route class
+# ---------------------------------------------------------------------------
+
+def _mark_endpoint_done() -> None:
+    box = _endpoint_done.get()
+    if box is not None:
+        box[0] = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that labels the request with its path template and times serialization."""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if not getattr(call, "_timed", False):
+            if inspect.iscoroutinefunction(call):
+                @functools.wraps(call)
+                async def timed(*args, **kwargs):
+                    try:
+                        return await call(*args, **kwargs)
+                    finally:
+                        _mark_endpoint_done()
+            else:
+                @functools.wraps(call)
+                def timed(*args, **kwargs):
+                    try:
+                        return call(*args, **kwargs)
+                    finally:
+                        _mark_endpoint_done()
+            timed._timed = True
+            self.dependant.call = timed
+
+        handler = super().get_route_handler()
+        template = self.path_format
+
+        async def route_handler(request):
+            request.scope[_ROUTE_KEY] = template
+            box = [None]
+            token = _endpoint_done.set(box)
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_done.reset(token)
+            stats = query_stats.current()
+            if stats is not None and box[0] is not None:
+                stats.serialize_seconds += time.perf_counter() - box[0]
+            return response
+
+        return route_handler
+
+
+# ---------------------------------------------------------------------------
+# Per-route metrics
+# ---------------------------------------------------------------------------
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot: +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _RouteMetrics:
+    __slots__ = ("statuses", "duration", "db_seconds", "queries",
+                 "acquire_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.statuses: dict[int, int] = {}
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.db_seconds = _Histogram(DURATION_BUCKETS)
+        self.queries = _Histogram(QUERY_BUCKETS)
+        self.acquire_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+_routes: dict[tuple[str, str], _RouteMetrics] = {}
+_lock = threading.Lock()
+
+
+def _observe(method: str, route: str, status: int, seconds: float,
+             stats: query_stats.QueryStats) -> None:
+    with _lock:
+        m = _routes.get((method, route))
+        if m is None:
+            m = _routes[(method, route)] = _RouteMetrics()
+        m.statuses[status] = m.statuses.get(status, 0) + 1
+        m.duration.observe(seconds)
+        m.db_seconds.observe(stats.db_seconds)
+        m.queries.observe(stats.queries)
+        m.acquire_seconds += stats.acquire_seconds
+        m.serialize_seconds += stats.serialize_seconds
+
+
+def _server_timing(stats: query_stats.QueryStats, total: float) -> bytes:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.3f};desc="{stats.queries} queries", '
+        f"db-acquire;dur={stats.acquire_seconds * 1000:.3f}, "
+        f"serialize;dur={stats.serialize_seconds * 1000:.3f}, "
+        f"app;dur={total * 1000:.3f}"
+    ).encode()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware: query_stats scope, Server-Timing header, per-route metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # Reuse an enclosing scope (e.g. app.bench's) so both see the same counts.
+        stats = query_stats.current()
+        token = None
+        if stats is None:
+            stats, token = query_stats.begin()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if config.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (b"server-timing", _server_timing(stats, time.perf_counter() - start))
+                    )
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if token is not None:
+                query_stats.end(token)
+            _observe(scope["method"], scope.get(_ROUTE_KEY, "unmatched"), status,
+                     time.perf_counter() - start, stats)
+
+
+# ---------------------------------------------------------------------------
+# Prometheus text exposition
+# ---------------------------------------------------------------------------
+
+def _labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _histogram_lines(name: str, labels: dict, h: _Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(h.bounds, h.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    cumulative += h.counts[-1]
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {h.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+    return lines
+
+
+def render_prometheus() -> str:
+    out = [
+        "# HELP http_requests_total Requests by route and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    histograms = {
+        "http_request_duration_seconds": ("Request latency.", []),
+        "http_request_db_seconds": ("Time spent in database calls per request.", []),
+        "http_request_db_queries": ("Database round trips per request.", []),
+    }
+    acquire, serialize = [], []
+    with _lock:
+        for (method, route), m in sorted(_routes.items()):
+            labels = {"method": method, "route": route}
+            for status, count in sorted(m.statuses.items()):
+                out.append(f"http_requests_total{_labels(**labels, status=status)} {count}")
+            histograms["http_request_duration_seconds"][1].extend(
+                _histogram_lines("http_request_duration_seconds", labels, m.duration))
+            histograms["http_request_db_seconds"][1].extend(
+                _histogram_lines("http_request_db_seconds", labels, m.db_seconds))
+            histograms["http_request_db_queries"][1].extend(
+                _histogram_lines("http_request_db_queries", labels, m.queries))
+            acquire.append(f"http_request_db_acquire_seconds_total{_labels(**labels)} "
+                           f"{m.acquire_seconds}")
+            serialize.append(f"http_request_serialize_seconds_total{_labels(**labels)} "
+                             f"{m.serialize_seconds}")
+
+    for name, (help_text, lines) in histograms.items():
+        out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram", *lines]
+    out += ["# HELP http_request_db_acquire_seconds_total Time spent waiting for a "
+            "pooled connection.",
+            "# TYPE http_request_db_acquire_seconds_total counter", *acquire]
+    out += ["# HELP http_request_serialize_seconds_total Time spent validating and "
+            "rendering responses.",
+            "# TYPE http_request_serialize_seconds_total counter", *serialize]
+
+    totals = query_stats.totals()
+    out += [
+        "# HELP db_queries_total Database round trips by this process (including background work).",
+        "# TYPE db_queries_total counter",
+        f"db_queries_total {totals['queries']}",
+        "# HELP db_query_seconds_total Time spent in database calls by this process.",
+        "# TYPE db_query_seconds_total counter",
+        f"db_query_seconds_total {totals['db_seconds']}",
+    ]
+    return "\n".join(out) + "\n"
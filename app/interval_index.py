@@ -0,0 +1,363 @@
+# app/interval_index.py
+"""
+In-process interval index for scheduling lookups.
+
+Used by:
+- app.repositories.schedule_raw / schedule_orm (one ScheduleIndex each)
+- app.routers.trainers free-slot search (ScheduleIndex.find_free_slots)
+- members_* schedule_pt_session (fast overlap rejection)
+- trainers_* add_availability, admins_* create_class (incremental updates)
+
+The database stays the final authority (ptsession exclusion constraints):
+the index only lets us answer "does this overlap?" and "when is X busy/free?"
+without scanning ptsession / class / trainer_availability on every request.
+
+Times are stored as POSIX timestamps (floats). Naive datetimes are read in
+config.DB_TIMEZONE, the TimeZone every app connection runs with, so the
+index and Postgres agree on what a naive value means.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator
+from zoneinfo import ZoneInfo
+
+from app import config
+from app.models.schemas import FreeSlot
+
+
+_SESSION_TZ = ZoneInfo(config.DB_TIMEZONE)
+
+
+def to_ts(dt: datetime) -> float:
+    """datetime -> POSIX timestamp (naive values are taken in DB_TIMEZONE)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_SESSION_TZ)
+    return dt.timestamp()
+
+
+def from_ts(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class IntervalSet:
+    """
+    Half-open intervals [start, end) kept in a sorted array.
+
+    Alongside the start-sorted arrays we keep a running maximum of the end
+    times, which makes overlap tests a single binary search:
+
+        intervals with start < q_end are exactly the prefix [0, i)
+        one of them overlaps q  <=>  max(end over that prefix) > q_start
+    """
+
+    __slots__ = ("_starts", "_ends", "_max_end")
+
+    def __init__(self):
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        self._max_end: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, start: float, end: float) -> None:
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        prev = self._max_end[i - 1] if i else float("-inf")
+        self._max_end.insert(i, max(prev, end))
+        # Later prefix maxima only change while they are below `end`.
+        for k in range(i + 1, len(self._max_end)):
+            if self._max_end[k] >= end:
+                break
+            self._max_end[k] = end
+
+    def overlaps(self, start: float, end: float) -> bool:
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._max_end[i - 1] > start
+
+    def overlapping(self, start: float, end: float) -> Iterator[tuple[float, float]]:
+        """Yield (start, end) of stored intervals overlapping [start, end), by start."""
+        hi = bisect_left(self._starts, end)
+        lo = bisect_right(self._max_end, start, 0, hi)
+        for k in range(lo, hi):
+            if self._ends[k] > start:
+                yield self._starts[k], self._ends[k]
+
+
+def merge_intervals(*sorted_lists: Iterable[tuple[float, float]]) -> list[tuple[float, float]]:
+    """
+    Union of several start-sorted interval lists, as one sorted list of
+    disjoint intervals (single sweep over a k-way merge).
+    """
+    merged: list[tuple[float, float]] = []
+    for start, end in heapq.merge(*sorted_lists):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(base: list[tuple[float, float]],
+                       busy: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    """
+    base minus busy, both sorted and disjoint (as returned by merge_intervals).
+    Two-pointer sweep: O(len(base) + len(busy)).
+    """
+    free: list[tuple[float, float]] = []
+    j = 0
+    for start, end in base:
+        cursor = start
+        while j < len(busy) and busy[j][1] <= cursor:
+            j += 1
+        k = j
+        while k < len(busy) and busy[k][0] < end:
+            if busy[k][0] > cursor:
+                free.append((cursor, busy[k][0]))
+            cursor = max(cursor, busy[k][1])
+            k += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+# Index kinds
+PT_TRAINER = "pt_trainer"
+PT_ROOM = "pt_room"
+PT_MEMBER = "pt_member"
+CLASS_TRAINER = "class_trainer"
+CLASS_ROOM = "class_room"
+AVAILABILITY = "availability"
+
+# Which ptsession exclusion constraint each PT kind mirrors.
+_PT_CONSTRAINTS = (
+    (PT_TRAINER, "ptsession_trainer_no_overlap"),
+    (PT_ROOM, "ptsession_room_no_overlap"),
+    (PT_MEMBER, "ptsession_member_no_overlap"),
+)
+
+# loader() -> (pt_rows, class_rows, availability_rows), restricted to rows
+# ending after `since`:
+#   pt_rows:           (member_id, trainer_id, room_id, start_time, end_time)
+#   class_rows:        (trainer_id, room_id, start_time)
+#   availability_rows: (trainer_id, start_time, end_time)
+Loader = Callable[[datetime], tuple[Iterable, Iterable, Iterable]]
+
+
+class ScheduleIndex:
+    """
+    Per-trainer / per-room / per-member IntervalSets built from ptsession,
+    class and trainer_availability.
+
+    Loaded lazily on first use, reloaded every SCHEDULE_INDEX_TTL seconds
+    (to pick up writes made by other workers), and updated incrementally by
+    the repositories after each successful write in this process. Only rows
+    ending within SCHEDULE_INDEX_HORIZON_DAYS of now (or later) are kept;
+    queries that start before that horizon are answered as "unknown" so the
+    caller falls back to the database.
+
+    _lock only guards the in-memory sets and is held for microseconds, so
+    the async repositories can record writes from the event loop. A reload
+    queries the database under _load_lock instead. Writes recorded while it
+    runs are replayed onto the new sets before they replace the old ones
+    (an interval the loader already saw is then stored twice, which no
+    query minds).
+    """
+
+    def __init__(self, loader: Loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._sets: dict[tuple[str, int], IntervalSet] = {}
+        self._loaded_at: float | None = None
+        self._horizon: float = float("inf")
+        # Writes recorded during a reload: (method, args) to replay.
+        self._pending: list[tuple[Callable, tuple]] | None = None
+        self._generation = 0   # bumped by invalidate()
+
+    # -- loading -----------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Force a reload on next use (e.g. after the DB rejected a write we missed)."""
+        with self._lock:
+            self._loaded_at = None
+            self._generation += 1
+
+    def _ensure_loaded(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < config.SCHEDULE_INDEX_TTL:
+            return
+        with self._load_lock:
+            loaded_at = self._loaded_at
+            if loaded_at is not None and time.monotonic() - loaded_at < config.SCHEDULE_INDEX_TTL:
+                return
+            with self._lock:
+                self._pending = []
+                generation = self._generation
+            try:
+                since = datetime.now(timezone.utc) - timedelta(days=config.SCHEDULE_INDEX_HORIZON_DAYS)
+                pt_rows, class_rows, availability_rows = self._loader(since)
+
+                sets: dict[tuple[str, int], IntervalSet] = {}
+                for member_id, trainer_id, room_id, start, end in pt_rows:
+                    self._add_pt(sets, member_id, trainer_id, room_id, to_ts(start), to_ts(end))
+                for trainer_id, room_id, start in class_rows:
+                    self._add_class(sets, trainer_id, room_id, to_ts(start))
+                for trainer_id, start, end in availability_rows:
+                    self._add_availability(sets, trainer_id, to_ts(start), to_ts(end))
+
+                with self._lock:
+                    for apply, args in self._pending:
+                        apply(sets, *args)
+                    self._sets = sets
+                    self._horizon = to_ts(since)
+                    # Invalidated meanwhile: serve these sets, reload on next use.
+                    self._loaded_at = time.monotonic() if generation == self._generation else None
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    @staticmethod
+    def _set(sets, kind: str, key: int) -> IntervalSet:
+        s = sets.get((kind, key))
+        if s is None:
+            s = sets[(kind, key)] = IntervalSet()
+        return s
+
+    def _add_pt(self, sets, member_id, trainer_id, room_id, start, end) -> None:
+        self._set(sets, PT_TRAINER, trainer_id).add(start, end)
+        self._set(sets, PT_ROOM, room_id).add(start, end)
+        self._set(sets, PT_MEMBER, member_id).add(start, end)
+
+    def _add_class(self, sets, trainer_id, room_id, start) -> None:
+        end = start + config.CLASS_DURATION_MINUTES * 60
+        self._set(sets, CLASS_TRAINER, trainer_id).add(start, end)
+        self._set(sets, CLASS_ROOM, room_id).add(start, end)
+
+    def _add_availability(self, sets, trainer_id, start, end) -> None:
+        self._set(sets, AVAILABILITY, trainer_id).add(start, end)
+
+    # -- incremental updates (call after the DB write committed) -------------
+    # Never wait for a reload, so they are safe to call on the event loop.
+
+    def _record(self, apply: Callable, *args) -> None:
+        with self._lock:
+            if self._loaded_at is not None:
+                apply(self._sets, *args)
+            if self._pending is not None:
+                self._pending.append((apply, args))
+
+    def add_pt_session(self, member_id: int, trainer_id: int, room_id: int,
+                       start_time: datetime, end_time: datetime) -> None:
+        self._record(self._add_pt, member_id, trainer_id, room_id,
+                     to_ts(start_time), to_ts(end_time))
+
+    def add_class(self, trainer_id: int, room_id: int, start_time: datetime) -> None:
+        self._record(self._add_class, trainer_id, room_id, to_ts(start_time))
+
+    def add_availability(self, trainer_id: int, start_time: datetime, end_time: datetime) -> None:
+        self._record(self._add_availability, trainer_id, to_ts(start_time), to_ts(end_time))
+
+    # -- queries -----------------------------------------------------------
+
+    def covers(self, start_time: datetime) -> bool:
+        """True if the index holds every interval that could overlap from start_time on."""
+        self._ensure_loaded()
+        return to_ts(start_time) >= self._horizon
+
+    def overlaps(self, kind: str, key: int, start_time: datetime, end_time: datetime) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            s = self._sets.get((kind, key))
+            return s is not None and s.overlaps(to_ts(start_time), to_ts(end_time))
+
+    def intervals(self, kind: str, key: int, start_time: datetime,
+                  end_time: datetime) -> list[tuple[float, float]]:
+        """Stored intervals of (kind, key) overlapping the window, as timestamps."""
+        self._ensure_loaded()
+        with self._lock:
+            s = self._sets.get((kind, key))
+            if s is None:
+                return []
+            return list(s.overlapping(to_ts(start_time), to_ts(end_time)))
+
+    def keys(self, kind: str) -> list[int]:
+        self._ensure_loaded()
+        with self._lock:
+            return [key for (k, key) in self._sets if k == kind]
+
+    def pt_conflict(self, member_id: int, trainer_id: int, room_id: int,
+                    start_time: datetime, end_time: datetime) -> str | None:
+        """
+        Name of the ptsession exclusion constraint this booking would violate
+        according to the index, or None (no known conflict / not covered).
+        """
+        if not self.covers(start_time):
+            return None
+        keys = {PT_TRAINER: trainer_id, PT_ROOM: room_id, PT_MEMBER: member_id}
+        for kind, constraint in _PT_CONSTRAINTS:
+            if self.overlaps(kind, keys[kind], start_time, end_time):
+                return constraint
+        return None
+
+    def free_slots(self, trainer_id: int, start_time: datetime, end_time: datetime,
+                   duration_minutes: int, room_id: int | None = None) -> list[tuple[float, float]]:
+        """
+        Free windows of at least `duration_minutes` inside [start_time, end_time):
+
+            trainer_availability blocks
+            - trainer's PT sessions and classes
+            - (if room_id) the room's PT sessions and classes
+
+        Returned as sorted (start_ts, end_ts) pairs. The window is clipped to
+        "now": past slots are never bookable.
+        """
+        self._ensure_loaded()
+        lo, hi = max(to_ts(start_time), time.time()), to_ts(end_time)
+        if lo >= hi:
+            return []
+        min_len = duration_minutes * 60
+        with self._lock:
+            def window(kind, key):
+                s = self._sets.get((kind, key))
+                if s is None:
+                    return []
+                return [(max(a, lo), min(b, hi)) for a, b in s.overlapping(lo, hi)]
+
+            available = merge_intervals(window(AVAILABILITY, trainer_id))
+            if not available:
+                return []
+            busy_lists = [window(PT_TRAINER, trainer_id), window(CLASS_TRAINER, trainer_id)]
+            if room_id is not None:
+                busy_lists += [window(PT_ROOM, room_id), window(CLASS_ROOM, room_id)]
+
+        free = subtract_intervals(available, merge_intervals(*busy_lists))
+        return [(a, b) for a, b in free if b - a >= min_len]
+
+    def find_free_slots(self, trainer_id: int | None, start_time: datetime, end_time: datetime,
+                        duration_minutes: int, room_id: int | None = None) -> list[FreeSlot]:
+        """
+        free_slots() for one trainer, or for every trainer with availability
+        when trainer_id is None, as FreeSlot rows sorted by start_time.
+        """
+        if trainer_id is not None:
+            trainer_ids = [trainer_id]
+        else:
+            trainer_ids = self.keys(AVAILABILITY)
+
+        slots = [
+            (start, tid, end)
+            for tid in trainer_ids
+            for start, end in self.free_slots(tid, start_time, end_time, duration_minutes, room_id)
+        ]
+        slots.sort()
+        return [
+            FreeSlot(trainer_id=tid, room_id=room_id, start_time=from_ts(start), end_time=from_ts(end))
+            for start, tid, end in slots
+        ]
@@ -3,9 +3,16 @@ from fastapi import FastAPI
 from app.routers import admins, members, trainers, auth
 from fastapi.staticfiles import StaticFiles
 from app.routers import ui
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from app import config, hashing, instrumentation, notify
+from app.db_raw import close_pool
+from app.repositories.calendar_raw import start_tombstone_pruner
+from app.repositories.waitlist_raw import start_hold_sweeper
+from app.security import start_session_purger
 
 app = FastAPI(title="Health & Fitness Club Management")
+app.router.route_class = instrumentation.TimedRoute
+app.add_middleware(instrumentation.RequestMetricsMiddleware)
 
 app.include_router(admins.router)
 app.include_router(members.router)
@@ -27,6 +34,33 @@ def root_redirect():
     return RedirectResponse(url="/ui/", status_code=302)
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Per-route request / DB metrics in Prometheus text format."""
+    return PlainTextResponse(
+        instrumentation.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.on_event("startup")
+def start_background_tasks():
+    start_session_purger()
+    notify.start_listener()
+    start_hold_sweeper()
+    start_tombstone_pruner()
+
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    close_pool()
+    hashing.shutdown()
+    if config.DB_BACKEND == "async":
+        from app.db_async import close_engine
+
+        await close_engine()
+
+
 
 #uvicorn app.main:app --reload 
 #http://127.0.0.1:8000/     this should say something like status: "ok"
@@ -2,13 +2,18 @@
 from datetime import datetime, date
 
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Index,
     Integer,
+    UniqueConstraint,
     Text,
     Date,
     DateTime,
     Numeric,
     ForeignKey,
+    func,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
 
@@ -90,8 +95,18 @@ class FitnessClass(Base):
     name = Column(Text, nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
     capacity = Column(Integer, nullable=False)
+    # Maintained by the trg_class_capacity / trg_class_release triggers.
+    registered_count = Column(Integer, nullable=False, server_default="0")
+    # Seats reserved by unexpired class_hold rows.
+    held_count = Column(Integer, nullable=False, server_default="0")
+    # 'direct' | 'queued' (registrations batched by app.admission)
+    admission_mode = Column(Text, nullable=False, server_default="direct")
     trainer_id = Column(Integer, ForeignKey("trainer.trainer_id"), nullable=False)
     room_id = Column(Integer, ForeignKey("room.room_id"), nullable=False)
+    # Last change to a calendar field (trg_class_touch); drives schedule sync.
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("clock_timestamp()")
+    )
 
     trainer = relationship("Trainer", back_populates="classes")
     room = relationship("Room", back_populates="classes")
@@ -111,6 +126,10 @@ class PTSession(Base):
     room_id = Column(Integer, ForeignKey("room.room_id"), nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
+    # Last change to a calendar field (trg_ptsession_touch); drives schedule sync.
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("clock_timestamp()")
+    )
 
     member = relationship("Member", back_populates="pt_sessions")
     trainer = relationship("Trainer", back_populates="pt_sessions")
@@ -134,6 +153,46 @@ class HealthMetric(Base):
     member = relationship("Member", back_populates="health_metrics")
 
 
+class HealthMetricRollup(Base):
+    """
+    Pre-aggregated health_metric buckets (hour / day / week, UTC) for the
+    metrics history API. Maintained by triggers on health_metric (see
+    init_db.create_view_trigger_indexes); never written by the app.
+    """
+    __tablename__ = "health_metric_rollup"
+
+    member_id = Column(
+        Integer, ForeignKey("member.member_id", ondelete="CASCADE"), primary_key=True
+    )
+    metric_type = Column(Text, primary_key=True)
+    resolution = Column(Text, primary_key=True)   # "hour" | "day" | "week"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    min_value = Column(Numeric(10, 2), nullable=False)
+    max_value = Column(Numeric(10, 2), nullable=False)
+    sum_value = Column(Numeric, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    last_value = Column(Numeric(10, 2), nullable=False)
+    last_measured_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class MemberDashboardSummary(Base):
+    """
+    Per-member rollup behind member_dashboard_view.
+
+    Maintained by triggers on member, health_metric and class_registration
+    (see init_db.create_view_trigger_indexes); never written by the app.
+    """
+    __tablename__ = "member_dashboard_summary"
+
+    member_id = Column(
+        Integer, ForeignKey("member.member_id", ondelete="CASCADE"), primary_key=True
+    )
+    latest_metric_value = Column(Numeric(10, 2))
+    latest_metric_type = Column(Text)
+    latest_measured_at = Column(DateTime(timezone=True))
+    total_classes_registered = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class FitnessGoal(Base):
     __tablename__ = "fitness_goal"
 
@@ -163,11 +222,69 @@ class ClassRegistration(Base):
         default=datetime.utcnow,
         nullable=False,
     )
+    # Insert time, or the last calendar change to the class (trg_class_touch_registrations).
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("clock_timestamp()")
+    )
 
     member = relationship("Member", back_populates="class_registrations")
     fitness_class = relationship("FitnessClass", back_populates="registrations")
 
 
+class ClassWaitlist(Base):
+    """
+    Members waiting for a seat in a full class. waitlist_id gives the FIFO
+    order; promotion is done by the promote_waitlist() SQL function.
+    """
+    __tablename__ = "class_waitlist"
+    __table_args__ = (
+        UniqueConstraint("class_id", "member_id", name="uq_class_waitlist_member"),
+        Index("idx_class_waitlist_queue", "class_id", "waitlist_id"),
+    )
+
+    waitlist_id = Column(BigInteger, primary_key=True)
+    class_id = Column(Integer, ForeignKey("class.class_id", ondelete="CASCADE"), nullable=False)
+    member_id = Column(Integer, ForeignKey("member.member_id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ClassHold(Base):
+    """
+    A block of seats reserved in a class until expires_at (counted in
+    class.held_count). Expired holds are swept and their seats released.
+    """
+    __tablename__ = "class_hold"
+
+    hold_id = Column(Integer, primary_key=True)
+    class_id = Column(Integer, ForeignKey("class.class_id", ondelete="CASCADE"), nullable=False)
+    seats = Column(Integer, nullable=False)
+    label = Column(Text)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class ScheduleTombstone(Base):
+    """
+    A PT session, class or class registration that left a trainer's or
+    member's schedule (deleted or reassigned), written by the
+    trg_*_tombstone triggers so schedule sync can report deletions.
+    Pruned after CALENDAR_TOMBSTONE_RETENTION_DAYS.
+    """
+    __tablename__ = "schedule_tombstone"
+    __table_args__ = (
+        Index("idx_schedule_tombstone_trainer", "trainer_id", "deleted_at"),
+        Index("idx_schedule_tombstone_member", "member_id", "deleted_at"),
+    )
+
+    tombstone_id = Column(BigInteger, primary_key=True)
+    item_type = Column(Text, nullable=False)      # "pt_session" or "class"
+    item_id = Column(Integer, nullable=False)
+    trainer_id = Column(Integer)                  # whose feed it left (either or both)
+    member_id = Column(Integer)
+    deleted_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("clock_timestamp()"), index=True
+    )
+
+
 class TrainerAvailability(Base):
     __tablename__ = "trainer_availability"
 
@@ -177,3 +294,17 @@ class TrainerAvailability(Base):
     end_time = Column(DateTime(timezone=True), nullable=False)
 
     trainer = relationship("Trainer", back_populates="availabilities")
+
+
+class AppSession(Base):
+    """
+    Login sessions for SESSION_BACKEND=database (see app.security).
+    token_hash is the SHA-256 of the bearer token, never the token itself.
+    """
+    __tablename__ = "app_session"
+
+    token_hash = Column(Text, primary_key=True)
+    role = Column(Text, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    email = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,6 +1,8 @@
 # app/models/schemas.py
 from datetime import date, datetime
-from pydantic import BaseModel, EmailStr
+from typing import Literal
+
+from pydantic import BaseModel, EmailStr, Field
 
 # ===== Member schemas =====
 
@@ -28,6 +30,13 @@ class TrainerRegisterRequest(BaseModel):
     password: str
 
 
+class TrainerResponse(BaseModel):
+    trainer_id: int
+    name: str
+    email: EmailStr
+    specialization: str | None = None
+
+
 class AdminRegisterRequest(BaseModel):
     name: str
     email: EmailStr
@@ -45,6 +54,7 @@ class LoginResponse(BaseModel):
     role: str        # "member" | "trainer" | "admin"
     user_id: int
     email: EmailStr
+    token: str | None = None   # send as "Authorization: Bearer <token>"
 
 
 # ===== Health metrics & dashboard =====
@@ -54,6 +64,34 @@ class HealthMetricCreate(BaseModel):
     metric_value: float  # health_metric.metric_value is NUMERIC(10,2)
 
 
+class HealthMetricReading(BaseModel):
+    """One reading in a bulk ingestion batch (e.g. from a wearable)."""
+    member_id: int
+    metric_type: str
+    metric_value: float
+    measured_at: datetime   # client timestamp
+
+
+class HealthMetricReject(BaseModel):
+    index: int      # position of the reading in the submitted batch
+    reason: str
+
+
+class HealthMetricBatchResult(BaseModel):
+    accepted: int
+    rejected: list[HealthMetricReject]
+
+
+class MetricSeriesPoint(BaseModel):
+    """One point of a metric history series (a single reading at 'raw')."""
+    bucket_start: datetime
+    min_value: float
+    max_value: float
+    avg_value: float
+    last_value: float
+    sample_count: int
+
+
 class MemberDashboard(BaseModel):
     member_id: int
     name: str
@@ -64,6 +102,17 @@ class MemberDashboard(BaseModel):
     upcoming_pt_sessions: int
 
 
+class MemberDashboardBatchRequest(BaseModel):
+    """
+    Either explicit member_ids, or a keyset page: members with
+    member_id > after_id (optionally name_prefix-filtered), up to limit.
+    """
+    member_ids: list[int] | None = None
+    after_id: int | None = None
+    name_prefix: str | None = None
+    limit: int = 1000
+
+
 # ===== PT Sessions (member side) =====
 
 class PTSessionCreate(BaseModel):
@@ -96,11 +145,51 @@ class TrainerAvailabilityResponse(BaseModel):
     end_time: datetime
 
 
+class FreeSlot(BaseModel):
+    trainer_id: int
+    room_id: int | None = None   # set when the search was restricted to a room
+    start_time: datetime
+    end_time: datetime
+
+
 class TrainerScheduleItem(BaseModel):
     item_type: str        # "pt_session" or "class"
+    item_id: int          # session_id or class_id
     start_time: datetime
     end_time: datetime | None = None
     title: str
+    room_id: int
+    room_name: str
+    member_id: int | None = None      # PT sessions only
+    member_name: str | None = None    # PT sessions only
+
+
+# ===== Calendar feeds & schedule sync =====
+
+class CalendarItem(BaseModel):
+    item_type: str        # "pt_session" or "class"
+    item_id: int          # session_id or class_id
+    start_time: datetime
+    end_time: datetime    # classes: start_time + CLASS_DURATION_MINUTES
+    title: str
+    room_name: str
+    trainer_name: str
+    member_name: str | None = None    # PT sessions only
+    updated_at: datetime
+
+
+class CalendarTombstone(BaseModel):
+    item_type: str
+    item_id: int
+    deleted_at: datetime
+
+
+class CalendarSync(BaseModel):
+    items: list[CalendarItem]             # added or changed since the token
+    deleted: list[CalendarTombstone]      # removed since the token
+    sync_token: str                       # pass back as ?token= next time
+    more: bool                            # True: another page follows, ask again now
+    full: bool                            # True: the pages of this run are a full copy; replace the local one
 
 
 # ===== Rooms & Classes (admin side) =====
@@ -131,3 +220,45 @@ class ClassResponse(BaseModel):
     capacity: int
     trainer_id: int
     room_id: int
+    registered_count: int
+    held_count: int       # seats in unexpired holds
+
+
+# ===== Waitlist & seat holds =====
+
+class ClassJoinResult(BaseModel):
+    member_id: int
+    class_id: int
+    status: Literal["registered", "waitlisted"]
+    remaining_seats: int | None = None
+    position: int | None = None  # 1 = next in line (waitlisted only)
+
+
+class WaitlistPosition(BaseModel):
+    member_id: int
+    class_id: int
+    position: int
+
+
+class ClassHoldCreate(BaseModel):
+    seats: int = Field(gt=0)
+    ttl_seconds: int = Field(900, gt=0, le=7 * 24 * 3600)
+    label: str | None = None
+
+
+class ClassHoldResponse(BaseModel):
+    hold_id: int
+    class_id: int
+    seats: int
+    label: str | None = None
+    expires_at: datetime
+
+
+class ClassHoldClaim(BaseModel):
+    member_id: int
+
+
+# ===== Queued admission =====
+
+class AdmissionModeUpdate(BaseModel):
+    mode: Literal["direct", "queued"]
@@ -0,0 +1,122 @@
+# app/notify.py
+"""
+Postgres LISTEN/NOTIFY fan-in for this worker process.
+
+Used by:
+- app.cache (cross-worker invalidation on the "reference_change" channel)
+- app.events (schedule / occupancy events on the "schedule_events" channel)
+
+One daemon thread holds a dedicated autocommit connection (outside the
+db_raw pool), LISTENs on every subscribed channel and calls the channel's
+callbacks with the notification payload. Callbacks run on the listener
+thread, so they must be quick and thread-safe.
+
+If the connection drops, notifications sent meanwhile are lost: after
+reconnecting, every callback is called once with payload None, meaning
+"you may have missed something, resynchronise".
+"""
+
+import select
+import threading
+import time
+from typing import Callable
+
+import psycopg2
+from psycopg2 import sql
+
+from app import config
+
+Callback = Callable[[str | None], None]
+
+_callbacks: dict[str, list[Callback]] = {}
+_lock = threading.Lock()
+_started = False
+
+# Seconds between select() wakeups; also the reconnect backoff ceiling.
+_POLL_INTERVAL = 5.0
+
+
+def subscribe(channel: str, callback: Callback) -> None:
+    """Register callback(payload) for a channel (before or after start_listener)."""
+    with _lock:
+        _callbacks.setdefault(channel, []).append(callback)
+
+
+def publish(channel: str, payload: str = "") -> None:
+    """NOTIFY every listening worker (including this one) on channel."""
+    from app.db_raw import get_cursor
+
+    with get_cursor(commit=True) as cur:
+        cur.execute("SELECT pg_notify(%s, %s);", (channel, payload))
+
+
+def _dispatch(channel: str, payload: str | None) -> None:
+    with _lock:
+        callbacks = list(_callbacks.get(channel, ()))
+    for callback in callbacks:
+        try:
+            callback(payload)
+        except Exception:
+            # A failing subscriber must not stop delivery to the others.
+            pass
+
+
+def _connect():
+    conn = psycopg2.connect(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def _listen_loop() -> None:
+    backoff = 0.5
+    reconnecting = False
+    listening: set[str] = set()
+    while True:
+        conn = None
+        try:
+            conn = _connect()
+            listening = set()
+            if reconnecting:
+                with _lock:
+                    channels = list(_callbacks)
+                for channel in channels:
+                    _dispatch(channel, None)
+            backoff = 0.5
+            while True:
+                with _lock:
+                    wanted = set(_callbacks) - listening
+                if wanted:
+                    with conn.cursor() as cur:
+                        for channel in wanted:
+                            cur.execute(sql.SQL("LISTEN {};").format(sql.Identifier(channel)))
+                    listening |= wanted
+                if select.select([conn], [], [], _POLL_INTERVAL) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    note = conn.notifies.pop(0)
+                    _dispatch(note.channel, note.payload)
+        except Exception:
+            reconnecting = True
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, _POLL_INTERVAL)
+
+
+def start_listener() -> None:
+    """Start the listener thread for this process (idempotent)."""
+    global _started
+    with _lock:
+        if not _started:
+            threading.Thread(target=_listen_loop, name="pg-notify-listener", daemon=True).start()
+            _started = True
@@ -0,0 +1,43 @@
+# app/pagination.py
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row on a page, e.g.
+(start_time, class_id) for /admins/classes, encoded as URL-safe base64
+JSON so clients just echo it back:
+
+    GET /admins/classes?limit=100                 -> X-Next-Cursor: <c>
+    GET /admins/classes?limit=100&cursor=<c>      -> next page
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values) -> str:
+    """Encode a sort key (ints, strings, datetimes) as an opaque cursor."""
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError for anything malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, list) or len(payload) != arity:
+        raise ValueError("Invalid cursor")
+    return [
+        datetime.fromisoformat(v["dt"]) if isinstance(v, dict) and "dt" in v else v
+        for v in payload
+    ]
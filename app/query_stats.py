@@ -0,0 +1,124 @@
+# app/query_stats.py
+"""
+Database round-trip accounting per request.
+
+Used by:
+- app.db_raw (counting psycopg2 cursors)
+- app.db_orm / app.db_async (SQLAlchemy cursor-execute events)
+- app.bench (queries and DB time per benchmarked request)
+- app.instrumentation (Server-Timing header, /metrics)
+- app.slow_queries (observer of every statement, see add_observer)
+
+Whoever handles a request calls begin() and keeps the returned QueryStats;
+every statement executed in that context (including in threadpool calls
+made from it, which copy the context) adds to it. Statements outside any
+request (background threads) only count towards totals().
+"""
+
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Callable
+
+
+class QueryStats:
+    __slots__ = ("queries", "db_seconds", "acquire_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.acquire_seconds = 0.0     # waiting for a pooled connection
+        self.serialize_seconds = 0.0   # filled in by app.instrumentation
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_totals = QueryStats()
+_totals_lock = threading.Lock()
+
+# observer(statement, parameters, seconds, explainable); see add_observer.
+Observer = Callable[[str | None, Any, float, bool], None]
+_observers: list[Observer] = []
+
+
+def begin() -> tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+def add_observer(observer: Observer) -> None:
+    """
+    Call observer for every recorded statement. `explainable` is True when
+    the statement and parameters can be re-run through psycopg2 as is.
+    Observers run on the hot path, inline with the query: keep them cheap.
+    """
+    _observers.append(observer)
+
+
+def record(seconds: float, statement: str | None = None, parameters: Any = None,
+           explainable: bool = False) -> None:
+    for observer in _observers:
+        observer(statement, parameters, seconds, explainable)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+    with _totals_lock:
+        _totals.queries += 1
+        _totals.db_seconds += seconds
+
+
+def record_acquire(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.acquire_seconds += seconds
+
+
+def totals() -> dict:
+    with _totals_lock:
+        return {"queries": _totals.queries, "db_seconds": _totals.db_seconds}
+
+
+def instrument_engine(engine) -> None:
+    """Count statements and connection checkouts of a (sync) SQLAlchemy engine."""
+    from sqlalchemy import event
+
+    pool = engine.pool
+    checkout = pool.connect
+
+    def timed_checkout():
+        start = time.perf_counter()
+        try:
+            return checkout()
+        finally:
+            record_acquire(time.perf_counter() - start)
+
+    pool.connect = timed_checkout
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    # asyncpg statements use $n placeholders psycopg2 cannot re-run.
+    explainable = engine.dialect.driver == "psycopg2"
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_stats_start")
+        if starts:
+            record(time.perf_counter() - starts.pop(), statement, parameters,
+                   explainable and not executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("query_stats_start") if conn is not None else None
+        if starts:
+            record(time.perf_counter() - starts.pop())
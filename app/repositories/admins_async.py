@@ -0,0 +1,168 @@
+# app/repositories/admins_async.py
+"""
+Async admin repository (DB_BACKEND=async), mirroring admins_orm.
+
+Table exports stream from a server-side cursor and are re-exported from
+admins_raw (run in the threadpool by app.concurrency.call_repo).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, text, tuple_
+
+from app.db_async import AsyncSessionLocal
+from app.pagination import decode_cursor, encode_cursor
+from app.repositories.admins_raw import EXPORT_TABLES, iter_export_batches  # noqa: F401
+from app.repositories.schedule_raw import schedule_index
+from app.models.orm_models import Admin, Room, FitnessClass
+from app.models.schemas import (
+    RoomCreate,
+    RoomResponse,
+    ClassCreate,
+    ClassResponse,
+    AdminRegisterRequest,
+)
+
+
+def _class_response(c: FitnessClass) -> ClassResponse:
+    return ClassResponse(
+        class_id=c.class_id,
+        name=c.name,
+        start_time=c.start_time,
+        capacity=c.capacity,
+        trainer_id=c.trainer_id,
+        room_id=c.room_id,
+        registered_count=c.registered_count,
+        held_count=c.held_count,
+    )
+
+
+async def get_db_health() -> dict:
+    """Simple DB health check."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SELECT 1"))
+    return {"status": "ok"}
+
+
+async def register_admin(data: AdminRegisterRequest, password_hash: str) -> int:
+    async with AsyncSessionLocal() as session:
+        admin = Admin(name=data.name, email=data.email, password_hash=password_hash)
+        session.add(admin)
+        await session.flush()
+        admin_id = admin.admin_id
+        await session.commit()
+        return admin_id
+
+
+async def create_room(data: RoomCreate) -> RoomResponse:
+    async with AsyncSessionLocal() as session:
+        room = Room(name=data.name, capacity=data.capacity)
+        session.add(room)
+        await session.flush()
+        response = RoomResponse(room_id=room.room_id, name=room.name, capacity=room.capacity)
+        await session.commit()
+        return response
+
+
+async def list_rooms(
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[RoomResponse], str | None]:
+    q = select(Room)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        q = q.where(Room.room_id > int(after_id))
+    async with AsyncSessionLocal() as session:
+        rooms = list(await session.scalars(q.order_by(Room.room_id).limit(limit + 1)))
+
+    next_cursor = encode_cursor(rooms[limit - 1].room_id) if len(rooms) > limit else None
+    return [
+        RoomResponse(room_id=r.room_id, name=r.name, capacity=r.capacity)
+        for r in rooms[:limit]
+    ], next_cursor
+
+
+async def create_class(data: ClassCreate) -> ClassResponse:
+    async with AsyncSessionLocal() as session:
+        cls = FitnessClass(
+            name=data.name,
+            start_time=data.start_time,
+            capacity=data.capacity,
+            trainer_id=data.trainer_id,
+            room_id=data.room_id,
+        )
+        session.add(cls)
+        await session.flush()
+        # Server defaults (the seat counters) are not loaded by the flush.
+        await session.refresh(cls)
+        response = _class_response(cls)
+        await session.commit()
+
+    schedule_index.add_class(data.trainer_id, data.room_id, data.start_time)
+    return response
+
+
+async def list_classes(
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    trainer_id: int | None = None,
+    room_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[ClassResponse], str | None]:
+    """
+    One page of classes ordered by (start_time, class_id) + next cursor.
+    """
+    q = select(FitnessClass)
+    if start_from is not None:
+        q = q.where(FitnessClass.start_time >= start_from)
+    if start_to is not None:
+        q = q.where(FitnessClass.start_time < start_to)
+    if trainer_id is not None:
+        q = q.where(FitnessClass.trainer_id == trainer_id)
+    if room_id is not None:
+        q = q.where(FitnessClass.room_id == room_id)
+    if cursor:
+        after_start, after_id = decode_cursor(cursor, 2)
+        q = q.where(
+            tuple_(FitnessClass.start_time, FitnessClass.class_id)
+            > tuple_(after_start, int(after_id))
+        )
+    q = q.order_by(FitnessClass.start_time, FitnessClass.class_id).limit(limit + 1)
+
+    async with AsyncSessionLocal() as session:
+        classes = list(await session.scalars(q))
+
+    next_cursor = None
+    if len(classes) > limit:
+        last = classes[limit - 1]
+        next_cursor = encode_cursor(last.start_time, last.class_id)
+    return [_class_response(c) for c in classes[:limit]], next_cursor
+
+
+async def class_occupancy(class_ids: list[int]) -> dict[int, dict]:
+    """class_id -> {"registered_count", "held_count"}, read fresh."""
+    if not class_ids:
+        return {}
+    async with AsyncSessionLocal() as session:
+        rows = await session.execute(
+            select(
+                FitnessClass.class_id, FitnessClass.registered_count, FitnessClass.held_count
+            ).where(FitnessClass.class_id.in_(class_ids))
+        )
+        return {
+            r.class_id: {"registered_count": r.registered_count, "held_count": r.held_count}
+            for r in rows
+        }
+
+
+async def register_member_for_class(member_id: int, class_id: int) -> int:
+    """Register via the register_for_class() SQL function; returns seats left."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT register_for_class(:mid, :cid)"),
+            {"mid": member_id, "cid": class_id},
+        )
+        remaining = result.scalar_one()
+        await session.commit()
+        return remaining
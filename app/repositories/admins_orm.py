@@ -1,8 +1,13 @@
 # app/repositories/admins_orm.py
-from passlib.hash import bcrypt
+from datetime import datetime
+from typing import Iterator
+
 from app.db_orm import SessionLocal
-from sqlalchemy import text
-from app.models.orm_models import Admin, Room, FitnessClass, ClassRegistration
+from app.pagination import decode_cursor, encode_cursor
+from app.repositories.admins_raw import EXPORT_TABLES
+from app.repositories.schedule_orm import schedule_index
+from sqlalchemy import select, text, tuple_
+from app.models.orm_models import Admin, Room, FitnessClass
 from app.models.schemas import (
     RoomCreate,
     RoomResponse,
@@ -17,8 +22,7 @@ def get_db_health() -> dict:
         session.execute(text("SELECT 1"))
     return {"status": "ok"}
 
-def register_admin(data: AdminRegisterRequest) -> int:
-    password_hash = bcrypt.hash(data.password)
+def register_admin(data: AdminRegisterRequest, password_hash: str) -> int:
     with SessionLocal() as session:
         admin = Admin(
             name=data.name,
@@ -40,16 +44,38 @@ def create_room(data: RoomCreate) -> int:
         return room.room_id
 
 
-def list_rooms() -> list[RoomResponse]:
+def list_rooms(
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[RoomResponse], str | None]:
     with SessionLocal() as session:
-        rooms = session.query(Room).order_by(Room.room_id).all()
+        q = session.query(Room)
+        if cursor:
+            (after_id,) = decode_cursor(cursor, 1)
+            q = q.filter(Room.room_id > int(after_id))
+        rooms = q.order_by(Room.room_id).limit(limit + 1).all()
+
+        next_cursor = encode_cursor(rooms[limit - 1].room_id) if len(rooms) > limit else None
         return [
             RoomResponse(room_id=r.room_id, name=r.name, capacity=r.capacity)
-            for r in rooms
-        ]
+            for r in rooms[:limit]
+        ], next_cursor
+
 
+def _class_response(c: FitnessClass) -> ClassResponse:
+    return ClassResponse(
+        class_id=c.class_id,
+        name=c.name,
+        start_time=c.start_time,
+        capacity=c.capacity,
+        trainer_id=c.trainer_id,
+        room_id=c.room_id,
+        registered_count=c.registered_count,
+        held_count=c.held_count,
+    )
 
-def create_class(data: ClassCreate) -> int:
+
+def create_class(data: ClassCreate) -> ClassResponse:
     with SessionLocal() as session:
         cls = FitnessClass(
             name=data.name,
@@ -61,28 +87,93 @@ def create_class(data: ClassCreate) -> int:
         session.add(cls)
         session.commit()
         session.refresh(cls)
-        return cls.class_id
+        response = _class_response(cls)
+
+    schedule_index.add_class(data.trainer_id, data.room_id, data.start_time)
+    return response
 
 
-def list_classes() -> list[ClassResponse]:
+def list_classes(
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    trainer_id: int | None = None,
+    room_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[ClassResponse], str | None]:
+    """
+    One page of classes ordered by (start_time, class_id) + next cursor.
+    """
     with SessionLocal() as session:
-        classes = session.query(FitnessClass).order_by(FitnessClass.class_id).all()
-        return [
-            ClassResponse(
-                class_id=c.class_id,
-                name=c.name,
-                start_time=c.start_time,
-                capacity=c.capacity,
-                trainer_id=c.trainer_id,
-                room_id=c.room_id,
+        q = session.query(FitnessClass)
+        if start_from is not None:
+            q = q.filter(FitnessClass.start_time >= start_from)
+        if start_to is not None:
+            q = q.filter(FitnessClass.start_time < start_to)
+        if trainer_id is not None:
+            q = q.filter(FitnessClass.trainer_id == trainer_id)
+        if room_id is not None:
+            q = q.filter(FitnessClass.room_id == room_id)
+        if cursor:
+            after_start, after_id = decode_cursor(cursor, 2)
+            q = q.filter(
+                tuple_(FitnessClass.start_time, FitnessClass.class_id)
+                > tuple_(after_start, int(after_id))
+            )
+        classes = (
+            q.order_by(FitnessClass.start_time, FitnessClass.class_id)
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(classes) > limit:
+            last = classes[limit - 1]
+            next_cursor = encode_cursor(last.start_time, last.class_id)
+
+        return [_class_response(c) for c in classes[:limit]], next_cursor
+
+
+def class_occupancy(class_ids: list[int]) -> dict[int, dict]:
+    """class_id -> {"registered_count", "held_count"}, read fresh."""
+    if not class_ids:
+        return {}
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(
+                FitnessClass.class_id, FitnessClass.registered_count, FitnessClass.held_count
+            ).where(FitnessClass.class_id.in_(class_ids))
+        )
+        return {
+            r.class_id: {"registered_count": r.registered_count, "held_count": r.held_count}
+            for r in rows
+        }
+
+
+def iter_export_batches(table: str, batch_size: int = 5000) -> Iterator[list[tuple]]:
+    """
+    Stream an EXPORT_TABLES table in batches (server-side cursor via yield_per).
+    """
+    columns = EXPORT_TABLES[table]
+    with SessionLocal() as session:
+        result = session.execute(
+            text(f"SELECT {', '.join(columns)} FROM {table}").execution_options(
+                yield_per=batch_size
             )
-            for c in classes
-        ]
+        )
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
 
 
-def register_member_for_class(member_id: int, class_id: int) -> None:
+def register_member_for_class(member_id: int, class_id: int) -> int:
+    """
+    Register via the register_for_class() SQL function; returns seats left.
+    The seat is taken (or refused when full) by the trg_class_capacity trigger.
+    """
     with SessionLocal() as session:
-        reg = ClassRegistration(member_id=member_id, class_id=class_id)
-        session.add(reg)
-        # trigger will fire in DB and raise if full
+        remaining = session.execute(
+            text("SELECT register_for_class(:mid, :cid)"),
+            {"mid": member_id, "cid": class_id},
+        ).scalar_one()
         session.commit()
+        return remaining
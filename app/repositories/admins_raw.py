@@ -7,15 +7,16 @@ Used by:
 - /admins/register
 - /admins/rooms (GET/POST)
 - /admins/classes (GET/POST)
-- /auth/admin-login  (via verify_admin_credentials)
+- /admins/exports/{table}
 - /members/{member_id}/classes/{class_id}/register
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 
-from passlib.hash import bcrypt
-
-from app.db_raw import get_connection
+from app.db_raw import get_connection, get_named_cursor
+from app.pagination import decode_cursor, encode_cursor
+from app.repositories.schedule_raw import schedule_index
 from app.models.schemas import (
     AdminRegisterRequest,
     RoomCreate,
@@ -41,15 +42,13 @@ def get_db_health() -> dict:
 
 
 # ---------------------------------------------------------
-# Admin registration & login
+# Admin registration
 # ---------------------------------------------------------
 
-def register_admin(data: AdminRegisterRequest) -> int:
+def register_admin(data: AdminRegisterRequest, password_hash: str) -> int:
     """
     Insert a new admin into the admin table.
     """
-    password_hash = bcrypt.hash(data.password)
-
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -66,57 +65,45 @@ def register_admin(data: AdminRegisterRequest) -> int:
     return admin_id
 
 
-def verify_admin_credentials(email: str, password: str) -> Optional[int]:
-    """
-    Used by /auth/admin-login.
-
-    Returns admin_id if credentials are valid, otherwise None.
-    """
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT admin_id, password_hash
-                FROM admin
-                WHERE email = %s;
-                """,
-                (email,),
-            )
-            row = cur.fetchone()
-
-    if not row:
-        return None
-
-    admin_id, password_hash = row
-    if not bcrypt.verify(password, password_hash):
-        return None
-
-    return admin_id
-
-
 # ---------------------------------------------------------
 # Rooms
 # ---------------------------------------------------------
 
-def list_rooms() -> List[RoomResponse]:
+def list_rooms(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> tuple[List[RoomResponse], Optional[str]]:
     """
-    Return all rooms.
+    Return one page of rooms ordered by room_id, plus the cursor for the
+    next page (None on the last page).
     """
+    params: list = []
+    where = ""
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        where = "WHERE room_id > %s"
+        params.append(int(after_id))
+    params.append(limit + 1)
+
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
-                """
+                f"""
                 SELECT room_id, name, capacity
                 FROM room
-                ORDER BY room_id;
-                """
+                {where}
+                ORDER BY room_id
+                LIMIT %s;
+                """,
+                params,
             )
             rows = cur.fetchall()
 
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
     return [
         RoomResponse(room_id=r[0], name=r[1], capacity=r[2])
-        for r in rows
-    ]
+        for r in rows[:limit]
+    ], next_cursor
 
 
 def create_room(data: RoomCreate) -> RoomResponse:
@@ -143,21 +130,62 @@ def create_room(data: RoomCreate) -> RoomResponse:
 # Classes
 # ---------------------------------------------------------
 
-def list_classes() -> List[ClassResponse]:
+def list_classes(
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    trainer_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> tuple[List[ClassResponse], Optional[str]]:
     """
-    Return all fitness classes.
+    Return one page of fitness classes ordered by (start_time, class_id),
+    plus the cursor for the next page (None on the last page).
+
+    Keyset pagination on the idx_class_*_start indexes keeps each page
+    O(limit) however large the class table grows.
     """
+    where = []
+    params: list = []
+    if start_from is not None:
+        where.append("start_time >= %s")
+        params.append(start_from)
+    if start_to is not None:
+        where.append("start_time < %s")
+        params.append(start_to)
+    if trainer_id is not None:
+        where.append("trainer_id = %s")
+        params.append(trainer_id)
+    if room_id is not None:
+        where.append("room_id = %s")
+        params.append(room_id)
+    if cursor:
+        after_start, after_id = decode_cursor(cursor, 2)
+        where.append("(start_time, class_id) > (%s, %s)")
+        params.extend([after_start, int(after_id)])
+    params.append(limit + 1)
+
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
-                """
-                SELECT class_id, name, start_time, capacity, trainer_id, room_id
+                f"""
+                SELECT class_id, name, start_time, capacity, trainer_id, room_id,
+                       registered_count, held_count
                 FROM class
-                ORDER BY class_id;
-                """
+                {where_sql}
+                ORDER BY start_time, class_id
+                LIMIT %s;
+                """,
+                params,
             )
             rows = cur.fetchall()
 
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[2], last[0])
+
     return [
         ClassResponse(
             class_id=r[0],
@@ -166,9 +194,34 @@ def list_classes() -> List[ClassResponse]:
             capacity=r[3],
             trainer_id=r[4],
             room_id=r[5],
+            registered_count=r[6],
+            held_count=r[7],
         )
-        for r in rows
-    ]
+        for r in rows[:limit]
+    ], next_cursor
+
+
+def class_occupancy(class_ids: List[int]) -> dict[int, dict]:
+    """
+    class_id -> {"registered_count", "held_count"}, read fresh (primary-key
+    lookups) to go with a cached class list page.
+    """
+    if not class_ids:
+        return {}
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT class_id, registered_count, held_count
+                FROM class
+                WHERE class_id = ANY(%s);
+                """,
+                (list(class_ids),),
+            )
+            return {
+                r[0]: {"registered_count": r[1], "held_count": r[2]}
+                for r in cur.fetchall()
+            }
 
 
 def create_class(data: ClassCreate) -> ClassResponse:
@@ -181,7 +234,8 @@ def create_class(data: ClassCreate) -> ClassResponse:
                 """
                 INSERT INTO class (name, start_time, capacity, trainer_id, room_id)
                 VALUES (%s, %s, %s, %s, %s)
-                RETURNING class_id, name, start_time, capacity, trainer_id, room_id;
+                RETURNING class_id, name, start_time, capacity, trainer_id, room_id,
+                          registered_count, held_count;
                 """,
                 (
                     data.name,
@@ -194,6 +248,7 @@ def create_class(data: ClassCreate) -> ClassResponse:
             row = cur.fetchone()
         conn.commit()
 
+    schedule_index.add_class(data.trainer_id, data.room_id, data.start_time)
     return ClassResponse(
         class_id=row[0],
         name=row[1],
@@ -201,28 +256,54 @@ def create_class(data: ClassCreate) -> ClassResponse:
         capacity=row[3],
         trainer_id=row[4],
         room_id=row[5],
+        registered_count=row[6],
+        held_count=row[7],
     )
 
 
+# ---------------------------------------------------------
+# Exports (analytics dumps)
+# ---------------------------------------------------------
+
+# Exportable tables and their column order (also the CSV header).
+EXPORT_TABLES = {
+    "health_metric": ["metric_id", "member_id", "metric_type", "metric_value", "measured_at"],
+    "class_registration": ["member_id", "class_id", "registered_at"],
+    "ptsession": ["session_id", "member_id", "trainer_id", "room_id", "start_time", "end_time"],
+}
+
+
+def iter_export_batches(table: str, batch_size: int = 5000) -> Iterator[list[tuple]]:
+    """
+    Yield every row of an EXPORT_TABLES table as lists of tuples, at most
+    batch_size rows each, read through a server-side cursor so the full
+    table is never materialized.
+    """
+    columns = EXPORT_TABLES[table]  # KeyError for anything not whitelisted
+    with get_named_cursor(itersize=batch_size, cursor_factory=None) as cur:
+        cur.execute(f"SELECT {', '.join(columns)} FROM {table};")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
 # ---------------------------------------------------------
 # Class registration (used by members router)
 # ---------------------------------------------------------
 
-def register_member_for_class(member_id: int, class_id: int) -> None:
+def register_member_for_class(member_id: int, class_id: int) -> int:
     """
-    Register a member for a class.
+    Register a member for a class and return the seats left.
 
-    IMPORTANT:
-    - Sets registered_at to NOW() to satisfy NOT NULL constraint.
-    - Relies on DB trigger `trg_class_capacity` to enforce capacity.
+    One call to the register_for_class() SQL function: the insert's
+    `trg_class_capacity` trigger takes a seat with a conditional UPDATE of
+    class.registered_count and raises if the class is full.
     """
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO class_registration (member_id, class_id, registered_at)
-                VALUES (%s, %s, NOW());
-                """,
-                (member_id, class_id),
-            )
+            cur.execute("SELECT register_for_class(%s, %s);", (member_id, class_id))
+            remaining = cur.fetchone()[0]
         conn.commit()
+    return remaining
@@ -0,0 +1,29 @@
+# app/repositories/auth_async.py
+from sqlalchemy import select
+
+from app.db_async import AsyncSessionLocal
+from app.models.orm_models import Member, Trainer, Admin
+
+
+async def _credentials(model, id_attr: str, email: str):
+    """
+    Returns (user_id, email, password_hash), or None. The bcrypt check is
+    done by the caller (app.routers.auth) after the session is closed.
+    """
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(model).where(model.email == email))
+        if not user:
+            return None
+        return getattr(user, id_attr), user.email, user.password_hash
+
+
+async def member_credentials(email: str):
+    return await _credentials(Member, "member_id", email)
+
+
+async def trainer_credentials(email: str):
+    return await _credentials(Trainer, "trainer_id", email)
+
+
+async def admin_credentials(email: str):
+    return await _credentials(Admin, "admin_id", email)
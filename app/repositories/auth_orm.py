@@ -1,46 +1,32 @@
 # app/repositories/auth_orm.py
-from passlib.hash import bcrypt
+from sqlalchemy import select
+
 from app.db_orm import SessionLocal
 from app.models.orm_models import Member, Trainer, Admin
 
 
-def _check_member(email: str, password: str):
-    with SessionLocal() as session:
-        user = session.query(Member).filter(Member.email == email).first()
-        if not user:
-            return None
-        if not bcrypt.verify(password, user.password_hash):
-            return None
-        return user.member_id, user.email
-
-
-def _check_trainer(email: str, password: str):
-    with SessionLocal() as session:
-        user = session.query(Trainer).filter(Trainer.email == email).first()
-        if not user:
-            return None
-        if not bcrypt.verify(password, user.password_hash):
-            return None
-        return user.trainer_id, user.email
-
-
-def _check_admin(email: str, password: str):
+def _credentials(model, id_column, email: str):
+    """
+    (user_id, email, password_hash) for the model's row with this email, or
+    None. Only the stored hash is read here; app.routers.auth runs the
+    bcrypt check, so a slow verify never holds a DB connection.
+    """
     with SessionLocal() as session:
-        user = session.query(Admin).filter(Admin.email == email).first()
-        if not user:
-            return None
-        if not bcrypt.verify(password, user.password_hash):
-            return None
-        return user.admin_id, user.email
+        row = session.execute(
+            select(id_column, model.email, model.password_hash).where(model.email == email)
+        ).first()
+    if not row:
+        return None
+    return tuple(row)
 
 
-def login_member(email: str, password: str):
-    return _check_member(email, password)
+def member_credentials(email: str):
+    return _credentials(Member, Member.member_id, email)
 
 
-def login_trainer(email: str, password: str):
-    return _check_trainer(email, password)
+def trainer_credentials(email: str):
+    return _credentials(Trainer, Trainer.trainer_id, email)
 
 
-def login_admin(email: str, password: str):
-    return _check_admin(email, password)
+def admin_credentials(email: str):
+    return _credentials(Admin, Admin.admin_id, email)
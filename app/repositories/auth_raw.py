@@ -1,12 +1,12 @@
 # app/repositories/auth_raw.py
-from passlib.hash import bcrypt
 from app.db_raw import get_cursor
 
 
-def _check_credentials(table: str, id_column: str, email: str, password: str):
+def _credentials(table: str, id_column: str, email: str):
     """
-    Generic helper to check credentials in member/trainer/admin tables.
-    Returns (user_id, email) if valid, or None if invalid.
+    Generic helper to look up login credentials in member/trainer/admin tables.
+    Returns (user_id, email, password_hash), or None if there is no such user.
+    The bcrypt check is done by the caller (app.routers.auth), off the DB.
     """
     with get_cursor() as cur:
         cur.execute(
@@ -18,20 +18,18 @@ def _check_credentials(table: str, id_column: str, email: str, password: str):
             (email,),
         )
         row = cur.fetchone()
-        if not row:
-            return None
-        if not bcrypt.verify(password, row["password_hash"]):
-            return None
-        return row["user_id"], row["email"]
+    if not row:
+        return None
+    return row["user_id"], row["email"], row["password_hash"]
 
 
-def login_member(email: str, password: str):
-    return _check_credentials("member", "member_id", email, password)
+def member_credentials(email: str):
+    return _credentials("member", "member_id", email)
 
 
-def login_trainer(email: str, password: str):
-    return _check_credentials("trainer", "trainer_id", email, password)
+def trainer_credentials(email: str):
+    return _credentials("trainer", "trainer_id", email)
 
 
-def login_admin(email: str, password: str):
-    return _check_credentials("admin", "admin_id", email, password)
+def admin_credentials(email: str):
+    return _credentials("admin", "admin_id", email)
@@ -0,0 +1,207 @@
+# app/repositories/calendar_orm.py
+"""
+Calendar feeds and incremental schedule sync (ORM sessions, same queries
+as calendar_raw).
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import Text, cast, func, literal_column, null, select, text, tuple_, union_all
+
+from app import config
+from app.db_orm import SessionLocal
+from app.models.orm_models import (
+    ClassRegistration,
+    FitnessClass,
+    Member,
+    PTSession,
+    Room,
+    ScheduleTombstone,
+    Trainer,
+)
+from app.models.schemas import CalendarItem, CalendarTombstone
+from app.repositories.calendar_raw import OWNERS, WATERMARK_SQL
+
+
+def _check_owner(owner: str) -> None:
+    if owner not in OWNERS:
+        raise ValueError(f"owner must be one of {', '.join(OWNERS)}")
+
+
+def _schedule_query(
+    owner: str,
+    owner_id: int,
+    condition,
+    limit: int | None = None,
+    after: tuple | None = None,
+):
+    """
+    UNION ALL over the owner's PT sessions and classes.
+    condition(start_column, updated_column) returns the filters for a branch;
+    `after` is a (start_time, item_type, item_id) key to page past.
+    """
+
+    def keyset(start_col, id_col, item_type: str) -> list:
+        if after is None:
+            return []
+        after_start, after_type, after_id = after
+        return [
+            start_col >= after_start,
+            tuple_(start_col, literal_column(f"'{item_type}'"), id_col)
+            > tuple_(after_start, str(after_type), int(after_id)),
+        ]
+
+    counterpart = Member.name if owner == "trainer" else Trainer.name
+    pt_sessions = (
+        select(
+            literal_column("'pt_session'", Text).label("item_type"),
+            PTSession.session_id.label("item_id"),
+            PTSession.start_time,
+            PTSession.end_time,
+            (literal_column("'PT session with '", Text) + counterpart).label("title"),
+            Room.name.label("room_name"),
+            Trainer.name.label("trainer_name"),
+            Member.name.label("member_name"),
+            PTSession.updated_at,
+        )
+        .join(Room, Room.room_id == PTSession.room_id)
+        .join(Trainer, Trainer.trainer_id == PTSession.trainer_id)
+        .join(Member, Member.member_id == PTSession.member_id)
+        .where(
+            getattr(PTSession, f"{owner}_id") == owner_id,
+            *condition(PTSession.start_time, PTSession.updated_at),
+            *keyset(PTSession.start_time, PTSession.session_id, "pt_session"),
+        )
+    )
+
+    updated = FitnessClass.updated_at if owner == "trainer" else ClassRegistration.updated_at
+    classes = select(
+        literal_column("'class'", Text).label("item_type"),
+        FitnessClass.class_id.label("item_id"),
+        FitnessClass.start_time,
+        (FitnessClass.start_time
+         + timedelta(minutes=config.CLASS_DURATION_MINUTES)).label("end_time"),
+        FitnessClass.name.label("title"),
+        Room.name.label("room_name"),
+        Trainer.name.label("trainer_name"),
+        cast(null(), Text).label("member_name"),
+        updated.label("updated_at"),
+    )
+    if owner == "trainer":
+        classes = classes.select_from(FitnessClass).where(FitnessClass.trainer_id == owner_id)
+    else:
+        classes = (
+            classes.select_from(ClassRegistration)
+            .join(FitnessClass, FitnessClass.class_id == ClassRegistration.class_id)
+            .where(ClassRegistration.member_id == owner_id)
+        )
+    classes = (
+        classes.join(Room, Room.room_id == FitnessClass.room_id)
+        .join(Trainer, Trainer.trainer_id == FitnessClass.trainer_id)
+        .where(
+            *condition(FitnessClass.start_time, updated),
+            *keyset(FitnessClass.start_time, FitnessClass.class_id, "class"),
+        )
+    )
+
+    q = union_all(pt_sessions, classes).order_by("start_time", "item_type", "item_id")
+    if limit is not None:
+        q = q.limit(limit)
+    return q
+
+
+def feed_version(owner: str, owner_id: int) -> datetime | None:
+    _check_owner(owner)
+    class_table = FitnessClass if owner == "trainer" else ClassRegistration
+    with SessionLocal() as session:
+        return session.execute(
+            select(
+                func.greatest(
+                    select(func.max(PTSession.updated_at))
+                    .where(getattr(PTSession, f"{owner}_id") == owner_id)
+                    .scalar_subquery(),
+                    select(func.max(class_table.updated_at))
+                    .where(getattr(class_table, f"{owner}_id") == owner_id)
+                    .scalar_subquery(),
+                    select(func.max(ScheduleTombstone.deleted_at))
+                    .where(getattr(ScheduleTombstone, f"{owner}_id") == owner_id)
+                    .scalar_subquery(),
+                )
+            )
+        ).scalar_one()
+
+
+def feed_items(
+    owner: str,
+    owner_id: int,
+    start_from: datetime,
+    start_to: datetime,
+    limit: int,
+) -> list[CalendarItem]:
+    _check_owner(owner)
+    q = _schedule_query(
+        owner, owner_id,
+        lambda start, _: [start >= start_from, start < start_to],
+        limit,
+    )
+    with SessionLocal() as session:
+        return [CalendarItem(**row) for row in session.execute(q).mappings()]
+
+
+def sync_changes(
+    owner: str,
+    owner_id: int,
+    since: datetime | None,
+    start_from: datetime,
+    limit: int,
+    after: tuple | None = None,
+    watermark: datetime | None = None,
+) -> tuple[list[CalendarItem], list[CalendarTombstone], datetime, tuple | None]:
+    """One page of changes; see calendar_raw.sync_changes."""
+    _check_owner(owner)
+    if since is not None and after is None:
+        version = feed_version(owner, owner_id)
+        if version is None or version < since:
+            return [], [], since, None
+
+    with SessionLocal() as session:
+        if watermark is None:
+            watermark = session.execute(text(WATERMARK_SQL)).scalar_one()
+
+        q = _schedule_query(
+            owner, owner_id,
+            (lambda start, _: [start >= start_from]) if since is None
+            else (lambda start, updated: [updated >= since, start >= start_from]),
+            limit + 1,
+            after,
+        )
+        items = [CalendarItem(**row) for row in session.execute(q).mappings()]
+
+        tombstones = []
+        if since is not None and after is None:
+            tombstones = session.execute(
+                select(
+                    ScheduleTombstone.item_type,
+                    ScheduleTombstone.item_id,
+                    func.max(ScheduleTombstone.deleted_at).label("deleted_at"),
+                )
+                .where(
+                    getattr(ScheduleTombstone, f"{owner}_id") == owner_id,
+                    ScheduleTombstone.deleted_at >= since,
+                )
+                .group_by(ScheduleTombstone.item_type, ScheduleTombstone.item_id)
+            ).mappings().all()
+
+    next_after = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_after = (last.start_time, last.item_type, last.item_id)
+
+    current = {(i.item_type, i.item_id) for i in items}
+    deleted = [
+        CalendarTombstone(**row)
+        for row in tombstones
+        if (row["item_type"], row["item_id"]) not in current
+    ]
+    return items, deleted, watermark, next_after
@@ -0,0 +1,293 @@
+# app/repositories/calendar_raw.py
+"""
+Calendar feeds and incremental schedule sync (raw SQL).
+
+Used by:
+- app.ical (GET /trainers/{id}/schedule.ics, GET /members/{id}/schedule.ics,
+  GET .../schedule/sync)
+
+A trainer's schedule is their PT sessions and classes; a member's is their
+PT sessions and the classes they are registered for. Every row carries
+updated_at and deletions leave a schedule_tombstone row (triggers in
+init_db.create_view_trigger_indexes, section 7), so:
+
+    feed_version   - latest change for one owner: three index-only max()
+                     lookups, the basis of the feed's ETag / Last-Modified
+    sync_changes   - one page of rows changed and tombstones written since
+                     a watermark
+
+Also runs the background pruner that drops old tombstones
+(start_tombstone_pruner).
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from app import config
+from app.db_raw import get_cursor
+from app.models.schemas import CalendarItem, CalendarTombstone
+
+OWNERS = ("trainer", "member")
+
+_VERSION_SQL = """
+    SELECT GREATEST(
+        (SELECT max(updated_at) FROM ptsession WHERE {owner}_id = %s),
+        (SELECT max(updated_at) FROM {class_table} WHERE {owner}_id = %s),
+        (SELECT max(deleted_at) FROM schedule_tombstone WHERE {owner}_id = %s)
+    ) AS version;
+"""
+
+_PT_SELECT = """
+    SELECT
+        'pt_session' AS item_type,
+        p.session_id AS item_id,
+        p.start_time,
+        p.end_time,
+        'PT session with ' || {counterpart}.name AS title,
+        r.name AS room_name,
+        t.name AS trainer_name,
+        m.name AS member_name,
+        p.updated_at
+    FROM ptsession p
+    JOIN room r ON r.room_id = p.room_id
+    JOIN trainer t ON t.trainer_id = p.trainer_id
+    JOIN member m ON m.member_id = p.member_id
+    WHERE p.{owner}_id = %s AND {where}
+"""
+
+_CLASS_SELECT = """
+    SELECT
+        'class' AS item_type,
+        c.class_id AS item_id,
+        c.start_time,
+        c.start_time + make_interval(mins => {class_minutes}) AS end_time,
+        c.name AS title,
+        r.name AS room_name,
+        t.name AS trainer_name,
+        NULL::text AS member_name,
+        {updated} AS updated_at
+    FROM {source}
+    JOIN room r ON r.room_id = c.room_id
+    JOIN trainer t ON t.trainer_id = c.trainer_id
+    WHERE {owner_column} = %s AND {where}
+"""
+
+# Oldest open transaction in this database (or now, if there is none).
+# A row's updated_at is never earlier than its transaction's start, so
+# every row not yet visible here will have updated_at >= this value.
+WATERMARK_SQL = """
+    SELECT LEAST(clock_timestamp(), min(xact_start)) AS watermark
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND xact_start IS NOT NULL
+      AND pid <> pg_backend_pid();
+"""
+
+
+def _check_owner(owner: str) -> None:
+    if owner not in OWNERS:
+        raise ValueError(f"owner must be one of {', '.join(OWNERS)}")
+
+
+def _select_items(
+    cur,
+    owner: str,
+    owner_id: int,
+    condition: Callable[[str, str], str],
+    params: list,
+    limit: int | None = None,
+    after: tuple | None = None,
+) -> list[CalendarItem]:
+    """
+    Run one UNION ALL over the owner's PT sessions and classes.
+    condition(start_column, updated_column) is applied to both branches,
+    with the same params. `after` is a (start_time, item_type, item_id)
+    key: only items sorting after it are returned.
+    """
+
+    def where(start: str, updated: str, item_type: str, id_column: str) -> tuple[str, list]:
+        clause, branch_params = condition(start, updated), [owner_id, *params]
+        if after is not None:
+            after_start, after_type, after_id = after
+            clause += f" AND {start} >= %s AND ({start}, %s, {id_column}) > (%s, %s, %s)"
+            branch_params += [after_start, item_type, after_start, str(after_type), int(after_id)]
+        return clause, branch_params
+
+    pt_where, pt_params = where("p.start_time", "p.updated_at", "pt_session", "p.session_id")
+    pt = _PT_SELECT.format(
+        owner=owner,
+        counterpart="m" if owner == "trainer" else "t",
+        where=pt_where,
+    )
+    if owner == "trainer":
+        source, owner_column, updated = "class c", "c.trainer_id", "c.updated_at"
+    else:
+        source = "class_registration cr JOIN class c ON c.class_id = cr.class_id"
+        owner_column, updated = "cr.member_id", "cr.updated_at"
+    class_where, class_params = where("c.start_time", updated, "class", "c.class_id")
+    classes = _CLASS_SELECT.format(
+        class_minutes=int(config.CLASS_DURATION_MINUTES),
+        updated=updated,
+        source=source,
+        owner_column=owner_column,
+        where=class_where,
+    )
+    sql = f"({pt}) UNION ALL ({classes}) ORDER BY start_time, item_type, item_id"
+    all_params = [*pt_params, *class_params]
+    if limit is not None:
+        sql += " LIMIT %s"
+        all_params.append(limit)
+    cur.execute(sql + ";", all_params)
+    return [CalendarItem(**row) for row in cur.fetchall()]
+
+
+def feed_version(owner: str, owner_id: int) -> datetime | None:
+    """Time of the owner's latest schedule change (None if they never had one)."""
+    _check_owner(owner)
+    class_table = "class" if owner == "trainer" else "class_registration"
+    with get_cursor() as cur:
+        cur.execute(
+            _VERSION_SQL.format(owner=owner, class_table=class_table),
+            (owner_id, owner_id, owner_id),
+        )
+        return cur.fetchone()["version"]
+
+
+def feed_items(
+    owner: str,
+    owner_id: int,
+    start_from: datetime,
+    start_to: datetime,
+    limit: int,
+) -> list[CalendarItem]:
+    """The owner's items starting in [start_from, start_to), by start time."""
+    _check_owner(owner)
+    with get_cursor() as cur:
+        return _select_items(
+            cur, owner, owner_id,
+            lambda start, _: f"{start} >= %s AND {start} < %s",
+            [start_from, start_to],
+            limit,
+        )
+
+
+def sync_changes(
+    owner: str,
+    owner_id: int,
+    since: datetime | None,
+    start_from: datetime,
+    limit: int,
+    after: tuple | None = None,
+    watermark: datetime | None = None,
+) -> tuple[list[CalendarItem], list[CalendarTombstone], datetime, tuple | None]:
+    """
+    One page (up to `limit` items, by start time) of the items starting at
+    or after start_from that changed at or after `since`, the tombstones
+    written since then, the watermark to pass as `since` once the last
+    page is in, and the key to pass as `after` for the next page (None on
+    the last page). since=None is a full sync (no tombstones).
+
+    The first page (after=None) takes the watermark and returns the
+    tombstones; later pages pass both the key and that watermark back, so
+    nothing changed while paging is lost: it is past the watermark.
+
+    Items changed around the watermark can be sent twice; clients upsert
+    by (item_type, item_id), so that is harmless.
+    """
+    _check_owner(owner)
+    if since is not None and after is None:
+        version = feed_version(owner, owner_id)
+        if version is None or version < since:
+            # Nothing committed since the last sync: the token stays valid.
+            return [], [], since, None
+
+    with get_cursor() as cur:
+        if watermark is None:
+            cur.execute(WATERMARK_SQL)
+            watermark = cur.fetchone()["watermark"]
+
+        if since is None:
+            items = _select_items(
+                cur, owner, owner_id,
+                lambda start, _: f"{start} >= %s",
+                [start_from],
+                limit + 1,
+                after,
+            )
+        else:
+            items = _select_items(
+                cur, owner, owner_id,
+                lambda start, updated: f"{updated} >= %s AND {start} >= %s",
+                [since, start_from],
+                limit + 1,
+                after,
+            )
+
+        tombstones = []
+        if since is not None and after is None:
+            cur.execute(
+                f"""
+                SELECT item_type, item_id, max(deleted_at) AS deleted_at
+                FROM schedule_tombstone
+                WHERE {owner}_id = %s AND deleted_at >= %s
+                GROUP BY item_type, item_id;
+                """,
+                (owner_id, since),
+            )
+            tombstones = cur.fetchall()
+
+    next_after = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_after = (last.start_time, last.item_type, last.item_id)
+
+    # Deleted and then re-created (e.g. cancelled and re-registered): the
+    # item itself is in `items`, so the tombstone is dropped. If it is on
+    # a later page, the tombstone goes first and the item still wins.
+    current = {(i.item_type, i.item_id) for i in items}
+    deleted = [
+        CalendarTombstone(**row)
+        for row in tombstones
+        if (row["item_type"], row["item_id"]) not in current
+    ]
+    return items, deleted, watermark, next_after
+
+
+def prune_tombstones() -> int:
+    """Drop tombstones older than CALENDAR_TOMBSTONE_RETENTION_DAYS; returns how many."""
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "DELETE FROM schedule_tombstone WHERE deleted_at < now() - make_interval(days => %s);",
+            (config.CALENDAR_TOMBSTONE_RETENTION_DAYS,),
+        )
+        return cur.rowcount
+
+
+# ---------------------------------------------------------
+# Background pruner
+# ---------------------------------------------------------
+
+def _prune_loop() -> None:
+    while True:
+        time.sleep(config.CALENDAR_PRUNE_INTERVAL)
+        try:
+            prune_tombstones()
+        except Exception:
+            # Best effort; the next round retries.
+            pass
+
+
+_pruner_started = False
+_pruner_lock = threading.Lock()
+
+
+def start_tombstone_pruner() -> None:
+    """Start the thread that prunes tombstones every CALENDAR_PRUNE_INTERVAL (idempotent)."""
+    global _pruner_started
+    with _pruner_lock:
+        if not _pruner_started:
+            threading.Thread(target=_prune_loop, name="schedule-tombstone-pruner", daemon=True).start()
+            _pruner_started = True
@@ -0,0 +1,191 @@
+# app/repositories/members_async.py
+"""
+Async member repository (DB_BACKEND=async), mirroring members_orm.
+
+Bulk ingestion and batch dashboards stream through COPY / server-side
+cursors, so they are re-exported from members_raw and run in the
+threadpool by app.concurrency.call_repo.
+"""
+
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db_async import AsyncSessionLocal
+from app.repositories.members_raw import (  # noqa: F401  (sync fallbacks)
+    _PT_OVERLAP_ERRORS,
+    add_health_metrics_batch,
+    iter_member_dashboards,
+)
+from app.repositories.admins_async import register_member_for_class
+from app.repositories.schedule_raw import schedule_index
+from app.models.orm_models import (
+    Member,
+    HealthMetric,
+    HealthMetricRollup,
+    PTSession,
+)
+from app.models.schemas import (
+    MemberRegisterRequest,
+    HealthMetricCreate,
+    MemberDashboard,
+    MetricSeriesPoint,
+    PTSessionCreate,
+)
+
+
+def _constraint_name(e: IntegrityError) -> str | None:
+    """Constraint named by an asyncpg integrity error (wrapped by SQLAlchemy)."""
+    return getattr(getattr(e.orig, "__cause__", None), "constraint_name", None)
+
+
+async def register_for_class(member_id: int, class_id: int) -> int:
+    """Same seat-counter path as admins_async.register_member_for_class."""
+    return await register_member_for_class(member_id, class_id)
+
+
+async def register_member(data: MemberRegisterRequest, password_hash: str) -> int:
+    async with AsyncSessionLocal() as session:
+        member = Member(
+            name=data.name,
+            dob=data.dob,
+            gender=data.gender,
+            email=data.email,
+            phone=data.phone,
+            password_hash=password_hash,
+        )
+        session.add(member)
+        await session.flush()
+        member_id = member.member_id
+        await session.commit()
+        return member_id
+
+
+async def add_health_metric(member_id: int, metric: HealthMetricCreate) -> int:
+    async with AsyncSessionLocal() as session:
+        hm = HealthMetric(
+            member_id=member_id,
+            metric_type=metric.metric_type,
+            metric_value=metric.metric_value,
+            measured_at=datetime.utcnow(),
+        )
+        session.add(hm)
+        await session.flush()
+        metric_id = hm.metric_id
+        await session.commit()
+        return metric_id
+
+
+async def get_metric_history(
+    member_id: int,
+    metric_type: str,
+    resolution: str,
+    start_time=None,
+    end_time=None,
+    limit: int = 1000,
+) -> list[MetricSeriesPoint]:
+    """
+    Time series for one member and metric_type, oldest first: raw readings,
+    or hour/day/week buckets from health_metric_rollup.
+    """
+    async with AsyncSessionLocal() as session:
+        if resolution == "raw":
+            q = select(HealthMetric).where(
+                HealthMetric.member_id == member_id,
+                HealthMetric.metric_type == metric_type,
+            )
+            if start_time is not None:
+                q = q.where(HealthMetric.measured_at >= start_time)
+            if end_time is not None:
+                q = q.where(HealthMetric.measured_at < end_time)
+            rows = await session.scalars(q.order_by(HealthMetric.measured_at).limit(limit))
+            return [
+                MetricSeriesPoint(
+                    bucket_start=hm.measured_at,
+                    min_value=hm.metric_value,
+                    max_value=hm.metric_value,
+                    avg_value=hm.metric_value,
+                    last_value=hm.metric_value,
+                    sample_count=1,
+                )
+                for hm in rows
+            ]
+
+        q = select(HealthMetricRollup).where(
+            HealthMetricRollup.member_id == member_id,
+            HealthMetricRollup.metric_type == metric_type,
+            HealthMetricRollup.resolution == resolution,
+        )
+        if start_time is not None:
+            q = q.where(HealthMetricRollup.bucket_start >= start_time)
+        if end_time is not None:
+            q = q.where(HealthMetricRollup.bucket_start < end_time)
+        rows = await session.scalars(q.order_by(HealthMetricRollup.bucket_start).limit(limit))
+        return [
+            MetricSeriesPoint(
+                bucket_start=r.bucket_start,
+                min_value=r.min_value,
+                max_value=r.max_value,
+                avg_value=r.sum_value / r.sample_count,
+                last_value=r.last_value,
+                sample_count=r.sample_count,
+            )
+            for r in rows
+        ]
+
+
+async def get_member_dashboard(member_id: int) -> MemberDashboard | None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT * FROM member_dashboard_view WHERE member_id = :mid"),
+            {"mid": member_id},
+        )
+        row = result.mappings().first()
+        if not row:
+            return None
+        return MemberDashboard(**row)
+
+
+async def schedule_pt_session(member_id: int, data: PTSessionCreate) -> int:
+    """
+    Insert the session and let the ptsession exclusion constraints reject
+    overlaps (see members_raw.schedule_pt_session).
+    """
+    if data.end_time <= data.start_time:
+        raise ValueError("end_time must be after start_time")
+
+    # The index may reload from the database, so check it off the loop.
+    conflict = await run_in_threadpool(
+        schedule_index.pt_conflict,
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time,
+    )
+    if conflict:
+        raise ValueError(_PT_OVERLAP_ERRORS[conflict])
+
+    async with AsyncSessionLocal() as session:
+        pts = PTSession(
+            member_id=member_id,
+            trainer_id=data.trainer_id,
+            room_id=data.room_id,
+            start_time=data.start_time,
+            end_time=data.end_time,
+        )
+        session.add(pts)
+        try:
+            await session.flush()
+        except IntegrityError as e:
+            await session.rollback()
+            message = _PT_OVERLAP_ERRORS.get(_constraint_name(e))
+            if message is None:
+                raise
+            schedule_index.invalidate()
+            raise ValueError(message) from e
+        session_id = pts.session_id
+        await session.commit()
+
+    schedule_index.add_pt_session(
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time
+    )
+    return session_id
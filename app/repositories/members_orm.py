@@ -1,35 +1,37 @@
 # app/repositories/members_orm.py
 from datetime import datetime
+from typing import Iterator
 
-from sqlalchemy import text, or_
-from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
 
 from app.db_orm import SessionLocal
-from app.models.orm_models import Member, HealthMetric, PTSession, ClassRegistration
+from app.repositories.admins_orm import register_member_for_class
+from app.repositories.members_raw import _PT_OVERLAP_ERRORS
+from app.repositories.schedule_orm import schedule_index
+from app.models.orm_models import (
+    Member,
+    HealthMetric,
+    HealthMetricRollup,
+    PTSession,
+)
 from app.models.schemas import (
     MemberRegisterRequest,
     HealthMetricCreate,
+    HealthMetricReading,
     MemberDashboard,
+    MetricSeriesPoint,
     PTSessionCreate,
 )
 
-def register_for_class(member_id: int, class_id: int) -> None:
+def register_for_class(member_id: int, class_id: int) -> int:
     """
-    Register a member for a class using ORM.
-    Ensures registered_at is non-null.
+    Register a member for a class; returns the seats left.
+    Same seat-counter path as admins_orm.register_member_for_class.
     """
-    with SessionLocal() as session:
-        reg = ClassRegistration(
-            member_id=member_id,
-            class_id=class_id,
-            registered_at=datetime.utcnow(),  # important
-        )
-        session.add(reg)
-        session.commit()
+    return register_member_for_class(member_id, class_id)
 
-def register_member(data: MemberRegisterRequest) -> int:
-    password_hash = bcrypt.hash(data.password)
+def register_member(data: MemberRegisterRequest, password_hash: str) -> int:
     with SessionLocal() as session:
         member = Member(
             name=data.name,
@@ -59,9 +61,108 @@ def add_health_metric(member_id: int, metric: HealthMetricCreate) -> int:
         return hm.metric_id
 
 
+def add_health_metrics_batch(readings: list[HealthMetricReading]) -> list[tuple[int, str]]:
+    """
+    Bulk-insert readings in one transaction (multi-row INSERT via
+    executemany). Unknown member ids are checked set-wise and returned as
+    (position, reason) rejects.
+    """
+    rejects: list[tuple[int, str]] = []
+    if not readings:
+        return rejects
+
+    with SessionLocal() as session:
+        known = set(
+            session.scalars(
+                select(Member.member_id).where(
+                    Member.member_id.in_({r.member_id for r in readings})
+                )
+            )
+        )
+
+        rows = []
+        for pos, r in enumerate(readings):
+            if r.member_id not in known:
+                rejects.append((pos, f"Unknown member_id {r.member_id}"))
+                continue
+            rows.append(
+                {
+                    "member_id": r.member_id,
+                    "metric_type": r.metric_type,
+                    "metric_value": r.metric_value,
+                    "measured_at": r.measured_at,
+                }
+            )
+
+        if rows:
+            session.execute(insert(HealthMetric), rows)
+            session.commit()
+
+    return rejects
+
+
+def get_metric_history(
+    member_id: int,
+    metric_type: str,
+    resolution: str,
+    start_time=None,
+    end_time=None,
+    limit: int = 1000,
+) -> list[MetricSeriesPoint]:
+    """
+    Time series for one member and metric_type, oldest first: raw readings,
+    or hour/day/week buckets from health_metric_rollup.
+    """
+    with SessionLocal() as session:
+        if resolution == "raw":
+            q = session.query(HealthMetric).filter(
+                HealthMetric.member_id == member_id,
+                HealthMetric.metric_type == metric_type,
+            )
+            if start_time is not None:
+                q = q.filter(HealthMetric.measured_at >= start_time)
+            if end_time is not None:
+                q = q.filter(HealthMetric.measured_at < end_time)
+            rows = q.order_by(HealthMetric.measured_at).limit(limit).all()
+            return [
+                MetricSeriesPoint(
+                    bucket_start=hm.measured_at,
+                    min_value=hm.metric_value,
+                    max_value=hm.metric_value,
+                    avg_value=hm.metric_value,
+                    last_value=hm.metric_value,
+                    sample_count=1,
+                )
+                for hm in rows
+            ]
+
+        q = session.query(HealthMetricRollup).filter(
+            HealthMetricRollup.member_id == member_id,
+            HealthMetricRollup.metric_type == metric_type,
+            HealthMetricRollup.resolution == resolution,
+        )
+        if start_time is not None:
+            q = q.filter(HealthMetricRollup.bucket_start >= start_time)
+        if end_time is not None:
+            q = q.filter(HealthMetricRollup.bucket_start < end_time)
+        rows = q.order_by(HealthMetricRollup.bucket_start).limit(limit).all()
+        return [
+            MetricSeriesPoint(
+                bucket_start=r.bucket_start,
+                min_value=r.min_value,
+                max_value=r.max_value,
+                avg_value=r.sum_value / r.sample_count,
+                last_value=r.last_value,
+                sample_count=r.sample_count,
+            )
+            for r in rows
+        ]
+
+
 def get_member_dashboard(member_id: int) -> MemberDashboard | None:
     """
-    Use the existing view member_dashboard_view via text SQL.
+    Use the existing view member_dashboard_view via text SQL
+    (one member_dashboard_summary row + indexed upcoming-PT count).
     """
     with SessionLocal() as session:
         row = (
@@ -83,52 +184,61 @@ def get_member_dashboard(member_id: int) -> MemberDashboard | None:
         return MemberDashboard(**row)
 
 
-def _has_time_conflict(
-    session: Session,
-    entity,
-    filter_column,
-    filter_value: int,
-    start_time,
-    end_time,
-) -> bool:
-    return (
-        session.query(entity)
-        .filter(
-            filter_column == filter_value,
-            # overlapping: NOT (end <= start OR start >= end)
-            ~(
-                (entity.end_time <= start_time)
-                | (entity.start_time >= end_time)
-            ),
+def iter_member_dashboards(
+    member_ids: list[int] | None = None,
+    after_id: int | None = None,
+    name_prefix: str | None = None,
+    limit: int | None = None,
+) -> Iterator[MemberDashboard]:
+    """
+    Stream dashboards for many members from one query over
+    member_dashboard_view (server-side cursor via yield_per).
+    """
+    where = []
+    params: dict = {}
+    if member_ids is not None:
+        where.append("member_id = ANY(:ids)")
+        params["ids"] = list(member_ids)
+    if after_id is not None:
+        where.append("member_id > :after_id")
+        params["after_id"] = after_id
+    if name_prefix:
+        where.append("name LIKE :name_pattern")
+        params["name_pattern"] = (
+            name_prefix.replace("%", r"\%").replace("_", r"\_") + "%"
         )
-        .count()
-        > 0
-    )
+
+    sql = "SELECT * FROM member_dashboard_view"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY member_id"
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+
+    with SessionLocal() as session:
+        result = session.execute(
+            text(sql).execution_options(yield_per=1000), params
+        )
+        for row in result.mappings():
+            yield MemberDashboard(**row)
 
 
 def schedule_pt_session(member_id: int, data: PTSessionCreate) -> int:
+    """
+    Insert the session and let the ptsession exclusion constraints reject
+    overlaps, instead of querying for conflicts first (which raced).
+    """
     if data.end_time <= data.start_time:
         raise ValueError("end_time must be after start_time")
 
-    with SessionLocal() as session:
-        # Trainer conflict
-        if _has_time_conflict(
-            session, PTSession, PTSession.trainer_id, data.trainer_id, data.start_time, data.end_time
-        ):
-            raise ValueError("Trainer is not available in this time slot")
-
-        # Room conflict
-        if _has_time_conflict(
-            session, PTSession, PTSession.room_id, data.room_id, data.start_time, data.end_time
-        ):
-            raise ValueError("Room is not available in this time slot")
-
-        # Member conflict
-        if _has_time_conflict(
-            session, PTSession, PTSession.member_id, member_id, data.start_time, data.end_time
-        ):
-            raise ValueError("Member already has a session in this time slot")
+    conflict = schedule_index.pt_conflict(
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time
+    )
+    if conflict:
+        raise ValueError(_PT_OVERLAP_ERRORS[conflict])
 
+    with SessionLocal() as session:
         pts = PTSession(
             member_id=member_id,
             trainer_id=data.trainer_id,
@@ -137,6 +247,20 @@ def schedule_pt_session(member_id: int, data: PTSessionCreate) -> int:
             end_time=data.end_time,
         )
         session.add(pts)
+        try:
+            session.flush()
+        except IntegrityError as e:
+            session.rollback()
+            diag = getattr(e.orig, "diag", None)
+            message = _PT_OVERLAP_ERRORS.get(getattr(diag, "constraint_name", None))
+            if message is None:
+                raise
+            schedule_index.invalidate()
+            raise ValueError(message) from e
+        session_id = pts.session_id
         session.commit()
-        session.refresh(pts)
-        return pts.session_id
+
+    schedule_index.add_pt_session(
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time
+    )
+    return session_id
@@ -1,33 +1,31 @@
 # app/repositories/members_raw.py
-from passlib.hash import bcrypt
+import io
+from typing import Iterator
 
-from app.db_raw import get_cursor, get_connection
+from psycopg2 import errors
+
+from app.db_raw import get_cursor, get_connection, get_named_cursor
+from app.repositories.admins_raw import register_member_for_class
+from app.repositories.schedule_raw import schedule_index
 from app.models.schemas import (
     MemberRegisterRequest,
     HealthMetricCreate,
+    HealthMetricReading,
     MemberDashboard,
+    MetricSeriesPoint,
     PTSessionCreate,
 )
 
 
-def register_for_class(member_id: int, class_id: int) -> None:
+def register_for_class(member_id: int, class_id: int) -> int:
     """
-    Register a member in a class using plain SQL.
-    Sets registered_at to NOW() to satisfy NOT NULL constraint.
+    Register a member in a class; returns the seats left.
+    Same seat-counter path as admins_raw.register_member_for_class.
     """
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO class_registration (member_id, class_id, registered_at)
-                VALUES (%s, %s, NOW())
-                """,
-                (member_id, class_id),
-            )
-        conn.commit()
+    return register_member_for_class(member_id, class_id)
 
 
-def register_member(data: MemberRegisterRequest) -> int:
+def register_member(data: MemberRegisterRequest, password_hash: str) -> int:
     """
     Insert a new member and return the generated member_id.
 
@@ -35,8 +33,6 @@ def register_member(data: MemberRegisterRequest) -> int:
     so the NOT NULL constraint on member.created_at is satisfied
     even when using raw SQL.
     """
-    password_hash = bcrypt.hash(data.password)
-
     with get_cursor(commit=True) as cur:
         cur.execute(
             """
@@ -83,10 +79,125 @@ def add_health_metric(member_id: int, metric: HealthMetricCreate) -> int:
         return row["metric_id"] if isinstance(row, dict) else row[0]
 
 
+def _copy_text(value: str) -> str:
+    """Escape a value for COPY ... FROM STDIN (text format)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def add_health_metrics_batch(readings: list[HealthMetricReading]) -> list[tuple[int, str]]:
+    """
+    Bulk-insert readings for any number of members in one transaction.
+
+    Member ids are validated with a single set-wise query; readings for
+    unknown members are returned as (position, reason) rejects instead of
+    failing the batch. Accepted rows are loaded with COPY, which fires the
+    health_metric statement triggers once for the whole batch.
+    """
+    rejects: list[tuple[int, str]] = []
+    if not readings:
+        return rejects
+
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT member_id FROM member WHERE member_id = ANY(%s);",
+                (list({r.member_id for r in readings}),),
+            )
+            known = {row[0] for row in cur.fetchall()}
+
+            buf = io.StringIO()
+            for pos, r in enumerate(readings):
+                if r.member_id not in known:
+                    rejects.append((pos, f"Unknown member_id {r.member_id}"))
+                    continue
+                buf.write(
+                    f"{r.member_id}\t{_copy_text(r.metric_type)}\t"
+                    f"{r.metric_value:.2f}\t{r.measured_at.isoformat()}\n"
+                )
+
+            if len(rejects) < len(readings):
+                buf.seek(0)
+                cur.copy_expert(
+                    """
+                    COPY health_metric (member_id, metric_type, metric_value, measured_at)
+                    FROM STDIN
+                    """,
+                    buf,
+                )
+
+    return rejects
+
+
+def get_metric_history(
+    member_id: int,
+    metric_type: str,
+    resolution: str,
+    start_time=None,
+    end_time=None,
+    limit: int = 1000,
+) -> list[MetricSeriesPoint]:
+    """
+    Time series for one member and metric_type, oldest first.
+
+    resolution "raw" reads health_metric directly; "hour" / "day" / "week"
+    read the trigger-maintained health_metric_rollup table, so a year of
+    daily points is ~365 primary-key-ordered rows.
+    """
+    params: list = [member_id, metric_type]
+    if resolution == "raw":
+        time_col = "measured_at"
+        sql = """
+            SELECT
+                measured_at  AS bucket_start,
+                metric_value AS min_value,
+                metric_value AS max_value,
+                metric_value AS avg_value,
+                metric_value AS last_value,
+                1            AS sample_count
+            FROM health_metric
+            WHERE member_id = %s AND metric_type = %s
+        """
+    else:
+        time_col = "bucket_start"
+        sql = """
+            SELECT
+                bucket_start,
+                min_value,
+                max_value,
+                sum_value / sample_count AS avg_value,
+                last_value,
+                sample_count
+            FROM health_metric_rollup
+            WHERE member_id = %s AND metric_type = %s AND resolution = %s
+        """
+        params.append(resolution)
+
+    if start_time is not None:
+        sql += f" AND {time_col} >= %s"
+        params.append(start_time)
+    if end_time is not None:
+        sql += f" AND {time_col} < %s"
+        params.append(end_time)
+    sql += f" ORDER BY {time_col} LIMIT %s;"
+    params.append(limit)
+
+    with get_cursor() as cur:
+        cur.execute(sql, params)
+        return [MetricSeriesPoint(**row) for row in cur.fetchall()]
+
+
 def get_member_dashboard(member_id: int) -> MemberDashboard | None:
     """
     Read from the member_dashboard_view for this member.
     Returns None if the member doesn't exist in the view.
+
+    The view reads one trigger-maintained member_dashboard_summary row
+    (by primary key) plus an indexed count of upcoming PT sessions.
     """
     with get_cursor() as cur:
         cur.execute(
@@ -104,96 +215,107 @@ def get_member_dashboard(member_id: int) -> MemberDashboard | None:
         return MemberDashboard(**row)
 
 
-def _has_time_conflict_for_trainer(trainer_id: int, start_time, end_time) -> bool:
-    with get_cursor() as cur:
-        cur.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM ptsession
-            WHERE trainer_id = %s
-              AND NOT (end_time <= %s OR start_time >= %s);
-            """,
-            (trainer_id, start_time, end_time),
-        )
-        row = cur.fetchone()
-        return (row["cnt"] if isinstance(row, dict) else row[0]) > 0
+def iter_member_dashboards(
+    member_ids: list[int] | None = None,
+    after_id: int | None = None,
+    name_prefix: str | None = None,
+    limit: int | None = None,
+) -> Iterator[MemberDashboard]:
+    """
+    Stream dashboards for many members from one query over
+    member_dashboard_view, ordered by member_id.
 
+    Uses a server-side cursor, so memory stays bounded however many
+    members match.
+    """
+    where = []
+    params: list = []
+    if member_ids is not None:
+        where.append("member_id = ANY(%s)")
+        params.append(list(member_ids))
+    if after_id is not None:
+        where.append("member_id > %s")
+        params.append(after_id)
+    if name_prefix:
+        where.append("name LIKE %s")
+        params.append(name_prefix.replace("%", r"\%").replace("_", r"\_") + "%")
 
-def _has_time_conflict_for_room(room_id: int, start_time, end_time) -> bool:
-    with get_cursor() as cur:
-        cur.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM ptsession
-            WHERE room_id = %s
-              AND NOT (end_time <= %s OR start_time >= %s);
-            """,
-            (room_id, start_time, end_time),
-        )
-        row = cur.fetchone()
-        return (row["cnt"] if isinstance(row, dict) else row[0]) > 0
+    sql = "SELECT * FROM member_dashboard_view"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY member_id"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
 
+    with get_named_cursor() as cur:
+        cur.execute(sql, params)
+        for row in cur:
+            yield MemberDashboard(**row)
 
-def _has_time_conflict_for_member(member_id: int, start_time, end_time) -> bool:
-    with get_cursor() as cur:
-        cur.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM ptsession
-            WHERE member_id = %s
-              AND NOT (end_time <= %s OR start_time >= %s);
-            """,
-            (member_id, start_time, end_time),
-        )
-        row = cur.fetchone()
-        return (row["cnt"] if isinstance(row, dict) else row[0]) > 0
+
+# Exclusion constraints created in init_db.create_view_trigger_indexes,
+# mapped to the error messages the API has always returned.
+_PT_OVERLAP_ERRORS = {
+    "ptsession_trainer_no_overlap": "Trainer is not available in this time slot",
+    "ptsession_room_no_overlap": "Room is not available in this time slot",
+    "ptsession_member_no_overlap": "Member already has a session in this time slot",
+}
 
 
 def schedule_pt_session(member_id: int, data: PTSessionCreate) -> int:
     """
     Schedule a PT session if there are no time conflicts for the member,
     trainer, or room. Returns the new session_id.
+
+    Overlap is enforced by the database (exclusion constraints on
+    ptsession), so this is a single INSERT: no check-then-insert race,
+    and concurrent bookings for different trainers/rooms never block
+    each other.
     """
     if data.end_time <= data.start_time:
         raise ValueError("end_time must be after start_time")
 
-    # Check conflicts
-    if _has_time_conflict_for_trainer(
-        data.trainer_id, data.start_time, data.end_time
-    ):
-        raise ValueError("Trainer is not available in this time slot")
-
-    if _has_time_conflict_for_room(
-        data.room_id, data.start_time, data.end_time
-    ):
-        raise ValueError("Room is not available in this time slot")
-
-    if _has_time_conflict_for_member(
-        member_id, data.start_time, data.end_time
-    ):
-        raise ValueError("Member already has a session in this time slot")
+    # Known conflicts are rejected from the in-process index without a
+    # round trip; anything the index misses is still caught by the DB.
+    conflict = schedule_index.pt_conflict(
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time
+    )
+    if conflict:
+        raise ValueError(_PT_OVERLAP_ERRORS[conflict])
 
-    # If all clear, insert
-    with get_cursor(commit=True) as cur:
-        cur.execute(
-            """
-            INSERT INTO ptsession (
-                member_id,
-                trainer_id,
-                room_id,
-                start_time,
-                end_time
+    try:
+        with get_cursor(commit=True) as cur:
+            cur.execute(
+                """
+                INSERT INTO ptsession (
+                    member_id,
+                    trainer_id,
+                    room_id,
+                    start_time,
+                    end_time
+                )
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING session_id;
+                """,
+                (
+                    member_id,
+                    data.trainer_id,
+                    data.room_id,
+                    data.start_time,
+                    data.end_time,
+                ),
             )
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING session_id;
-            """,
-            (
-                member_id,
-                data.trainer_id,
-                data.room_id,
-                data.start_time,
-                data.end_time,
-            ),
-        )
-        row = cur.fetchone()
-        return row["session_id"] if isinstance(row, dict) else row[0]
+            row = cur.fetchone()
+    except errors.ExclusionViolation as e:
+        message = _PT_OVERLAP_ERRORS.get(e.diag.constraint_name)
+        if message is None:
+            raise
+        # Another worker booked this slot since our last reload.
+        schedule_index.invalidate()
+        raise ValueError(message) from e
+
+    schedule_index.add_pt_session(
+        member_id, data.trainer_id, data.room_id, data.start_time, data.end_time
+    )
+    return row["session_id"] if isinstance(row, dict) else row[0]
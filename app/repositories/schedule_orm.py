@@ -0,0 +1,47 @@
+# app/repositories/schedule_orm.py
+"""
+ORM loader for the in-process schedule index (app.interval_index).
+
+Other *_orm repositories import `schedule_index` from here to check
+overlaps before writing and to record what they wrote.
+
+Also serves free-slot searches (/trainers/free-slots,
+/trainers/{trainer_id}/free-slots) straight from the index.
+"""
+
+from datetime import datetime
+
+from app.db_orm import SessionLocal
+from app.interval_index import ScheduleIndex
+from app.models.orm_models import PTSession, FitnessClass, TrainerAvailability
+
+
+def _load_schedule_rows(since: datetime):
+    with SessionLocal() as session:
+        pt_rows = session.query(
+            PTSession.member_id,
+            PTSession.trainer_id,
+            PTSession.room_id,
+            PTSession.start_time,
+            PTSession.end_time,
+        ).filter(PTSession.end_time > since).all()
+
+        class_rows = session.query(
+            FitnessClass.trainer_id,
+            FitnessClass.room_id,
+            FitnessClass.start_time,
+        ).filter(FitnessClass.start_time > since).all()
+
+        availability_rows = session.query(
+            TrainerAvailability.trainer_id,
+            TrainerAvailability.start_time,
+            TrainerAvailability.end_time,
+        ).filter(TrainerAvailability.end_time > since).all()
+
+    return pt_rows, class_rows, availability_rows
+
+
+schedule_index = ScheduleIndex(_load_schedule_rows)
+
+# Free-slot search for the routers (served from the index, no query).
+find_free_slots = schedule_index.find_free_slots
@@ -0,0 +1,61 @@
+# app/repositories/schedule_raw.py
+"""
+Raw-SQL loader for the in-process schedule index (app.interval_index).
+
+Other *_raw repositories import `schedule_index` from here to check
+overlaps before writing and to record what they wrote.
+
+Also serves free-slot searches (/trainers/free-slots,
+/trainers/{trainer_id}/free-slots) straight from the index.
+"""
+
+from datetime import datetime
+
+from app.db_raw import get_cursor
+from app.interval_index import ScheduleIndex
+
+
+def _load_schedule_rows(since: datetime):
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT member_id, trainer_id, room_id, start_time, end_time
+            FROM ptsession
+            WHERE end_time > %s;
+            """,
+            (since,),
+        )
+        pt_rows = [
+            (r["member_id"], r["trainer_id"], r["room_id"], r["start_time"], r["end_time"])
+            for r in cur.fetchall()
+        ]
+
+        cur.execute(
+            """
+            SELECT trainer_id, room_id, start_time
+            FROM class
+            WHERE start_time > %s;
+            """,
+            (since,),
+        )
+        class_rows = [(r["trainer_id"], r["room_id"], r["start_time"]) for r in cur.fetchall()]
+
+        cur.execute(
+            """
+            SELECT trainer_id, start_time, end_time
+            FROM trainer_availability
+            WHERE end_time > %s;
+            """,
+            (since,),
+        )
+        availability_rows = [
+            (r["trainer_id"], r["start_time"], r["end_time"]) for r in cur.fetchall()
+        ]
+
+    return pt_rows, class_rows, availability_rows
+
+
+schedule_index = ScheduleIndex(_load_schedule_rows)
+
+# Free-slot search for the routers (served from the index, no query).
+find_free_slots = schedule_index.find_free_slots
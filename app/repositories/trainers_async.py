@@ -0,0 +1,205 @@
+# app/repositories/trainers_async.py
+"""
+Async trainer repository (DB_BACKEND=async), mirroring trainers_orm.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, Text, cast, literal_column, null, select, tuple_, union_all
+
+from app.db_async import AsyncSessionLocal
+from app.pagination import decode_cursor, encode_cursor
+from app.repositories.schedule_raw import schedule_index
+from app.models.orm_models import (
+    FitnessClass,
+    Member,
+    PTSession,
+    Room,
+    Trainer,
+    TrainerAvailability,
+)
+from app.models.schemas import (
+    TrainerAvailabilityCreate,
+    TrainerAvailabilityResponse,
+    TrainerScheduleItem,
+    TrainerRegisterRequest,
+    TrainerResponse,
+)
+
+
+async def register_trainer(data: TrainerRegisterRequest, password_hash: str) -> int:
+    async with AsyncSessionLocal() as session:
+        trainer = Trainer(
+            name=data.name,
+            email=data.email,
+            specialization=data.specialization,
+            password_hash=password_hash,
+        )
+        session.add(trainer)
+        await session.flush()
+        trainer_id = trainer.trainer_id
+        await session.commit()
+        return trainer_id
+
+
+async def list_trainers(
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[TrainerResponse], str | None]:
+    q = select(Trainer)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        q = q.where(Trainer.trainer_id > int(after_id))
+    async with AsyncSessionLocal() as session:
+        trainers = list(await session.scalars(q.order_by(Trainer.trainer_id).limit(limit + 1)))
+
+    next_cursor = (
+        encode_cursor(trainers[limit - 1].trainer_id) if len(trainers) > limit else None
+    )
+    return [
+        TrainerResponse(
+            trainer_id=t.trainer_id,
+            name=t.name,
+            email=t.email,
+            specialization=t.specialization,
+        )
+        for t in trainers[:limit]
+    ], next_cursor
+
+
+async def add_availability(trainer_id: int, data: TrainerAvailabilityCreate) -> TrainerAvailabilityResponse:
+    if data.end_time <= data.start_time:
+        raise ValueError("end_time must be after start_time")
+
+    async with AsyncSessionLocal() as session:
+        av = TrainerAvailability(
+            trainer_id=trainer_id,
+            start_time=data.start_time,
+            end_time=data.end_time,
+        )
+        session.add(av)
+        await session.flush()
+        created = TrainerAvailabilityResponse(
+            availability_id=av.availability_id,
+            trainer_id=av.trainer_id,
+            start_time=av.start_time,
+            end_time=av.end_time,
+        )
+        await session.commit()
+
+    schedule_index.add_availability(trainer_id, data.start_time, data.end_time)
+    return created
+
+
+async def list_availability(trainer_id: int) -> list[TrainerAvailabilityResponse]:
+    async with AsyncSessionLocal() as session:
+        avs = await session.scalars(
+            select(TrainerAvailability)
+            .where(TrainerAvailability.trainer_id == trainer_id)
+            .order_by(TrainerAvailability.start_time)
+        )
+        return [
+            TrainerAvailabilityResponse(
+                availability_id=a.availability_id,
+                trainer_id=a.trainer_id,
+                start_time=a.start_time,
+                end_time=a.end_time,
+            )
+            for a in avs
+        ]
+
+
+def _schedule_query(
+    trainer_id: int,
+    start_from: datetime | None,
+    start_to: datetime | None,
+    after: list | None,
+    limit: int,
+):
+    """
+    UNION ALL of the trainer's PT sessions and classes, each branch
+    ordered and limited on its own (trainer_id, start_time, id) index.
+    """
+
+    def window(start_col, id_col, item_type: str) -> list:
+        conditions = []
+        if start_from is not None:
+            conditions.append(start_col >= start_from)
+        if start_to is not None:
+            conditions.append(start_col < start_to)
+        if after is not None:
+            after_start, after_type, after_id = after
+            conditions += [
+                start_col >= after_start,
+                tuple_(start_col, literal_column(f"'{item_type}'"), id_col)
+                > tuple_(after_start, str(after_type), int(after_id)),
+            ]
+        return conditions
+
+    pt_sessions = (
+        select(
+            literal_column("'pt_session'", Text).label("item_type"),
+            PTSession.session_id.label("item_id"),
+            PTSession.start_time,
+            PTSession.end_time,
+            (literal_column("'PT session with '", Text) + Member.name).label("title"),
+            PTSession.room_id,
+            Room.name.label("room_name"),
+            PTSession.member_id,
+            Member.name.label("member_name"),
+        )
+        .join(Room, Room.room_id == PTSession.room_id)
+        .join(Member, Member.member_id == PTSession.member_id)
+        .where(
+            PTSession.trainer_id == trainer_id,
+            *window(PTSession.start_time, PTSession.session_id, "pt_session"),
+        )
+        .order_by(PTSession.start_time, PTSession.session_id)
+        .limit(limit + 1)
+    )
+    classes = (
+        select(
+            literal_column("'class'", Text).label("item_type"),
+            FitnessClass.class_id.label("item_id"),
+            FitnessClass.start_time,
+            cast(null(), DateTime(timezone=True)).label("end_time"),
+            FitnessClass.name.label("title"),
+            FitnessClass.room_id,
+            Room.name.label("room_name"),
+            cast(null(), Integer).label("member_id"),
+            cast(null(), Text).label("member_name"),
+        )
+        .join(Room, Room.room_id == FitnessClass.room_id)
+        .where(
+            FitnessClass.trainer_id == trainer_id,
+            *window(FitnessClass.start_time, FitnessClass.class_id, "class"),
+        )
+        .order_by(FitnessClass.start_time, FitnessClass.class_id)
+        .limit(limit + 1)
+    )
+    return (
+        union_all(pt_sessions, classes)
+        .order_by("start_time", "item_type", "item_id")
+        .limit(limit + 1)
+    )
+
+
+async def get_trainer_schedule(
+    trainer_id: int,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[TrainerScheduleItem], str | None]:
+    after = decode_cursor(cursor, 3) if cursor else None
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            _schedule_query(trainer_id, start_from, start_to, after, limit)
+        )
+        rows = result.mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["start_time"], last["item_type"], last["item_id"])
+    return [TrainerScheduleItem(**row) for row in rows[:limit]], next_cursor
@@ -1,19 +1,22 @@
 # app/repositories/trainers_raw.py
-from passlib.hash import bcrypt
+from datetime import datetime
+
 from app.db_raw import get_cursor
+from app.pagination import decode_cursor, encode_cursor
+from app.repositories.schedule_raw import schedule_index
 from app.models.schemas import (
     TrainerAvailabilityCreate,
     TrainerAvailabilityResponse,
     TrainerScheduleItem,
     TrainerRegisterRequest,
+    TrainerResponse,
 )
 
 
-def register_trainer(data: TrainerRegisterRequest) -> int:
+def register_trainer(data: TrainerRegisterRequest, password_hash: str) -> int:
     """
     Create a new trainer with a hashed password.
     """
-    password_hash = bcrypt.hash(data.password)
     with get_cursor(commit=True) as cur:
         cur.execute(
             """
@@ -27,9 +30,41 @@ def register_trainer(data: TrainerRegisterRequest) -> int:
         return row["trainer_id"]
 
 
-def add_availability(trainer_id: int, data: TrainerAvailabilityCreate) -> int:
+def list_trainers(
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[TrainerResponse], str | None]:
+    """
+    One page of trainers ordered by trainer_id, plus the next-page cursor.
+    """
+    params: list = []
+    where = ""
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        where = "WHERE trainer_id > %s"
+        params.append(int(after_id))
+    params.append(limit + 1)
+
+    with get_cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT trainer_id, name, email, specialization
+            FROM trainer
+            {where}
+            ORDER BY trainer_id
+            LIMIT %s;
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+
+    next_cursor = encode_cursor(rows[limit - 1]["trainer_id"]) if len(rows) > limit else None
+    return [TrainerResponse(**row) for row in rows[:limit]], next_cursor
+
+
+def add_availability(trainer_id: int, data: TrainerAvailabilityCreate) -> TrainerAvailabilityResponse:
     """
-    Insert a new availability block for a trainer and return availability_id.
+    Insert a new availability block for a trainer and return it.
     """
     if data.end_time <= data.start_time:
         raise ValueError("end_time must be after start_time")
@@ -39,12 +74,14 @@ def add_availability(trainer_id: int, data: TrainerAvailabilityCreate) -> int:
             """
             INSERT INTO trainer_availability (trainer_id, start_time, end_time)
             VALUES (%s, %s, %s)
-            RETURNING availability_id;
+            RETURNING availability_id, trainer_id, start_time, end_time;
             """,
             (trainer_id, data.start_time, data.end_time),
         )
         row = cur.fetchone()
-        return row["availability_id"]
+
+    schedule_index.add_availability(trainer_id, data.start_time, data.end_time)
+    return TrainerAvailabilityResponse(**row)
 
 
 def list_availability(trainer_id: int) -> list[TrainerAvailabilityResponse]:
@@ -65,46 +102,95 @@ def list_availability(trainer_id: int) -> list[TrainerAvailabilityResponse]:
         return [TrainerAvailabilityResponse(**row) for row in rows]
 
 
-def get_trainer_schedule(trainer_id: int) -> list[TrainerScheduleItem]:
+def get_trainer_schedule(
+    trainer_id: int,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[TrainerScheduleItem], str | None]:
     """
-    Combined schedule for trainer:
-    - PT sessions from ptsession
-    - Classes from class
+    One page of a trainer's PT sessions and classes starting in
+    [start_from, start_to), ordered by (start_time, item_type, item_id),
+    plus the next-page cursor.
+
+    One UNION ALL query: each branch walks its (trainer_id, start_time, id)
+    index from the window start / cursor and stops after limit + 1 rows,
+    so a page costs the same however long the trainer's history is.
     """
-    items: list[TrainerScheduleItem] = []
+    after = decode_cursor(cursor, 3) if cursor else None
 
-    with get_cursor() as cur:
-        # PT sessions
-        cur.execute(
-            """
-            SELECT
-                'pt_session' AS item_type,
-                start_time,
-                end_time,
-                'PT session with member ' || member_id::text AS title
-            FROM ptsession
-            WHERE trainer_id = %s
-            """,
-            (trainer_id,),
-        )
-        for row in cur.fetchall():
-            items.append(TrainerScheduleItem(**row))
+    def branch_filter(alias: str, item_type: str, id_column: str) -> tuple[str, list]:
+        conditions = [f"{alias}.trainer_id = %s"]
+        params: list = [trainer_id]
+        if start_from is not None:
+            conditions.append(f"{alias}.start_time >= %s")
+            params.append(start_from)
+        if start_to is not None:
+            conditions.append(f"{alias}.start_time < %s")
+            params.append(start_to)
+        if after is not None:
+            after_start, after_type, after_id = after
+            # The plain range keeps the index scan bounded; the row
+            # comparison skips what the previous page already returned.
+            conditions.append(
+                f"{alias}.start_time >= %s AND "
+                f"({alias}.start_time, %s, {alias}.{id_column}) > (%s, %s, %s)"
+            )
+            params += [after_start, item_type, after_start, str(after_type), int(after_id)]
+        return " AND ".join(conditions), params
 
-        # Classes
+    pt_where, pt_params = branch_filter("p", "pt_session", "session_id")
+    class_where, class_params = branch_filter("c", "class", "class_id")
+
+    with get_cursor() as cur:
         cur.execute(
-            """
-            SELECT
-                'class' AS item_type,
-                start_time,
-                NULL::timestamptz AS end_time,
-                name AS title
-            FROM class
-            WHERE trainer_id = %s
+            f"""
+            (
+                SELECT
+                    'pt_session' AS item_type,
+                    p.session_id AS item_id,
+                    p.start_time,
+                    p.end_time,
+                    'PT session with ' || m.name AS title,
+                    p.room_id,
+                    r.name AS room_name,
+                    p.member_id,
+                    m.name AS member_name
+                FROM ptsession p
+                JOIN room r ON r.room_id = p.room_id
+                JOIN member m ON m.member_id = p.member_id
+                WHERE {pt_where}
+                ORDER BY p.start_time, p.session_id
+                LIMIT %s
+            )
+            UNION ALL
+            (
+                SELECT
+                    'class' AS item_type,
+                    c.class_id AS item_id,
+                    c.start_time,
+                    NULL::timestamptz AS end_time,
+                    c.name AS title,
+                    c.room_id,
+                    r.name AS room_name,
+                    NULL::int AS member_id,
+                    NULL::text AS member_name
+                FROM class c
+                JOIN room r ON r.room_id = c.room_id
+                WHERE {class_where}
+                ORDER BY c.start_time, c.class_id
+                LIMIT %s
+            )
+            ORDER BY start_time, item_type, item_id
+            LIMIT %s;
             """,
-            (trainer_id,),
+            [*pt_params, limit + 1, *class_params, limit + 1, limit + 1],
         )
-        for row in cur.fetchall():
-            items.append(TrainerScheduleItem(**row))
+        rows = cur.fetchall()
 
-    items.sort(key=lambda x: x.start_time)
-    return items
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["start_time"], last["item_type"], last["item_id"])
+    return [TrainerScheduleItem(**row) for row in rows[:limit]], next_cursor
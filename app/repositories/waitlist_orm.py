@@ -0,0 +1,99 @@
+# app/repositories/waitlist_orm.py
+"""
+Class waitlist and seat holds (ORM sessions over the same SQL functions
+as waitlist_raw).
+"""
+
+from sqlalchemy import delete, select, text
+
+from app import config
+from app.db_orm import SessionLocal
+from app.models.orm_models import ClassHold, ClassRegistration, ClassWaitlist
+from app.models.schemas import ClassHoldCreate, ClassHoldResponse, ClassJoinResult
+
+
+def join_class(member_id: int, class_id: int) -> ClassJoinResult:
+    with SessionLocal() as session:
+        row = session.execute(
+            text(
+                "SELECT status, remaining_seats, queue_position "
+                "FROM join_class(:mid, :cid, :timeout_ms)"
+            ),
+            {"mid": member_id, "cid": class_id, "timeout_ms": config.WAITLIST_LOCK_TIMEOUT_MS},
+        ).one()
+        session.commit()
+    return ClassJoinResult(
+        member_id=member_id,
+        class_id=class_id,
+        status=row.status,
+        remaining_seats=row.remaining_seats,
+        position=row.queue_position,
+    )
+
+
+def get_waitlist_position(member_id: int, class_id: int) -> int | None:
+    with SessionLocal() as session:
+        return session.execute(
+            text("SELECT waitlist_position(:mid, :cid)"),
+            {"mid": member_id, "cid": class_id},
+        ).scalar()
+
+
+def leave_waitlist(member_id: int, class_id: int) -> bool:
+    with SessionLocal() as session:
+        result = session.execute(
+            delete(ClassWaitlist).where(
+                ClassWaitlist.class_id == class_id,
+                ClassWaitlist.member_id == member_id,
+            )
+        )
+        session.commit()
+        return result.rowcount > 0
+
+
+def cancel_registration(member_id: int, class_id: int) -> bool:
+    """The trg_class_release trigger promotes from the waitlist."""
+    with SessionLocal() as session:
+        result = session.execute(
+            delete(ClassRegistration).where(
+                ClassRegistration.member_id == member_id,
+                ClassRegistration.class_id == class_id,
+            )
+        )
+        session.commit()
+        return result.rowcount > 0
+
+
+def create_hold(class_id: int, data: ClassHoldCreate) -> ClassHoldResponse:
+    with SessionLocal() as session:
+        hold_id = session.execute(
+            text("SELECT create_class_hold(:cid, :seats, :ttl, :label)"),
+            {"cid": class_id, "seats": data.seats, "ttl": data.ttl_seconds, "label": data.label},
+        ).scalar_one()
+        hold = session.scalars(select(ClassHold).where(ClassHold.hold_id == hold_id)).one()
+        response = ClassHoldResponse(
+            hold_id=hold.hold_id,
+            class_id=hold.class_id,
+            seats=hold.seats,
+            label=hold.label,
+            expires_at=hold.expires_at,
+        )
+        session.commit()
+        return response
+
+
+def release_hold(hold_id: int) -> bool:
+    with SessionLocal() as session:
+        result = session.execute(delete(ClassHold).where(ClassHold.hold_id == hold_id))
+        session.commit()
+        return result.rowcount > 0
+
+
+def claim_hold(hold_id: int, member_id: int) -> int:
+    with SessionLocal() as session:
+        seats_left = session.execute(
+            text("SELECT claim_class_hold(:hid, :mid)"),
+            {"hid": hold_id, "mid": member_id},
+        ).scalar_one()
+        session.commit()
+        return seats_left
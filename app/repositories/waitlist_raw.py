@@ -0,0 +1,135 @@
+# app/repositories/waitlist_raw.py
+"""
+Class waitlist and seat holds (raw SQL).
+
+Seat accounting, FIFO promotion and hold expiry live in SQL functions
+created by init_db.create_view_trigger_indexes (join_class,
+promote_waitlist, create_class_hold, claim_class_hold, expire_class_holds);
+each call here is a single round trip.
+
+Also runs the background sweeper that expires holds (start_hold_sweeper).
+"""
+
+import threading
+import time
+
+from app import config
+from app.db_raw import get_cursor
+from app.models.schemas import ClassHoldCreate, ClassHoldResponse, ClassJoinResult
+
+
+def join_class(member_id: int, class_id: int) -> ClassJoinResult:
+    """
+    Register if a seat is free and nobody is queued, otherwise join the
+    waitlist (idempotent: re-joining returns the current state).
+    """
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "SELECT status, remaining_seats, queue_position FROM join_class(%s, %s, %s);",
+            (member_id, class_id, config.WAITLIST_LOCK_TIMEOUT_MS),
+        )
+        row = cur.fetchone()
+    return ClassJoinResult(
+        member_id=member_id,
+        class_id=class_id,
+        status=row["status"],
+        remaining_seats=row["remaining_seats"],
+        position=row["queue_position"],
+    )
+
+
+def get_waitlist_position(member_id: int, class_id: int) -> int | None:
+    """1-based place in the class's queue, or None if not waitlisted."""
+    with get_cursor() as cur:
+        cur.execute("SELECT waitlist_position(%s, %s) AS position;", (member_id, class_id))
+        return cur.fetchone()["position"]
+
+
+def leave_waitlist(member_id: int, class_id: int) -> bool:
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "DELETE FROM class_waitlist WHERE class_id = %s AND member_id = %s;",
+            (class_id, member_id),
+        )
+        return cur.rowcount > 0
+
+
+def cancel_registration(member_id: int, class_id: int) -> bool:
+    """
+    Drop a registration. The freed seat is handed to the head of the
+    waitlist by the trg_class_release trigger, in the same transaction.
+    """
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "DELETE FROM class_registration WHERE member_id = %s AND class_id = %s;",
+            (member_id, class_id),
+        )
+        return cur.rowcount > 0
+
+
+def create_hold(class_id: int, data: ClassHoldCreate) -> ClassHoldResponse:
+    with get_cursor(commit=True) as cur:
+        # Two statements: the new row is not visible to the snapshot of the
+        # statement that inserts it.
+        cur.execute(
+            "SELECT create_class_hold(%s, %s, %s, %s) AS hold_id;",
+            (class_id, data.seats, data.ttl_seconds, data.label),
+        )
+        hold_id = cur.fetchone()["hold_id"]
+        cur.execute(
+            """
+            SELECT hold_id, class_id, seats, label, expires_at
+            FROM class_hold
+            WHERE hold_id = %s;
+            """,
+            (hold_id,),
+        )
+        return ClassHoldResponse(**cur.fetchone())
+
+
+def release_hold(hold_id: int) -> bool:
+    """Give a hold's unclaimed seats back (promoting from the waitlist)."""
+    with get_cursor(commit=True) as cur:
+        cur.execute("DELETE FROM class_hold WHERE hold_id = %s;", (hold_id,))
+        return cur.rowcount > 0
+
+
+def claim_hold(hold_id: int, member_id: int) -> int:
+    """Register member_id on one of the hold's seats; returns seats left on the hold."""
+    with get_cursor(commit=True) as cur:
+        cur.execute("SELECT claim_class_hold(%s, %s) AS seats_left;", (hold_id, member_id))
+        return cur.fetchone()["seats_left"]
+
+
+def expire_holds() -> int:
+    """Release expired holds and catch up on skipped promotions."""
+    with get_cursor(commit=True) as cur:
+        cur.execute("SELECT expire_class_holds() AS expired;")
+        return cur.fetchone()["expired"]
+
+
+# ---------------------------------------------------------
+# Background sweeper
+# ---------------------------------------------------------
+
+def _sweep_loop() -> None:
+    while True:
+        time.sleep(config.WAITLIST_SWEEP_INTERVAL)
+        try:
+            expire_holds()
+        except Exception:
+            # Best effort; the next round retries.
+            pass
+
+
+_sweeper_started = False
+_sweeper_lock = threading.Lock()
+
+
+def start_hold_sweeper() -> None:
+    """Start the thread that expires holds every WAITLIST_SWEEP_INTERVAL (idempotent)."""
+    global _sweeper_started
+    with _sweeper_lock:
+        if not _sweeper_started:
+            threading.Thread(target=_sweep_loop, name="class-hold-sweeper", daemon=True).start()
+            _sweeper_started = True
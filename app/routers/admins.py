@@ -5,30 +5,76 @@ Admin-facing API endpoints.
 Routes implemented:
 - GET  /admins/db-health          -> basic DB health check
 - POST /admins/register           -> create new admin
-- GET  /admins/rooms              -> list rooms
+- GET  /admins/rooms              -> list rooms (keyset-paginated)
 - POST /admins/rooms              -> create room
-- GET  /admins/classes            -> list classes
+- GET  /admins/classes            -> list classes (filters + keyset-paginated)
 - POST /admins/classes            -> create class
+- POST /admins/classes/{id}/holds -> reserve a block of seats until it expires
+- DELETE /admins/holds/{id}       -> release a hold's unclaimed seats
+- POST /admins/holds/{id}/claim   -> register a member on a held seat
+- GET  /admins/exports/{table}    -> stream a table as NDJSON or CSV
+- GET  /admins/hashing-stats      -> password hashing pool latency
+- GET  /admins/cache-stats        -> reference-data cache hit/miss counters
+- PUT  /admins/classes/{id}/admission-mode -> direct or queued (batched) registration
+- GET  /admins/admission-stats    -> queued admission batch sizes / waits
+- GET  /admins/slow-queries       -> worst statement fingerprints (+ EXPLAIN plans)
+- DELETE /admins/slow-queries     -> reset the slow-query log
+- GET  /admins/events             -> live schedule / occupancy events (SSE)
+- GET  /admins/event-stats        -> event stream subscriber and delivery counters
+
+Room and class lists are served from app.cache.reference_cache and carry
+an ETag; a matching If-None-Match gets 304 Not Modified. Seat counts
+change too often to cache, so each class page gets fresh
+registered_count / held_count and an ETag covering them.
 """
 
-import os
-from fastapi import APIRouter, HTTPException
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from app import admission, config, events, hashing, slow_queries
+from app.cache import compute_etag, etag_matches, not_modified, reference_cache, set_etag
+from app.concurrency import call_repo
+from app.hashing import HashingBusyError, hash_password
+from app.instrumentation import TimedRoute
 from app.models.schemas import (
     AdminRegisterRequest,
+    AdmissionModeUpdate,
     RoomCreate,
     RoomResponse,
     ClassCreate,
     ClassResponse,
+    ClassHoldClaim,
+    ClassHoldCreate,
+    ClassHoldResponse,
 )
 
-USE_ORM = os.getenv("USE_ORM", "false").lower() == "true"
-if USE_ORM:
+if config.DB_BACKEND == "async":
+    import app.repositories.admins_async as admins_repo  # type: ignore
+    import app.repositories.waitlist_raw as waitlist_repo
+elif config.DB_BACKEND == "orm":
     import app.repositories.admins_orm as admins_repo  # type: ignore
+    import app.repositories.waitlist_orm as waitlist_repo  # type: ignore
 else:
     import app.repositories.admins_raw as admins_repo
+    import app.repositories.waitlist_raw as waitlist_repo
+
+router = APIRouter(prefix="/admins", tags=["admins"], route_class=TimedRoute)
+
+# Page size limits for the list endpoints.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
-router = APIRouter(prefix="/admins", tags=["admins"])
+def _set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """Pages are plain JSON lists; the next-page cursor travels in a header."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
 
 # ---------------------------------------------------------
@@ -36,12 +82,12 @@ router = APIRouter(prefix="/admins", tags=["admins"])
 # ---------------------------------------------------------
 
 @router.get("/db-health")
-def db_health():
+async def db_health():
     """
     Simple DB health check: SELECT 1.
     """
     try:
-        return admins_repo.get_db_health()
+        return await call_repo(admins_repo.get_db_health)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -51,7 +97,7 @@ def db_health():
 # ---------------------------------------------------------
 
 @router.post("/register")
-def register_admin(data: AdminRegisterRequest):
+async def register_admin(data: AdminRegisterRequest):
     """
     Create a new admin user.
 
@@ -59,40 +105,117 @@ def register_admin(data: AdminRegisterRequest):
     to avoid depending on AdminResponse.
     """
     try:
-        admin_id = admins_repo.register_admin(data)
+        password_hash = await hash_password(data.password)
+        admin_id = await call_repo(admins_repo.register_admin, data, password_hash)
         return {
             "admin_id": admin_id,
             "name": data.name,
             "email": data.email,
         }
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/hashing-stats")
+async def hashing_stats():
+    """
+    Latency of password hash/verify operations in the hashing pool
+    (including queue wait), plus rejected-when-busy counts.
+    """
+    return hashing.get_stats()
+
+
+@router.get("/cache-stats")
+async def cache_stats():
+    """
+    Hit/miss/invalidation counters of this worker's reference-data cache.
+    """
+    return reference_cache.stats()
+
+
+@router.get("/slow-queries")
+async def slow_query_log(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total", pattern="^(total|p95|max|calls|slow)$"),
+    plans: bool = True,
+):
+    """
+    Top statement fingerprints in this worker by estimated total time
+    (or p95 / max / calls / slow), with rolling latency percentiles and,
+    when SLOW_QUERY_EXPLAIN is on, the latest EXPLAIN (ANALYZE, BUFFERS).
+    """
+    return slow_queries.top(limit, sort, with_plans=plans)
+
+
+@router.delete("/slow-queries")
+async def reset_slow_query_log():
+    slow_queries.reset()
+    return {"reset": True}
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def admin_events():
+    """
+    Server-sent events for every class occupancy change, PT booking and
+    availability change. Reload on "ready" and "resync".
+    """
+    try:
+        return events.stream_response([("all",)])
+    except events.EventsBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+@router.get("/event-stats")
+async def event_stats():
+    """
+    Open event streams, events published and resyncs sent in this worker.
+    """
+    return events.get_stats()
+
+
 # ---------------------------------------------------------
 # Rooms
 # ---------------------------------------------------------
 
 @router.get("/rooms", response_model=list[RoomResponse])
-def list_rooms():
+async def list_rooms(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     """
-    List all rooms.
+    List rooms by room_id, one page at a time.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page.
     """
     try:
-        return admins_repo.list_rooms()
+        (rooms, next_cursor), etag = await reference_cache.get(
+            "rooms",
+            (cursor, limit),
+            lambda: call_repo(admins_repo.list_rooms, cursor=cursor, limit=limit),
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    _set_next_cursor(response, next_cursor)
+    return rooms
 
 
 @router.post("/rooms", response_model=RoomResponse)
-def create_room(data: RoomCreate):
+async def create_room(data: RoomCreate):
     """
     Create a new room.
     """
     try:
-        return admins_repo.create_room(data)
+        room = await call_repo(admins_repo.create_room, data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    reference_cache.invalidate("rooms")
+    return room
 
 
 # ---------------------------------------------------------
@@ -100,22 +223,177 @@ def create_room(data: RoomCreate):
 # ---------------------------------------------------------
 
 @router.get("/classes", response_model=list[ClassResponse])
-def list_classes():
+async def list_classes(
+    request: Request,
+    response: Response,
+    start_from: datetime | None = None,
+    start_to: datetime | None = None,
+    trainer_id: int | None = None,
+    room_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     """
-    List all fitness classes.
+    List fitness classes by start_time, one page at a time, optionally
+    filtered by start_time range, trainer and room, with current seat counts.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page.
     """
     try:
-        return admins_repo.list_classes()
+        (classes, next_cursor), _ = await reference_cache.get(
+            "classes",
+            (start_from, start_to, trainer_id, room_id, cursor, limit),
+            lambda: call_repo(
+                admins_repo.list_classes,
+                start_from=start_from,
+                start_to=start_to,
+                trainer_id=trainer_id,
+                room_id=room_id,
+                cursor=cursor,
+                limit=limit,
+            ),
+        )
+        occupancy = await call_repo(
+            admins_repo.class_occupancy, [c.class_id for c in classes]
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    classes = [c.model_copy(update=occupancy.get(c.class_id, {})) for c in classes]
+    etag = compute_etag(classes)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    _set_next_cursor(response, next_cursor)
+    return classes
 
 
 @router.post("/classes", response_model=ClassResponse)
-def create_class(data: ClassCreate):
+async def create_class(data: ClassCreate):
     """
     Create a new fitness class.
     """
     try:
-        return admins_repo.create_class(data)
+        cls = await call_repo(admins_repo.create_class, data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    reference_cache.invalidate("classes")
+    return cls
+
+
+@router.put("/classes/{class_id}/admission-mode")
+async def set_admission_mode(class_id: int, data: AdmissionModeUpdate):
+    """
+    Switch a class between direct registration and queued admission
+    (batched by a single writer per worker, for high-demand releases).
+    """
+    found = await call_repo(admission.set_mode, class_id, data.mode)
+    if not found:
+        raise HTTPException(status_code=404, detail="Class not found")
+    return {"class_id": class_id, "admission_mode": data.mode}
+
+
+@router.get("/admission-stats")
+async def admission_stats():
+    """
+    Batch writer counters for queued admission in this worker.
+    """
+    return admission.get_stats()
+
+
+# ---------------------------------------------------------
+# Seat holds
+# ---------------------------------------------------------
+
+@router.post("/classes/{class_id}/holds", response_model=ClassHoldResponse)
+async def create_hold(class_id: int, data: ClassHoldCreate):
+    """
+    Reserve `seats` free seats (e.g. for a partner group) for ttl_seconds.
+    Unclaimed seats go back to the class, and its waitlist, on expiry.
+    """
+    try:
+        return await call_repo(waitlist_repo.create_hold, class_id, data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/holds/{hold_id}")
+async def release_hold(hold_id: int):
+    try:
+        released = await call_repo(waitlist_repo.release_hold, hold_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not released:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return {"status": "released", "hold_id": hold_id}
+
+
+@router.post("/holds/{hold_id}/claim")
+async def claim_hold(hold_id: int, data: ClassHoldClaim):
+    try:
+        seats_left = await call_repo(waitlist_repo.claim_hold, hold_id, data.member_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "registered", "member_id": data.member_id, "seats_left": seats_left}
+
+
+# ---------------------------------------------------------
+# Exports
+# ---------------------------------------------------------
+
+EXPORT_BATCH_SIZE = 5000
+
+
+def _export_value(value):
+    # Decimals as strings: NUMERIC values keep their exact digits.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _ndjson_export(columns: list[str], batches):
+    for rows in batches:
+        yield "".join(
+            json.dumps({c: _export_value(v) for c, v in zip(columns, row)}) + "\n"
+            for row in rows
+        )
+
+
+def _csv_export(columns: list[str], batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_export_value(v) for v in row] for row in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+@router.get("/exports/{table}")
+async def export_table(table: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """
+    Stream a full table (health_metric, class_registration, ptsession) for
+    analytics. Rows are read in batches from a server-side cursor and
+    written straight to the response, so memory stays constant.
+    """
+    columns = admins_repo.EXPORT_TABLES.get(table)
+    if columns is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export table (choose from {', '.join(admins_repo.EXPORT_TABLES)})",
+        )
+
+    batches = admins_repo.iter_export_batches(table, batch_size=EXPORT_BATCH_SIZE)
+    if format == "csv":
+        body, media_type = _csv_export(columns, batches), "text/csv"
+    else:
+        body, media_type = _ndjson_export(columns, batches), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
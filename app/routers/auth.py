@@ -1,41 +1,74 @@
 # app/routers/auth.py
-import os
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
+from app import config
+from app.concurrency import call_repo
+from app.hashing import HashingBusyError, verify_password
+from app.instrumentation import TimedRoute
 from app.models.schemas import LoginRequest, LoginResponse
+from app.security import create_session, delete_session
 
-USE_ORM = os.getenv("USE_ORM", "false").lower() == "true"
-if USE_ORM:
+if config.DB_BACKEND == "async":
+    import app.repositories.auth_async as auth_repo
+elif config.DB_BACKEND == "orm":
     import app.repositories.auth_orm as auth_repo
 else:
     import app.repositories.auth_raw as auth_repo
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
+
+
+async def _login(credentials_fn, data: LoginRequest):
+    """
+    Look up the stored hash, then verify on the hashing pool.
+    Returns (user_id, email) or None; a saturated hashing pool becomes 503.
+    """
+    credentials = await call_repo(credentials_fn, data.email)
+    if credentials is None:
+        return None
+    user_id, email, password_hash = credentials
+    try:
+        if not await verify_password(data.password, password_hash):
+            return None
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return user_id, email
 
 
 @router.post("/member-login", response_model=LoginResponse)
-def member_login(data: LoginRequest):
-    result = auth_repo.login_member(data.email, data.password)
+async def member_login(data: LoginRequest):
+    result = await _login(auth_repo.member_credentials, data)
     if not result:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     user_id, email = result
-    return LoginResponse(role="member", user_id=user_id, email=email)
+    token = await run_in_threadpool(create_session, "member", user_id, email)
+    return LoginResponse(role="member", user_id=user_id, email=email, token=token)
 
 
 @router.post("/trainer-login", response_model=LoginResponse)
-def trainer_login(data: LoginRequest):
-    result = auth_repo.login_trainer(data.email, data.password)
+async def trainer_login(data: LoginRequest):
+    result = await _login(auth_repo.trainer_credentials, data)
     if not result:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     user_id, email = result
-    return LoginResponse(role="trainer", user_id=user_id, email=email)
+    token = await run_in_threadpool(create_session, "trainer", user_id, email)
+    return LoginResponse(role="trainer", user_id=user_id, email=email, token=token)
 
 
 @router.post("/admin-login", response_model=LoginResponse)
-def admin_login(data: LoginRequest):
-    result = auth_repo.login_admin(data.email, data.password)
+async def admin_login(data: LoginRequest):
+    result = await _login(auth_repo.admin_credentials, data)
     if not result:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     user_id, email = result
     # include email so it satisfies LoginResponse
-    return LoginResponse(role="admin", user_id=user_id, email=email)
+    token = await run_in_threadpool(create_session, "admin", user_id, email)
+    return LoginResponse(role="admin", user_id=user_id, email=email, token=token)
+
+
+@router.post("/logout")
+def logout(authorization: str = Header(..., alias="Authorization")):
+    if authorization.startswith("Bearer "):
+        delete_session(authorization.split(" ", 1)[1].strip())
+    return {"status": "logged_out"}
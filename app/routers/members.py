@@ -1,61 +1,256 @@
 # app/routers/members.py
-import os
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import math
+from datetime import datetime
+from typing import Literal
 
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+
+from app import admission, config, events, ical
+from app.concurrency import call_repo
+from app.hashing import HashingBusyError, hash_password
+from app.instrumentation import TimedRoute
+from app.models.orm_models import HealthMetric
 from app.models.schemas import (
+    CalendarSync,
+    ClassJoinResult,
     MemberRegisterRequest,
     MemberResponse,
     HealthMetricCreate,
+    HealthMetricReading,
+    HealthMetricReject,
+    HealthMetricBatchResult,
     MemberDashboard,
+    MemberDashboardBatchRequest,
+    MetricSeriesPoint,
     PTSessionCreate,
+    WaitlistPosition,
 )
 
-USE_ORM = os.getenv("USE_ORM", "false").lower() == "true"
-if USE_ORM:
+if config.DB_BACKEND == "async":
+    import app.repositories.members_async as members_repo
+    import app.repositories.admins_async as admins_repo
+    import app.repositories.waitlist_raw as waitlist_repo
+    import app.repositories.calendar_raw as calendar_repo
+elif config.DB_BACKEND == "orm":
     import app.repositories.members_orm as members_repo
     import app.repositories.admins_orm as admins_repo
+    import app.repositories.waitlist_orm as waitlist_repo
+    import app.repositories.calendar_orm as calendar_repo
 else:
     import app.repositories.members_raw as members_repo
     import app.repositories.admins_raw as admins_repo
+    import app.repositories.waitlist_raw as waitlist_repo
+    import app.repositories.calendar_raw as calendar_repo
 
-print("USE_ORM (members router) =", USE_ORM)
-router = APIRouter(prefix="/members", tags=["members"])
+print("DB_BACKEND (members router) =", config.DB_BACKEND)
+router = APIRouter(prefix="/members", tags=["members"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=MemberResponse)
-def register_member(data: MemberRegisterRequest):
+async def register_member(data: MemberRegisterRequest):
     try:
-        member_id = members_repo.register_member(data)
+        password_hash = await hash_password(data.password)
+        member_id = await call_repo(members_repo.register_member, data, password_hash)
         return MemberResponse(
             member_id=member_id,
             name=data.name,
             email=data.email,
         )
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Largest batch accepted by POST /members/metrics/batch.
+MAX_METRIC_BATCH = 100_000
+# health_metric.metric_value is NUMERIC(precision, scale): after rounding
+# to `scale` places, |value| must stay below 10 ** (precision - scale).
+_METRIC_VALUE_TYPE = HealthMetric.__table__.c.metric_value.type
+METRIC_VALUE_SCALE = _METRIC_VALUE_TYPE.scale
+METRIC_VALUE_LIMIT = 10 ** (_METRIC_VALUE_TYPE.precision - _METRIC_VALUE_TYPE.scale)
+
+
+def _parse_metric_batch(body: bytes, ndjson: bool):
+    """
+    Parse a JSON array or NDJSON body into (readings, rejects).
+    readings: list of (index, HealthMetricReading); rejects: HealthMetricReject.
+    CPU-bound for large batches: run it in the threadpool.
+    """
+    if ndjson:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body is not valid JSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of readings")
+
+    if len(items) > MAX_METRIC_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_METRIC_BATCH} readings per batch",
+        )
+
+    readings: list[tuple[int, HealthMetricReading]] = []
+    rejects: list[HealthMetricReject] = []
+    for index, item in enumerate(items):
+        if item is None:
+            rejects.append(HealthMetricReject(index=index, reason="Invalid JSON line"))
+            continue
+        try:
+            reading = HealthMetricReading.model_validate(item)
+        except ValidationError as e:
+            reason = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            rejects.append(HealthMetricReject(index=index, reason=reason))
+            continue
+        # json.loads accepts NaN / Infinity; NUMERIC would store 'NaN'.
+        if not math.isfinite(reading.metric_value):
+            rejects.append(HealthMetricReject(index=index, reason="metric_value must be finite"))
+            continue
+        # Checked as stored: 99999999.996 rounds to 100000000.00 and overflows.
+        if abs(round(reading.metric_value, METRIC_VALUE_SCALE)) >= METRIC_VALUE_LIMIT:
+            rejects.append(HealthMetricReject(index=index, reason="metric_value out of range"))
+            continue
+        readings.append((index, reading))
+    return readings, rejects
+
+
+@router.post("/metrics/batch", response_model=HealthMetricBatchResult)
+async def add_metrics_batch(request: Request):
+    """
+    Bulk ingestion for wearables: a JSON array, or NDJSON
+    (Content-Type: application/x-ndjson), of readings across any members.
+
+    Valid readings are written in one transaction; invalid ones (bad
+    fields, unknown member_id) are reported per index without failing
+    the batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    ndjson = "ndjson" in content_type or "jsonl" in content_type
+    readings, rejects = await run_in_threadpool(_parse_metric_batch, await request.body(), ndjson)
+
+    try:
+        db_rejects = await call_repo(
+            members_repo.add_health_metrics_batch, [r for _, r in readings]
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    rejects.extend(
+        HealthMetricReject(index=readings[pos][0], reason=reason)
+        for pos, reason in db_rejects
+    )
+    rejects.sort(key=lambda r: r.index)
+    return HealthMetricBatchResult(
+        accepted=len(readings) - len(db_rejects),
+        rejected=rejects,
+    )
+
 
 @router.post("/{member_id}/metrics")
-def add_metric(member_id: int, metric: HealthMetricCreate):
+async def add_metric(member_id: int, metric: HealthMetricCreate):
     try:
-        metric_id = members_repo.add_health_metric(member_id, metric)
+        metric_id = await call_repo(members_repo.add_health_metric, member_id, metric)
         return {"metric_id": metric_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/{member_id}/metrics/history", response_model=list[MetricSeriesPoint])
+async def metric_history(
+    member_id: int,
+    metric_type: str,
+    resolution: Literal["raw", "hour", "day", "week"] = "day",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+):
+    """
+    Trend data for one metric: min/max/avg/last per bucket (UTC buckets).
+    Coarse resolutions come from pre-aggregated rollups.
+    """
+    try:
+        return await call_repo(
+            members_repo.get_metric_history,
+            member_id, metric_type, resolution, start, end, limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{member_id}/dashboard", response_model=MemberDashboard)
-def dashboard(member_id: int):
-    dashboard = members_repo.get_member_dashboard(member_id)
+async def dashboard(member_id: int):
+    dashboard = await call_repo(members_repo.get_member_dashboard, member_id)
     if not dashboard:
         raise HTTPException(status_code=404, detail="Member not found")
     return dashboard
 
 
+# Upper bound for one batch dashboard request (ids or page size).
+MAX_DASHBOARD_BATCH = 100_000
+
+
+def _ndjson_lines(records, chunk_size: int = 500):
+    """Serialize pydantic records as NDJSON, yielding a few hundred lines at a time."""
+    chunk = []
+    for record in records:
+        chunk.append(record.model_dump_json())
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+@router.post("/dashboards")
+async def batch_dashboards(req: MemberDashboardBatchRequest):
+    """
+    Dashboards for many members in one request, streamed as NDJSON
+    (one MemberDashboard per line, ordered by member_id).
+
+    Pass member_ids, or page with after_id/limit (+ optional name_prefix):
+    the next page starts after the last member_id received.
+    """
+    if req.member_ids is not None and len(req.member_ids) > MAX_DASHBOARD_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_DASHBOARD_BATCH} member_ids per request",
+        )
+    if not 1 <= req.limit <= MAX_DASHBOARD_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit must be between 1 and {MAX_DASHBOARD_BATCH}",
+        )
+
+    records = members_repo.iter_member_dashboards(
+        member_ids=req.member_ids,
+        after_id=req.after_id,
+        name_prefix=req.name_prefix,
+        limit=None if req.member_ids is not None else req.limit,
+    )
+    return StreamingResponse(_ndjson_lines(records), media_type="application/x-ndjson")
+
+
 @router.post("/{member_id}/pt-sessions")
-def schedule_pt_session(member_id: int, session: PTSessionCreate):
+async def schedule_pt_session(member_id: int, session: PTSessionCreate):
     try:
-        session_id = members_repo.schedule_pt_session(member_id, session)
+        session_id = await call_repo(members_repo.schedule_pt_session, member_id, session)
         return {"session_id": session_id}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -63,13 +258,166 @@ def schedule_pt_session(member_id: int, session: PTSessionCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def _queued_registration(member_id: int, class_id: int):
+    """
+    Registration for a class in queued admission mode (see app.admission):
+    wait for the batch writer, or hand out a poll token if it takes too long.
+    """
+    try:
+        req = admission.submit(member_id, class_id)
+    except admission.AdmissionBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    try:
+        remaining = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(req.future)),
+            timeout=config.ADMISSION_RESULT_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "queued",
+                "member_id": member_id,
+                "class_id": class_id,
+                "poll_token": req.token,
+            },
+        )
+    except admission.AdmissionRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "registered",
+        "member_id": member_id,
+        "class_id": class_id,
+        "remaining_seats": remaining,
+    }
+
+
+@router.get("/admission/{token}")
+async def admission_result(token: str):
+    """
+    Outcome of a queued registration that answered 202 with a poll_token.
+    """
+    outcome = admission.result(token)
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired poll token")
+    return outcome
+
+
 @router.post("/{member_id}/classes/{class_id}/register")
-def register_for_class(member_id: int, class_id: int):
+async def register_for_class(member_id: int, class_id: int):
+    """
+    Register a member for a class (always uses the admins repository indirectly).
+    Classes flagged for queued admission go through the batch writer instead.
+    """
+    try:
+        queued = await call_repo(admission.is_queued, class_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if queued:
+        return await _queued_registration(member_id, class_id)
+
+    try:
+        remaining = await call_repo(admins_repo.register_member_for_class, member_id, class_id)
+        return {
+            "status": "registered",
+            "member_id": member_id,
+            "class_id": class_id,
+            "remaining_seats": remaining,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{member_id}/classes/{class_id}/register")
+async def cancel_class_registration(member_id: int, class_id: int):
     """
-    Register a member for a class (always uses admins_raw/admins_orm indirectly).
+    Cancel a registration; the seat goes to the first member on the waitlist.
     """
     try:
-        admins_repo.register_member_for_class(member_id, class_id)
-        return {"status": "registered", "member_id": member_id, "class_id": class_id}
+        cancelled = await call_repo(waitlist_repo.cancel_registration, member_id, class_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    return {"status": "cancelled", "member_id": member_id, "class_id": class_id}
+
+
+@router.post("/{member_id}/classes/{class_id}/join", response_model=ClassJoinResult)
+async def join_class(member_id: int, class_id: int):
+    """
+    Register for a class, or join its waitlist when it is full.
+
+    Unlike /register this never fails because the class is full: the
+    member is queued (FIFO) and registered automatically when a seat
+    frees up. Calling it again just reports the current state.
+    """
+    try:
+        return await call_repo(waitlist_repo.join_class, member_id, class_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{member_id}/classes/{class_id}/waitlist", response_model=WaitlistPosition)
+async def waitlist_position(member_id: int, class_id: int):
+    position = await call_repo(waitlist_repo.get_waitlist_position, member_id, class_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Member is not on this class's waitlist")
+    return WaitlistPosition(member_id=member_id, class_id=class_id, position=position)
+
+
+@router.delete("/{member_id}/classes/{class_id}/waitlist")
+async def leave_waitlist(member_id: int, class_id: int):
+    left = await call_repo(waitlist_repo.leave_waitlist, member_id, class_id)
+    if not left:
+        raise HTTPException(status_code=404, detail="Member is not on this class's waitlist")
+    return {"status": "left_waitlist", "member_id": member_id, "class_id": class_id}
+
+
+@router.get(
+    "/{member_id}/schedule.ics",
+    response_class=Response,
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def member_calendar(member_id: int, request: Request):
+    """
+    iCalendar feed of the member's PT sessions and registered classes, for
+    calendar apps to subscribe to. Revalidate with If-None-Match /
+    If-Modified-Since.
+    """
+    return await ical.feed_response(
+        request, calendar_repo, "member", member_id, f"Member {member_id} schedule"
+    )
+
+
+@router.get("/{member_id}/schedule/sync", response_model=CalendarSync)
+async def member_schedule_sync(
+    member_id: int,
+    token: str | None = None,
+    start_from: datetime | None = Query(None, alias="from"),
+):
+    """
+    Without a token: every item starting at or after `from`, plus a
+    sync_token. With ?token=: only what was added, changed or deleted since.
+    Paged: while more=true, call again with the returned token.
+    """
+    try:
+        return await ical.sync(calendar_repo, "member", member_id, token, start_from)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{member_id}/events", response_class=StreamingResponse)
+async def member_events(
+    member_id: int,
+    class_ids: list[int] = Query([], alias="class_id", max_length=50),
+):
+    """
+    Server-sent events for the member's PT bookings and class registrations,
+    plus occupancy of the classes given as ?class_id= (e.g. the ones on
+    screen). Reload on "ready" and "resync".
+    """
+    topics = [("member", member_id)] + [("class", c) for c in dict.fromkeys(class_ids)]
+    try:
+        return events.stream_response(topics)
+    except events.EventsBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
@@ -1,41 +1,142 @@
 # app/routers/trainers.py
-import os
-from fastapi import APIRouter, HTTPException
+from datetime import datetime, timedelta
 
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app import config, events, ical
+from app.cache import etag_matches, not_modified, reference_cache, set_etag
+from app.concurrency import call_repo
+from app.hashing import HashingBusyError, hash_password
+from app.instrumentation import TimedRoute
 from app.models.schemas import (
+    CalendarSync,
+    FreeSlot,
     TrainerAvailabilityCreate,
     TrainerAvailabilityResponse,
     TrainerScheduleItem,
     TrainerRegisterRequest,
+    TrainerResponse,
 )
 
-USE_ORM = os.getenv("USE_ORM", "false").lower() == "true"
-if USE_ORM:
+if config.DB_BACKEND == "async":
+    import app.repositories.trainers_async as trainers_repo
+    # Free-slot search is served by the in-process index (raw loader).
+    import app.repositories.schedule_raw as schedule_repo
+    import app.repositories.calendar_raw as calendar_repo
+elif config.DB_BACKEND == "orm":
     import app.repositories.trainers_orm as trainers_repo
+    import app.repositories.schedule_orm as schedule_repo
+    import app.repositories.calendar_orm as calendar_repo
 else:
     import app.repositories.trainers_raw as trainers_repo
+    import app.repositories.schedule_raw as schedule_repo
+    import app.repositories.calendar_raw as calendar_repo
+
+router = APIRouter(prefix="/trainers", tags=["trainers"], route_class=TimedRoute)
+
+# Page size limits for GET /trainers.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Longest window a free-slot search may cover.
+MAX_FREE_SLOT_WINDOW = timedelta(days=62)
 
-router = APIRouter(prefix="/trainers", tags=["trainers"])
+
+def _check_free_slot_window(start: datetime, end: datetime) -> None:
+    if (start.tzinfo is None) != (end.tzinfo is None):
+        raise HTTPException(
+            status_code=400,
+            detail="start and end must both carry a UTC offset, or both omit it",
+        )
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_FREE_SLOT_WINDOW:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window too large (max {MAX_FREE_SLOT_WINDOW.days} days)",
+        )
 
 
 @router.post("/register")
-def register_trainer(data: TrainerRegisterRequest):
+async def register_trainer(data: TrainerRegisterRequest):
+    try:
+        password_hash = await hash_password(data.password)
+        trainer_id = await call_repo(trainers_repo.register_trainer, data, password_hash)
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    reference_cache.invalidate("trainers")
+    return {"trainer_id": trainer_id, "email": data.email}
+
+
+@router.get("", response_model=list[TrainerResponse])
+async def list_trainers(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    List trainers by trainer_id (cached, with ETag).
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page.
+    """
     try:
-        trainer_id = trainers_repo.register_trainer(data)
-        return {"trainer_id": trainer_id, "email": data.email}
+        (trainers, next_cursor), etag = await reference_cache.get(
+            "trainers",
+            (cursor, limit),
+            lambda: call_repo(trainers_repo.list_trainers, cursor=cursor, limit=limit),
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return trainers
+
+
+@router.get("/free-slots", response_model=list[FreeSlot])
+async def search_free_slots(
+    start: datetime,
+    end: datetime,
+    duration_minutes: int = Query(60, gt=0),
+    room_id: int | None = None,
+):
+    """
+    Bookable slots across all trainers: availability minus booked PT
+    sessions and classes (and, with room_id, minus the room's bookings).
+    """
+    _check_free_slot_window(start, end)
+    return await call_repo(
+        schedule_repo.find_free_slots, None, start, end, duration_minutes, room_id
+    )
+
+
+@router.get("/{trainer_id}/free-slots", response_model=list[FreeSlot])
+async def trainer_free_slots(
+    trainer_id: int,
+    start: datetime,
+    end: datetime,
+    duration_minutes: int = Query(60, gt=0),
+    room_id: int | None = None,
+):
+    """
+    Bookable slots for one trainer, so members can pick a time instead of
+    retrying POST /members/{member_id}/pt-sessions.
+    """
+    _check_free_slot_window(start, end)
+    return await call_repo(
+        schedule_repo.find_free_slots, trainer_id, start, end, duration_minutes, room_id
+    )
 
 
 @router.post("/{trainer_id}/availability", response_model=TrainerAvailabilityResponse)
-def create_availability(trainer_id: int, data: TrainerAvailabilityCreate):
+async def create_availability(trainer_id: int, data: TrainerAvailabilityCreate):
     try:
-        availability_id = trainers_repo.add_availability(trainer_id, data)
-        avails = trainers_repo.list_availability(trainer_id)
-        for a in avails:
-            if a.availability_id == availability_id:
-                return a
-        raise HTTPException(status_code=500, detail="Availability created but not found")
+        return await call_repo(trainers_repo.add_availability, trainer_id, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -43,10 +144,81 @@ def create_availability(trainer_id: int, data: TrainerAvailabilityCreate):
 
 
 @router.get("/{trainer_id}/availability", response_model=list[TrainerAvailabilityResponse])
-def list_availability(trainer_id: int):
-    return trainers_repo.list_availability(trainer_id)
+async def list_availability(trainer_id: int):
+    return await call_repo(trainers_repo.list_availability, trainer_id)
 
 
 @router.get("/{trainer_id}/schedule", response_model=list[TrainerScheduleItem])
-def trainer_schedule(trainer_id: int):
-    return trainers_repo.get_trainer_schedule(trainer_id)
+async def trainer_schedule(
+    trainer_id: int,
+    response: Response,
+    start_from: datetime | None = Query(None, alias="from"),
+    start_to: datetime | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    PT sessions and classes starting in [from, to), ordered by start time,
+    with room and member names.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page.
+    """
+    if start_from is not None and start_to is not None and start_to <= start_from:
+        raise HTTPException(status_code=400, detail="to must be after from")
+    try:
+        items, next_cursor = await call_repo(
+            trainers_repo.get_trainer_schedule,
+            trainer_id,
+            start_from=start_from,
+            start_to=start_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get(
+    "/{trainer_id}/schedule.ics",
+    response_class=Response,
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def trainer_calendar(trainer_id: int, request: Request):
+    """
+    iCalendar feed of the trainer's PT sessions and classes, for calendar
+    apps to subscribe to. Revalidate with If-None-Match / If-Modified-Since.
+    """
+    return await ical.feed_response(
+        request, calendar_repo, "trainer", trainer_id, f"Trainer {trainer_id} schedule"
+    )
+
+
+@router.get("/{trainer_id}/schedule/sync", response_model=CalendarSync)
+async def trainer_schedule_sync(
+    trainer_id: int,
+    token: str | None = None,
+    start_from: datetime | None = Query(None, alias="from"),
+):
+    """
+    Without a token: every item starting at or after `from`, plus a
+    sync_token. With ?token=: only what was added, changed or deleted since.
+    Paged: while more=true, call again with the returned token.
+    """
+    try:
+        return await ical.sync(calendar_repo, "trainer", trainer_id, token, start_from)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{trainer_id}/events", response_class=StreamingResponse)
+async def trainer_events(trainer_id: int):
+    """
+    Server-sent events for the trainer's PT bookings, availability and
+    class occupancy. Reload on "ready" and "resync".
+    """
+    try:
+        return events.stream_response([("trainer", trainer_id)])
+    except events.EventsBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
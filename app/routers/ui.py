@@ -4,11 +4,14 @@ from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from app.instrumentation import TimedRoute
+
 templates = Jinja2Templates(directory="app/templates")
 
 router = APIRouter(
     prefix="/ui",
     tags=["ui"],
+    route_class=TimedRoute,
 )
 
 
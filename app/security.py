@@ -1,11 +1,21 @@
 # app/security.py
 
+import base64
+import hashlib
+import hmac
+import json
+import os
 import secrets
-from typing import Dict
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
 
 from fastapi import Depends, Header, HTTPException, status
 from pydantic import BaseModel, EmailStr
 
+from app import config
+
 
 class SessionData(BaseModel):
     role: str     # "member" | "trainer" | "admin"
@@ -13,33 +23,462 @@ class SessionData(BaseModel):
     email: EmailStr
 
 
-# In-memory session store: token -> SessionData
-_SESSIONS: Dict[str, SessionData] = {}
+def _token_key(token: str) -> str:
+    """Shared backends store a SHA-256 of the token, never the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Session backends
+#
+# Every backend stores token -> (SessionData, expires_at) where expires_at is
+# a POSIX timestamp. Selected with SESSION_BACKEND:
+#   memory   - this process only (single worker / development)
+#   database - app_session table, shared by every worker and host
+#   file     - SQLite file (in /dev/shm by default), shared by the workers
+#              of one host without touching Postgres
+# ---------------------------------------------------------------------------
+
+class SessionBackend(ABC):
+    @abstractmethod
+    def put(self, token: str, session: SessionData, expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, token: str) -> tuple[SessionData, float] | None:
+        """Return (session, expires_at), or None if unknown or expired."""
+
+    @abstractmethod
+    def touch(self, token: str, expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, token: str) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+
+class MemorySessionBackend(SessionBackend):
+    def __init__(self):
+        self._sessions: dict[str, tuple[SessionData, float]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, token, session, expires_at):
+        with self._lock:
+            self._sessions[token] = (session, expires_at)
+
+    def get(self, token):
+        entry = self._sessions.get(token)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry
+
+    def touch(self, token, expires_at):
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is not None:
+                self._sessions[token] = (entry[0], expires_at)
+
+    def delete(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [t for t, (_, exp) in self._sessions.items() if exp <= now]
+            for t in expired:
+                del self._sessions[t]
+        return len(expired)
+
+
+class DatabaseSessionBackend(SessionBackend):
+    """Sessions in the app_session table (created with the ORM models)."""
+
+    def put(self, token, session, expires_at):
+        from app.db_raw import get_cursor
+
+        with get_cursor(commit=True) as cur:
+            cur.execute(
+                """
+                INSERT INTO app_session (token_hash, role, user_id, email, expires_at)
+                VALUES (%s, %s, %s, %s, to_timestamp(%s))
+                ON CONFLICT (token_hash) DO UPDATE
+                SET role = EXCLUDED.role,
+                    user_id = EXCLUDED.user_id,
+                    email = EXCLUDED.email,
+                    expires_at = EXCLUDED.expires_at;
+                """,
+                (_token_key(token), session.role, session.user_id, session.email, expires_at),
+            )
+
+    def get(self, token):
+        from app.db_raw import get_cursor
+
+        with get_cursor() as cur:
+            cur.execute(
+                """
+                SELECT role, user_id, email, EXTRACT(EPOCH FROM expires_at) AS expires_at
+                FROM app_session
+                WHERE token_hash = %s AND expires_at > NOW();
+                """,
+                (_token_key(token),),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        return (
+            SessionData(role=row["role"], user_id=row["user_id"], email=row["email"]),
+            float(row["expires_at"]),
+        )
+
+    def touch(self, token, expires_at):
+        from app.db_raw import get_cursor
+
+        with get_cursor(commit=True) as cur:
+            cur.execute(
+                "UPDATE app_session SET expires_at = to_timestamp(%s) WHERE token_hash = %s;",
+                (expires_at, _token_key(token)),
+            )
+
+    def delete(self, token):
+        from app.db_raw import get_cursor
+
+        with get_cursor(commit=True) as cur:
+            cur.execute("DELETE FROM app_session WHERE token_hash = %s;", (_token_key(token),))
+
+    def purge_expired(self):
+        from app.db_raw import get_cursor
+
+        with get_cursor(commit=True) as cur:
+            cur.execute("DELETE FROM app_session WHERE expires_at <= NOW();")
+            return cur.rowcount
+
+
+class FileSessionBackend(SessionBackend):
+    """
+    Sessions in a SQLite file (WAL mode), so every worker process on the
+    host sees the same sessions. One SQLite connection per thread.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS app_session (
+                    token_hash TEXT PRIMARY KEY,
+                    role       TEXT NOT NULL,
+                    user_id    INTEGER NOT NULL,
+                    email      TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_app_session_expires ON app_session(expires_at)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, token, session, expires_at):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO app_session VALUES (?, ?, ?, ?, ?)",
+            (_token_key(token), session.role, session.user_id, session.email, expires_at),
+        )
+
+    def get(self, token):
+        row = self._conn().execute(
+            """
+            SELECT role, user_id, email, expires_at
+            FROM app_session
+            WHERE token_hash = ? AND expires_at > ?
+            """,
+            (_token_key(token), time.time()),
+        ).fetchone()
+        if not row:
+            return None
+        return SessionData(role=row[0], user_id=row[1], email=row[2]), row[3]
+
+    def touch(self, token, expires_at):
+        self._conn().execute(
+            "UPDATE app_session SET expires_at = ? WHERE token_hash = ?",
+            (expires_at, _token_key(token)),
+        )
+
+    def delete(self, token):
+        self._conn().execute("DELETE FROM app_session WHERE token_hash = ?", (_token_key(token),))
+
+    def purge_expired(self):
+        return self._conn().execute(
+            "DELETE FROM app_session WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+
+
+def _make_backend() -> SessionBackend:
+    if config.SESSION_BACKEND == "database":
+        return DatabaseSessionBackend()
+    if config.SESSION_BACKEND == "file":
+        return FileSessionBackend(config.SESSION_FILE)
+    if config.SESSION_BACKEND == "memory":
+        return MemorySessionBackend()
+    raise ValueError(f"Unknown SESSION_BACKEND {config.SESSION_BACKEND!r}")
+
+
+_backend: SessionBackend = _make_backend()
+
+
+# ---------------------------------------------------------------------------
+# Per-process cache of verified tokens
+#
+# token -> (session, expires_at, cached_until, last_touch)
+# A hit is a dict lookup; the backend is consulted again after
+# SESSION_CACHE_TTL seconds, so a logout in another worker takes effect
+# within that window.
+# ---------------------------------------------------------------------------
+
+_CACHE_MAX_ENTRIES = 100_000
+_cache: dict[str, tuple[SessionData, float, float, float]] = {}
 
 
+def _lookup(token: str) -> SessionData | None:
+    now = time.time()
+    entry = _cache.get(token)
+    if entry is not None and entry[2] > now and entry[1] > now:
+        session, expires_at, cached_until, last_touch = entry
+    else:
+        found = _backend.get(token)
+        if found is None:
+            _cache.pop(token, None)
+            return None
+        session, expires_at = found
+        cached_until = now + config.SESSION_CACHE_TTL
+        last_touch = entry[3] if entry is not None else now
+        if len(_cache) >= _CACHE_MAX_ENTRIES:
+            _cache.clear()
+
+    # Sliding expiry, written back at most once per SESSION_TOUCH_INTERVAL.
+    if now - last_touch >= config.SESSION_TOUCH_INTERVAL:
+        expires_at = now + config.SESSION_TTL
+        _backend.touch(token, expires_at)
+        last_touch = now
+
+    _cache[token] = (session, expires_at, cached_until, last_touch)
+    return session
+
+
+def _purge_loop() -> None:
+    while True:
+        time.sleep(config.SESSION_PURGE_INTERVAL)
+        try:
+            _backend.purge_expired()
+            now = time.time()
+            for token, entry in list(_cache.items()):
+                if entry[1] <= now or entry[2] <= now:
+                    _cache.pop(token, None)
+            for jti, (_, cached_until) in list(_revocation_cache.items()):
+                if cached_until <= now:
+                    _revocation_cache.pop(jti, None)
+        except Exception:
+            # Eviction is best effort; the next round retries.
+            pass
+
+
+_purger_started = False
+_purger_lock = threading.Lock()
+
+
+def start_session_purger() -> None:
+    """Start the background thread that evicts expired sessions (idempotent)."""
+    global _purger_started
+    with _purger_lock:
+        if not _purger_started:
+            threading.Thread(target=_purge_loop, name="session-purger", daemon=True).start()
+            _purger_started = True
+
+
+# ---------------------------------------------------------------------------
+# Signed tokens (SESSION_MODE=signed)
+#
+# <payload>.<kid>.<signature>, where payload is base64url JSON
+#   {"r": role, "u": user_id, "e": email, "exp": unix time, "jti": id}
+# and signature is base64url HMAC-SHA256 over "<payload>.<kid>" with the key
+# named kid. Verification needs no shared state; the only lookup is the
+# revocation list (jti -> revoked until exp), kept in SESSION_BACKEND under
+# "revoked:<jti>" and cached per process for SESSION_CACHE_TTL seconds.
+# Signed tokens have a fixed lifetime of SESSION_TTL (no sliding expiry).
+# ---------------------------------------------------------------------------
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _parse_signing_keys(spec: str) -> list[tuple[str, bytes]]:
+    keys = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kid, sep, secret = item.partition(":")
+        if not sep or not kid or not secret or "." in kid:
+            raise ValueError("SESSION_SIGNING_KEYS must look like 'kid:secret,kid:secret'")
+        keys.append((kid, secret.encode()))
+    return keys
+
+
+_signing_keys = _parse_signing_keys(config.SESSION_SIGNING_KEYS)
+if config.SESSION_MODE not in ("server", "signed"):
+    raise ValueError(f"Unknown SESSION_MODE {config.SESSION_MODE!r}")
+if config.SESSION_MODE == "signed" and not _signing_keys:
+    raise ValueError("SESSION_MODE=signed requires SESSION_SIGNING_KEYS")
+_verify_keys = dict(_signing_keys)
+
+
+def _sign(signing_input: str, secret: bytes) -> str:
+    return _b64encode(hmac.new(secret, signing_input.encode(), hashlib.sha256).digest())
+
+
+def _issue_signed(session: SessionData, expires_at: float) -> str:
+    kid, secret = _signing_keys[0]
+    claims = {
+        "r": session.role,
+        "u": session.user_id,
+        "e": session.email,
+        "exp": int(expires_at),
+        "jti": secrets.token_urlsafe(12),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{payload}.{kid}"
+    return f"{signing_input}.{_sign(signing_input, secret)}"
+
+
+def _decode_signed(token: str) -> dict | None:
+    """Claims of a correctly signed, unexpired token; None otherwise."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload, kid, signature = parts
+    secret = _verify_keys.get(kid)
+    if secret is None:
+        return None
+    if not hmac.compare_digest(_sign(f"{payload}.{kid}", secret), signature):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time():
+            return None
+    except (ValueError, KeyError, TypeError):
+        return None
+    return claims
+
+
+_REVOKED_PREFIX = "revoked:"
+# jti -> (revoked, cached_until)
+_revocation_cache: dict[str, tuple[bool, float]] = {}
+
+
+def _is_revoked(jti: str) -> bool:
+    now = time.time()
+    entry = _revocation_cache.get(jti)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    revoked = _backend.get(_REVOKED_PREFIX + jti) is not None
+    if len(_revocation_cache) >= _CACHE_MAX_ENTRIES:
+        _revocation_cache.clear()
+    _revocation_cache[jti] = (revoked, now + config.SESSION_CACHE_TTL)
+    return revoked
+
+
+def _lookup_signed(token: str) -> SessionData | None:
+    claims = _decode_signed(token)
+    if claims is None or _is_revoked(claims["jti"]):
+        return None
+    try:
+        return SessionData(role=claims["r"], user_id=claims["u"], email=claims["e"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _revoke_signed(token: str) -> None:
+    """Revoke a signed token until it would have expired anyway."""
+    claims = _decode_signed(token)
+    if claims is None:
+        return
+    session = SessionData(role=claims["r"], user_id=claims["u"], email=claims["e"])
+    _backend.put(_REVOKED_PREFIX + claims["jti"], session, float(claims["exp"]))
+    _revocation_cache[claims["jti"]] = (True, float(claims["exp"]))
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
 def create_session(role: str, user_id: int, email: str) -> str:
     """
     Create a new session token for a logged-in user.
+
+    In signed mode the token carries the session itself and nothing is stored.
     """
+    session = SessionData(role=role, user_id=user_id, email=email)
+    now = time.time()
+    expires_at = now + config.SESSION_TTL
+    if config.SESSION_MODE == "signed":
+        return _issue_signed(session, expires_at)
     token = secrets.token_hex(32)
-    _SESSIONS[token] = SessionData(role=role, user_id=user_id, email=email)
+    _backend.put(token, session, expires_at)
+    _cache[token] = (session, expires_at, now + config.SESSION_CACHE_TTL, now)
     return token
 
 
-def get_current_session(
-    authorization: str = Header(..., alias="Authorization"),
-) -> SessionData:
+def delete_session(token: str) -> None:
     """
-    Extract and validate the bearer token from Authorization header.
-    Expect header: Authorization: Bearer <token>
+    Log out: remove the session from the backend and this process's cache.
+    Signed tokens are added to the revocation list instead.
     """
+    if config.SESSION_MODE == "signed":
+        _revoke_signed(token)
+        return
+    _cache.pop(token, None)
+    _backend.delete(token)
+
+
+def _bearer_token(authorization: str) -> str:
     if not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authorization header format",
         )
-    token = authorization.split(" ", 1)[1].strip()
-    session = _SESSIONS.get(token)
+    return authorization.split(" ", 1)[1].strip()
+
+
+def get_current_session(
+    authorization: str = Header(..., alias="Authorization"),
+) -> SessionData:
+    """
+    Extract and validate the bearer token from Authorization header.
+    Expect header: Authorization: Bearer <token>
+    """
+    token = _bearer_token(authorization)
+    if config.SESSION_MODE == "signed":
+        session = _lookup_signed(token)
+    else:
+        session = _lookup(token)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,285 @@
+# app/slow_queries.py
+"""
+Slow-query log: latency per normalized statement ("fingerprint").
+
+Used by:
+- app.query_stats (observer of every statement from the db_raw cursors
+  and the SQLAlchemy engines; registered on import)
+- app.routers.admins (GET /admins/slow-queries)
+
+Statements are normalized before grouping: comments dropped, literals and
+placeholders (%s, %(name)s, $1) replaced by ?, IN lists and multi-row
+VALUES collapsed, whitespace folded (and ignored around operators). So the hand-written SQL of the raw
+repositories and the SQL the ORM generates both end up as one entry per
+query shape, whatever the parameters.
+
+Per fingerprint we keep counters plus the last SLOW_QUERY_WINDOW sampled
+latencies (rolling p50/p95/p99). Only SLOW_QUERY_MAX_FINGERPRINTS entries
+are kept; the least recently seen one is dropped to make room. Parameter
+values are never stored.
+
+With SLOW_QUERY_EXPLAIN, a SELECT slower than SLOW_QUERY_THRESHOLD_MS is
+re-run as EXPLAIN (ANALYZE, BUFFERS) on a background thread, at most once
+per fingerprint per SLOW_QUERY_EXPLAIN_INTERVAL seconds. It runs on its
+own connection in a READ ONLY transaction that is rolled back, under
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS, so a statement with side effects fails
+instead of being repeated.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import psycopg2
+
+from app import config, query_stats
+
+# One pass, so a comment marker inside a literal ('a--b') stays literal
+# and a quote inside a comment does not open one.
+_STRINGS_AND_COMMENTS = re.compile(r"('(?:''|[^'])*')|--[^\n]*|/\*.*?\*/", re.S)
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACES = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"\s*([(),=<>!|]+)\s*")
+_WRITES = re.compile(r"\b(insert|update|delete|merge|truncate|for (?:no key )?update|for (?:key )?share)\b")
+
+_MAX_STATEMENT_CHARS = 2000
+
+
+def normalize(statement: str) -> str:
+    s = _STRINGS_AND_COMMENTS.sub(lambda m: "?" if m.group(1) else " ", statement)
+    s = _PLACEHOLDERS.sub("?", s)
+    s = _NUMBERS.sub("?", s)
+    s = _LISTS.sub("(...)", s)
+    s = _REPEATED_LISTS.sub("(...), ...", s)
+    return _SPACES.sub(" ", s).strip().rstrip(";").strip().lower()
+
+
+# statement text -> (fingerprint, normalized); statements repeat, so the
+# regexes above run once per distinct text.
+_normalized: dict[str, tuple[str, str]] = {}
+_NORMALIZED_MAX = 4096
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    cached = _normalized.get(statement)
+    if cached is not None:
+        return cached
+    text = normalize(statement)
+    # Spacing around operators differs between hand-written and ORM SQL;
+    # it is ignored for grouping but kept in the text shown.
+    key = hashlib.sha1(_PUNCTUATION.sub(r"\1", text).encode()).hexdigest()[:16]
+    cached = (key, text)
+    if len(_normalized) >= _NORMALIZED_MAX:
+        _normalized.clear()
+    _normalized[statement] = cached
+    return cached
+
+
+class _Entry:
+    __slots__ = ("query", "calls", "sampled", "sampled_seconds", "slow_calls",
+                 "max_seconds", "latencies", "last_seen", "explain", "explained_at",
+                 "explain_after")
+
+    def __init__(self, query: str):
+        self.query = query
+        self.calls = 0
+        self.sampled = 0
+        self.sampled_seconds = 0.0
+        self.slow_calls = 0
+        self.max_seconds = 0.0
+        self.latencies: deque = deque(maxlen=config.SLOW_QUERY_WINDOW)
+        self.last_seen = 0.0
+        self.explain: str | None = None
+        self.explained_at: float | None = None
+        self.explain_after = 0.0   # monotonic time the next EXPLAIN may run
+
+
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+_lock = threading.Lock()
+_evicted = 0
+
+
+# ---------------------------------------------------------------------------
+# Recording (query_stats observer)
+# ---------------------------------------------------------------------------
+
+def _observe(statement: str | None, parameters: Any, seconds: float, explainable: bool) -> None:
+    global _evicted
+    if statement is None or not config.SLOW_QUERY_ENABLED:
+        return
+    slow = seconds * 1000 >= config.SLOW_QUERY_THRESHOLD_MS
+    sampled = config.SLOW_QUERY_SAMPLE_RATE >= 1 or random.random() < config.SLOW_QUERY_SAMPLE_RATE
+    if not (slow or sampled):
+        # Unsampled fast executions only bump the call counter of a known entry.
+        key, _ = fingerprint(statement)
+        with _lock:
+            entry = _entries.get(key)
+            if entry is not None:
+                entry.calls += 1
+        return
+
+    key, text = fingerprint(statement)
+    explain = False
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= config.SLOW_QUERY_MAX_FINGERPRINTS:
+                _entries.popitem(last=False)
+                _evicted += 1
+            entry = _entries[key] = _Entry(text[:_MAX_STATEMENT_CHARS])
+        else:
+            _entries.move_to_end(key)
+        entry.calls += 1
+        entry.last_seen = time.time()
+        if sampled:
+            entry.sampled += 1
+            entry.sampled_seconds += seconds
+            entry.latencies.append(seconds)
+        if slow:
+            entry.slow_calls += 1
+            if (config.SLOW_QUERY_EXPLAIN and explainable and _is_plain_select(text)
+                    and time.monotonic() >= entry.explain_after):
+                entry.explain_after = time.monotonic() + config.SLOW_QUERY_EXPLAIN_INTERVAL
+                explain = True
+        if seconds > entry.max_seconds:
+            entry.max_seconds = seconds
+
+    if explain:
+        _explainer.submit(_explain, key, statement, parameters)
+
+
+query_stats.add_observer(_observe)
+
+
+def _is_plain_select(normalized: str) -> bool:
+    return normalized.startswith(("select", "with")) and not _WRITES.search(normalized)
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN (ANALYZE, BUFFERS) of sampled slow SELECTs
+# ---------------------------------------------------------------------------
+
+_explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_explain_conn = None
+
+
+def _connect():
+    # Plain psycopg2 connection: not pooled, not counted, not observed.
+    return psycopg2.connect(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        options=f"-c timezone={config.DB_TIMEZONE}",   # same reading of naive parameters
+    )
+
+
+def _explain(key: str, statement: str, parameters: Any) -> None:
+    global _explain_conn
+    try:
+        if _explain_conn is None or _explain_conn.closed:
+            _explain_conn = _connect()
+        try:
+            with _explain_conn.cursor() as cur:
+                cur.execute("SET TRANSACTION READ ONLY;")
+                cur.execute("SELECT set_config('statement_timeout', %s, true);",
+                            (str(config.SLOW_QUERY_EXPLAIN_TIMEOUT_MS),))
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters or None)
+                plan = "\n".join(row[0] for row in cur.fetchall())
+        finally:
+            _explain_conn.rollback()
+    except Exception as e:
+        plan = "EXPLAIN failed: " + ((str(e).strip().splitlines() or [repr(e)])[0])
+        if _explain_conn is not None and _explain_conn.closed:
+            _explain_conn = None
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            entry.explain = plan
+            entry.explained_at = time.time()
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+SORT_KEYS = ("total", "p95", "max", "calls", "slow")
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
+
+def top(limit: int = 20, sort: str = "total", with_plans: bool = True) -> dict:
+    """
+    The `limit` worst fingerprints by `sort`:
+        total - estimated total time (sampled time / sample rate)
+        p95   - rolling 95th percentile latency
+        max   - slowest execution seen
+        calls - executions
+        slow  - executions over SLOW_QUERY_THRESHOLD_MS
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    rate = config.SLOW_QUERY_SAMPLE_RATE if 0 < config.SLOW_QUERY_SAMPLE_RATE < 1 else 1.0
+    with _lock:
+        rows = []
+        for key, e in _entries.items():
+            latencies = sorted(e.latencies)
+            row = {
+                "fingerprint": key,
+                "query": e.query,
+                "calls": e.calls,
+                "slow_calls": e.slow_calls,
+                "est_total_ms": round(e.sampled_seconds / rate * 1000, 3),
+                "mean_ms": _ms(e.sampled_seconds / e.sampled) if e.sampled else None,
+                "p50_ms": _ms(_percentile(latencies, 50)),
+                "p95_ms": _ms(_percentile(latencies, 95)),
+                "p99_ms": _ms(_percentile(latencies, 99)),
+                "max_ms": _ms(e.max_seconds),
+                "last_seen": e.last_seen,
+            }
+            if with_plans and e.explain is not None:
+                row["explain"] = e.explain
+                row["explained_at"] = e.explained_at
+            rows.append(row)
+        tracked, evicted = len(_entries), _evicted
+
+    order = {
+        "total": lambda r: r["est_total_ms"],
+        "p95": lambda r: r["p95_ms"] or 0,
+        "max": lambda r: r["max_ms"],
+        "calls": lambda r: r["calls"],
+        "slow": lambda r: r["slow_calls"],
+    }[sort]
+    rows.sort(key=order, reverse=True)
+    return {
+        "threshold_ms": config.SLOW_QUERY_THRESHOLD_MS,
+        "sample_rate": config.SLOW_QUERY_SAMPLE_RATE,
+        "tracked": tracked,
+        "evicted": evicted,
+        "queries": rows[:limit],
+    }
+
+
+def reset() -> None:
+    global _evicted
+    with _lock:
+        _entries.clear()
+        _evicted = 0
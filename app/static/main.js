@@ -51,8 +51,8 @@ function updateNav() {
     }
 }
 
-// Call backend with Authorization header
-async function apiFetch(path, options = {}) {
+// Call backend with Authorization header; throws on an error status
+async function apiRequest(path, options = {}) {
     const session = getSession();
     const headers = options.headers ? { ...options.headers } : {};
 
@@ -76,6 +76,11 @@ async function apiFetch(path, options = {}) {
         }
         throw new Error(detail);
     }
+    return response;
+}
+
+async function apiFetch(path, options = {}) {
+    const response = await apiRequest(path, options);
 
     // Try JSON; fall back to text
     const text = await response.text();
@@ -86,6 +91,44 @@ async function apiFetch(path, options = {}) {
     }
 }
 
+// Live updates (server-sent events). Event types in `reloadOn`, plus
+// "ready" after a reconnect and "resync" (events were dropped), call
+// `reload`, debounced so a burst of events costs one reload. `on` maps
+// other event types to a callback taking the parsed event.
+function subscribeEvents(path, { reload, reloadOn = [], on = {} }) {
+    if (!window.EventSource) return null;
+    const source = new EventSource(path);
+    let reloadTimer = null;
+    let connected = false;
+    const scheduleReload = () => {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(reload, 300);
+    };
+    source.addEventListener("ready", () => {
+        // The first "ready" follows the page's own initial load.
+        if (connected) scheduleReload();
+        connected = true;
+    });
+    for (const type of ["resync", ...reloadOn]) {
+        source.addEventListener(type, scheduleReload);
+    }
+    for (const [type, handler] of Object.entries(on)) {
+        source.addEventListener(type, (e) => handler(JSON.parse(e.data)));
+    }
+    window.addEventListener("beforeunload", () => source.close());
+    return source;
+}
+
+// One page of a keyset-paginated list: the items plus the cursor for the
+// next page (null on the last page).
+async function apiFetchPage(path) {
+    const response = await apiRequest(path);
+    return {
+        items: await response.json(),
+        nextCursor: response.headers.get("X-Next-Cursor"),
+    };
+}
+
 // --- Login page logic ---
 function initLoginPage() {
     const form = document.getElementById("login-form");
@@ -144,26 +187,34 @@ async function loadMemberDashboard() {
         return;
     }
 
-    try {
-        const dashboard = await apiFetch(`/members/${session.user_id}/dashboard`);
-        // Assuming dashboard corresponds to member_dashboard_view
-        summaryDiv.innerHTML = `
-            <p><strong>Name:</strong> ${dashboard.name}</p>
-            <p><strong>Email:</strong> ${dashboard.email}</p>
-            <p><strong>Latest Metric:</strong> ${
-                dashboard.latest_metric_type || "N/A"
-            } = ${dashboard.latest_metric_value ?? "N/A"}</p>
-            <p><strong>Total Classes Registered:</strong> ${
-                dashboard.total_classes_registered
-            }</p>
-            <p><strong>Upcoming PT Sessions:</strong> ${
-                dashboard.upcoming_pt_sessions
-            }</p>
-        `;
-    } catch (err) {
-        summaryDiv.textContent = `Error loading dashboard: ${err.message}`;
+    async function loadSummary() {
+        try {
+            const dashboard = await apiFetch(`/members/${session.user_id}/dashboard`);
+            // Assuming dashboard corresponds to member_dashboard_view
+            summaryDiv.innerHTML = `
+                <p><strong>Name:</strong> ${dashboard.name}</p>
+                <p><strong>Email:</strong> ${dashboard.email}</p>
+                <p><strong>Latest Metric:</strong> ${
+                    dashboard.latest_metric_type || "N/A"
+                } = ${dashboard.latest_metric_value ?? "N/A"}</p>
+                <p><strong>Total Classes Registered:</strong> ${
+                    dashboard.total_classes_registered
+                }</p>
+                <p><strong>Upcoming PT Sessions:</strong> ${
+                    dashboard.upcoming_pt_sessions
+                }</p>
+            `;
+        } catch (err) {
+            summaryDiv.textContent = `Error loading dashboard: ${err.message}`;
+        }
     }
 
+    loadSummary();
+    subscribeEvents(`/members/${session.user_id}/events`, {
+        reload: loadSummary,
+        reloadOn: ["pt_session", "class_registration"],
+    });
+
     // PT sessions can also be shown from the same view, or via dedicated endpoint.
     const ptDiv = document.getElementById("member-pt-sessions");
     if (ptDiv) {
@@ -209,31 +260,67 @@ async function loadTrainerDashboard() {
         return;
     }
 
-    // Load schedule
-    try {
-        const schedule = await apiFetch(`/trainers/${session.user_id}/schedule`);
-        if (Array.isArray(schedule) && schedule.length > 0) {
-            scheduleDiv.innerHTML = `
-                <ul>
-                    ${schedule
-                        .map(
-                            (item) => `
-                        <li>
-                            Class/Session at ${item.start_time} 
-                            ${item.end_time ? `– ${item.end_time}` : ""}
-                            (room: ${item.room_name || item.room_id})
-                        </li>`
-                        )
-                        .join("")}
-                </ul>
-            `;
-        } else {
-            scheduleDiv.textContent = "No sessions scheduled.";
+    // Upcoming two weeks, starting today, one page at a time.
+    let scheduleCursor = null;
+    const moreScheduleBtn = document.createElement("button");
+    moreScheduleBtn.type = "button";
+    moreScheduleBtn.textContent = "More sessions";
+    moreScheduleBtn.style.display = "none";
+    scheduleDiv.after(moreScheduleBtn);
+
+    function scheduleItem(item) {
+        return `
+            <li>
+                ${item.title} at ${item.start_time}
+                ${item.end_time ? `– ${item.end_time}` : ""}
+                (room: ${item.room_name})
+            </li>`;
+    }
+
+    async function loadSchedulePage() {
+        const from = new Date();
+        from.setHours(0, 0, 0, 0);
+        const to = new Date(from.getTime() + 14 * 24 * 60 * 60 * 1000);
+        const params = new URLSearchParams({ from: from.toISOString(), to: to.toISOString() });
+        if (scheduleCursor) params.set("cursor", scheduleCursor);
+        const page = await apiFetchPage(`/trainers/${session.user_id}/schedule?${params}`);
+        scheduleCursor = page.nextCursor;
+        moreScheduleBtn.style.display = scheduleCursor ? "" : "none";
+        return page.items;
+    }
+
+    async function loadSchedule() {
+        scheduleCursor = null;
+        try {
+            const schedule = await loadSchedulePage();
+            if (schedule.length > 0) {
+                scheduleDiv.innerHTML = `<ul>${schedule.map(scheduleItem).join("")}</ul>`;
+            } else {
+                scheduleDiv.textContent = "No sessions scheduled.";
+            }
+        } catch (err) {
+            scheduleDiv.textContent = `Error loading schedule: ${err.message}`;
         }
-    } catch (err) {
-        scheduleDiv.textContent = `Error loading schedule: ${err.message}`;
     }
 
+    moreScheduleBtn.addEventListener("click", async () => {
+        try {
+            const schedule = await loadSchedulePage();
+            scheduleDiv
+                .querySelector("ul")
+                .insertAdjacentHTML("beforeend", schedule.map(scheduleItem).join(""));
+        } catch (err) {
+            scheduleDiv.insertAdjacentText("beforeend", `Error: ${err.message}`);
+        }
+    });
+
+    loadSchedule();
+    // New or changed bookings and availability reload the schedule.
+    subscribeEvents(`/trainers/${session.user_id}/events`, {
+        reload: loadSchedule,
+        reloadOn: ["pt_session", "availability"],
+    });
+
     // Availability form
     const availForm = document.getElementById("trainer-availability-form");
     const availResult = document.getElementById("trainer-availability-result");
@@ -356,39 +443,81 @@ async function loadAdminDashboard() {
         });
     }
 
-    // Classes list
+    // Classes list: upcoming classes (from today), one page at a time.
+    let classesCursor = null;
+    const moreClassesBtn = document.createElement("button");
+    moreClassesBtn.type = "button";
+    moreClassesBtn.textContent = "More classes";
+    moreClassesBtn.style.display = "none";
+    if (classesList) classesList.after(moreClassesBtn);
+
+    function classItem(c) {
+        return `
+            <li>
+                [${c.class_id}] ${c.name} – ${c.start_time},
+                capacity ${c.capacity}, trainer ${c.trainer_id}, room ${c.room_id},
+                booked <span id="occupancy-${c.class_id}">${
+                    c.registered_count + c.held_count
+                }/${c.capacity}</span>
+            </li>`;
+    }
+
+    async function loadClassesPage() {
+        const today = new Date();
+        today.setHours(0, 0, 0, 0);
+        const params = new URLSearchParams({ start_from: today.toISOString() });
+        if (classesCursor) params.set("cursor", classesCursor);
+        const page = await apiFetchPage(`/admins/classes?${params}`);
+        classesCursor = page.nextCursor;
+        moreClassesBtn.style.display = classesCursor ? "" : "none";
+        return page.items;
+    }
+
     async function refreshClasses() {
         if (!classesList) return;
         classesList.textContent = "Loading classes...";
+        classesCursor = null;
         try {
-            const classes = await apiFetch("/admins/classes");
-            if (!Array.isArray(classes) || classes.length === 0) {
-                classesList.textContent = "No classes.";
+            const classes = await loadClassesPage();
+            if (classes.length === 0) {
+                classesList.textContent = "No upcoming classes.";
                 return;
             }
-            classesList.innerHTML = `
-                <ul>
-                    ${classes
-                        .map(
-                            (c) => `
-                        <li>
-                            [${c.class_id}] ${c.name} – ${c.start_time},
-                            capacity ${c.capacity}, trainer ${c.trainer_id}, room ${c.room_id}
-                        </li>`
-                        )
-                        .join("")}
-                </ul>
-            `;
+            classesList.innerHTML = `<ul>${classes.map(classItem).join("")}</ul>`;
         } catch (err) {
             classesList.textContent = `Error: ${err.message}`;
         }
     }
 
+    moreClassesBtn.addEventListener("click", async () => {
+        try {
+            const classes = await loadClassesPage();
+            classesList
+                .querySelector("ul")
+                .insertAdjacentHTML("beforeend", classes.map(classItem).join(""));
+        } catch (err) {
+            classesList.insertAdjacentText("beforeend", `Error: ${err.message}`);
+        }
+    });
+
     if (refreshBtn) {
         refreshBtn.addEventListener("click", refreshClasses);
         // Load once on page load
         refreshClasses();
     }
+
+    // Occupancy is updated in place; anything missed reloads the list.
+    subscribeEvents("/admins/events", {
+        reload: refreshClasses,
+        on: {
+            class_occupancy: (e) => {
+                const span = document.getElementById(`occupancy-${e.class_id}`);
+                if (span) {
+                    span.textContent = `${e.registered + e.held}/${e.capacity}`;
+                }
+            },
+        },
+    });
 }
 
 // --- Logout link ---